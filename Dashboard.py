@@ -1,13 +1,17 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
-from streamlit_gsheets import GSheetsConnection
+from nucleo import (BVC, atribuir, cambios_del_editor, cargar_operaciones, casar_lotes, con_huella, huella,
+                    normalizar_operaciones, resumen_posiciones, tabla_precios_mercado, texto_antiguedad)
+from recursos import (actualizar_bitacora_tasas, buscar_tasa_en_bitacora, cargar_pagina, derivar, elegir_cartera,
+                      fallo_de_cache, guardar_operacion, importador_operaciones, iniciar_medicion, leer_precios_bvc,
+                      medido, medir, motor_curva, mostrar_panel_medicion, mostrar_tiempos_carga,
+                      obtener_historial_tasas, obtener_libro, obtener_precios_manuales, obtener_tasa_bcv,
+                      panel_atribucion, panel_riesgo, tabla_paginada)
 
 # --- CONFIGURACIÓN DE PÁGINA ---
 st.set_page_config(page_title="Inversiones BVC Pro", page_icon="🇻🇪", layout="wide")
+iniciar_medicion("BVC")
 
 # Estilos CSS
 st.markdown("""
@@ -18,154 +22,142 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- CONEXIÓN A GOOGLE SHEETS ---
-conn = st.connection("gsheets", type=GSheetsConnection)
+# Conexión, robot BCV y bitácora de tasas son los de recursos.py (compartidos con la página internacional).
+cartera = elegir_cartera()
+libro = obtener_libro(BVC, cartera)
 
-# --- ROBOT BCV ---
-@st.cache_data(ttl=3600)
-def obtener_tasa_bcv():
-    url = "https://www.bcv.org.ve/"
-    try:
-        response = requests.get(url, verify=False, timeout=5)
-        soup = BeautifulSoup(response.content, "html.parser")
-        dolar_div = soup.find("div", {"id": "dolar"})
-        return float(dolar_div.find("strong").text.strip().replace(',', '.'))
-    except:
-        return 0.0
-
-# ==========================================
-#    ⬇️ NUEVAS FUNCIONES DE BITÁCORA ⬇️
-# ==========================================
-
-def actualizar_bitacora_tasas(tasa_actual):
-    """Guarda la tasa de HOY en la hoja 'Historial_Tasas'."""
-    if tasa_actual <= 0: return 
-    try:
-        try:
-            df_hist = conn.read(worksheet="Historial_Tasas", ttl=0)
-            df_hist["Fecha"] = pd.to_datetime(df_hist["Fecha"])
-        except:
-            df_hist = pd.DataFrame(columns=["Fecha", "Tasa"])
-        
-        hoy = datetime.now().date()
-        fechas_registradas = df_hist["Fecha"].dt.date.tolist() if not df_hist.empty else []
-        
-        if hoy not in fechas_registradas:
-            nuevo = pd.DataFrame([{"Fecha": pd.to_datetime(hoy), "Tasa": tasa_actual}])
-            df_up = pd.concat([df_hist, nuevo], ignore_index=True)
-            df_up["Fecha"] = df_up["Fecha"].dt.strftime('%Y-%m-%d')
-            conn.update(worksheet="Historial_Tasas", data=df_up)
-    except: pass
-
-def buscar_tasa_en_bitacora(fecha_buscada):
-    """Busca si tenemos guardada la tasa de una fecha específica."""
-    try:
-        df_hist = conn.read(worksheet="Historial_Tasas", ttl=600)
-        df_hist["Fecha"] = pd.to_datetime(df_hist["Fecha"]).dt.date
-        fila = df_hist[df_hist["Fecha"] == fecha_buscada]
-        if not fila.empty: return float(fila.iloc[0]["Tasa"])
-    except: pass
-    return None
+@medido("Portafolio")
+def cargar_datos():
+    return cargar_operaciones(libro, BVC)
 
-# ==========================================
-#    ⬆️ FIN DE NUEVAS FUNCIONES ⬆️
-# ==========================================
+def curva_portafolio(df_ops, precios_hoy):
+    """Valor diario del portafolio. El motor vive en la sesión y solo recibe las operaciones nuevas.
 
-def cargar_datos():
-    try:
-        df_port = conn.read(worksheet="Portafolio", ttl=0)
-        df_port["Fecha Compra"] = pd.to_datetime(df_port["Fecha Compra"])
-        if "Tipo" not in df_port.columns:
-            df_port["Tipo"] = "Compra"
-        return df_port
-    except:
-        return pd.DataFrame(columns=[
-            "Ticker", "Cantidad", "Precio Operacion (Bs)", 
-            "Fecha Compra", "Tasa Cambio (Bs/$)", 
-            "Total Invertido (Bs)", "Total Invertido ($)", "Tipo"
-        ])
-
-def guardar_operacion(ticker, cantidad, precio, fecha, tasa_registro, tipo):
-    try:
-        df_actual = cargar_datos()
-        
-        cantidad_final = cantidad
-        if tipo == "Venta":
-            cantidad_final = -cantidad 
-        
-        total_bs = cantidad_final * precio
-        total_usd = total_bs / tasa_registro if tasa_registro > 0 else 0
-        
-        nuevo_registro = pd.DataFrame([{
-            "Ticker": ticker,
-            "Cantidad": cantidad_final,
-            "Precio Operacion (Bs)": precio,
-            "Fecha Compra": pd.to_datetime(fecha),
-            "Tasa Cambio (Bs/$)": tasa_registro,
-            "Total Invertido (Bs)": total_bs,
-            "Total Invertido ($)": total_usd,
-            "Tipo": tipo
-        }])
-        
-        if df_actual.empty:
-            df_actualizado = nuevo_registro
-        else:
-            df_actualizado = pd.concat([df_actual, nuevo_registro], ignore_index=True)
-            
-        df_actualizado["Fecha Compra"] = df_actualizado["Fecha Compra"].dt.strftime('%Y-%m-%d')
-        conn.update(worksheet="Portafolio", data=df_actualizado)
-        st.cache_data.clear()
-        return True
-    except Exception as e:
-        return False
+    La BVC no tiene historial de precios: se usa el precio de cada operación
+    como observación de ese día y la tabla de precios de hoy para el final.
+    """
+    ops = pd.DataFrame({
+        "Fecha": df_ops["Fecha Compra"], "Ticker": df_ops["Ticker"], "Cantidad": df_ops["Cantidad"],
+        "Monto $": df_ops["Total Invertido ($)"], "Monto Bs": df_ops["Total Invertido (Bs)"]
+    })
+    motor = motor_curva(libro, ops, "Bs")
 
-# --- FUNCIONES DE PRECIOS MEJORADAS (Mantenemos tu lógica v5.0) ---
-def limpiar_precio_bvc(valor):
-    if isinstance(valor, (int, float)): return float(valor)
-    texto = str(valor).strip()
-    if not texto: return 0.0
-    try: return float(texto.replace('.', '').replace(',', '.'))
-    except: return 0.0
+    precios = df_ops.pivot_table(index="Fecha Compra", columns="Ticker", values="Precio Operacion (Bs)", aggfunc="last")
+    hoy = pd.Timestamp(datetime.now().date())
+    precios_hoy = precios_hoy[(precios_hoy["Precio Bs."] > 0) & precios_hoy.index.isin(motor.tickers)]
+    for tick, precio in precios_hoy["Precio Bs."].items():
+        precios.loc[hoy, tick] = precio
+    motor.fijar_precios(precios)
+    motor.fijar_tasas(obtener_historial_tasas().serie())
+    motor.extender_hasta(hoy)
+    return motor.curva()
+
+def precios_riesgo(df_ops, precios_hoy, inicio):
+    """Precios en Bs para el análisis de riesgo: el de cada operación en su día y el de hoy al final."""
+    precios = df_ops.pivot_table(index=df_ops["Fecha Compra"].dt.normalize(), columns="Ticker",
+                                 values="Precio Operacion (Bs)", aggfunc="last")
+    precios_hoy = precios_hoy[precios_hoy["Precio Bs."] > 0]["Precio Bs."]
+    precios.loc[pd.Timestamp(datetime.now().date())] = precios_hoy.reindex(precios.columns)
+    # El último precio conocido antes del periodo es el punto de partida.
+    precios = precios.sort_index().ffill()
+    return precios[precios.index >= inicio]
 
+# --- FUNCIONES DE PRECIOS MEJORADAS (Mantenemos tu lógica v5.0) ---
+@medido("Precios_Web", cache=True)
+@st.cache_data(ttl=300)
 def cargar_precios_web_full():
+    fallo_de_cache("Precios_Web")
     try:
-        df_web = conn.read(worksheet="Precios_Web", ttl=0)
-        if df_web.empty: return {}
-        df_web.columns = df_web.columns.str.strip()
-        
-        col_ticker = next((c for c in df_web.columns if any(t in c.lower() for t in ["símbolo", "simbolo", "ticker"])), None)
-        if not col_ticker: col_ticker = df_web.columns[1] if len(df_web.columns) > 1 else df_web.columns[0]
-
-        col_precio = next((c for c in df_web.columns if any(p in c.lower() for p in ["último", "precio", "valor"])), None)
-        if not col_precio and len(df_web.columns) > 2: col_precio = df_web.columns[2]
-
-        if col_ticker and col_precio:
-            dict_precios = {}
-            for _, row in df_web.iterrows():
-                tick = str(row[col_ticker]).strip().upper()
-                precio = limpiar_precio_bvc(row[col_precio])
-                if tick and tick != "NAN" and precio > 0:
-                    dict_precios[tick] = precio
-            return dict_precios
-        return {}
+        # La foto del trabajador o, si no está corriendo, la página de la BVC (o la hoja si no responde).
+        return leer_precios_bvc()
     except: return {}
 
+# --- CÁLCULOS DERIVADOS (memorizados por contenido, ver recursos.derivar) ---
+def calcular_df_final(df_portafolio, precios_mercado, tasa):
+    df_final = df_portafolio.copy()
+    df_final["Precio Bs."] = df_final["Ticker"].map(precios_mercado["Precio Bs."])
+    
+    df_final["Inv. Total (Bs)"] = df_final["Total Invertido (Bs)"]
+    df_final["Precio Bs."] = df_final["Precio Bs."].fillna(0)
+    
+    df_final["Valor Hoy (Bs)"] = df_final["Cantidad"] * df_final["Precio Bs."]
+    df_final["Ganancia (Bs)"] = df_final["Valor Hoy (Bs)"] - df_final["Inv. Total (Bs)"]
+    
+    # Conversión a dólares usando la TASA ACTUAL (del día)
+    df_final["Valor Hoy ($)"] = df_final["Valor Hoy (Bs)"] / tasa
+    df_final["Inv. Total ($)"] = df_final["Total Invertido ($)"]
+    df_final["Ganancia ($)"] = df_final["Valor Hoy ($)"] - df_final["Inv. Total ($)"]
+    df_final["Rentabilidad %"] = (df_final["Ganancia ($)"] / df_final["Inv. Total ($)"] * 100).where(df_final["Inv. Total ($)"] != 0, 0)
+    return df_final
+
+# Formato de las tablas de operaciones (lo aplica el navegador, sin Styler).
+FORMATO_OPERACIONES = {
+    "Fecha Compra": st.column_config.DateColumn(format="YYYY-MM-DD"),
+    "Precio Operacion (Bs)": st.column_config.NumberColumn(format="%.2f"),
+    "Total Invertido (Bs)": st.column_config.NumberColumn(format="Bs.%,.2f"),
+    "Total Invertido ($)": st.column_config.NumberColumn(format="$%,.2f"),
+    "Precio Bs.": st.column_config.NumberColumn(format="%.2f"),
+    "Inv. Total (Bs)": st.column_config.NumberColumn(format="Bs.%,.2f"),
+    "Valor Hoy (Bs)": st.column_config.NumberColumn(format="Bs.%,.2f"),
+    "Ganancia (Bs)": st.column_config.NumberColumn(format="Bs.%,.2f"),
+    "Inv. Total ($)": st.column_config.NumberColumn(format="$%,.2f"),
+    "Valor Hoy ($)": st.column_config.NumberColumn(format="$%.2f"),
+    "Ganancia ($)": st.column_config.NumberColumn(format="$%.2f"),
+    "Rentabilidad %": st.column_config.NumberColumn(format="%.2f%%"),
+}
+
+def casar(df_portafolio, metodo):
+    return casar_lotes(normalizar_operaciones(df_portafolio, BVC), "Bs", metodo)
+
+# Lo que sigue parte de los lotes ya casados: con la tasa nueva del día no se vuelve a recorrer el libro.
+def calcular_lotes(casado, precios_mercado, tasa):
+    return resumen_posiciones(casado, precios_mercado["Precio Bs."].to_dict(), tasa)
+
+def calcular_atribucion(casado, precios_mercado, tasa):
+    return atribuir(casado, precios_mercado["Precio Bs."].to_dict(), tasa)
+
+# Valor, costo y ganancia salen de los lotes abiertos: las ventas ya no se restan de lo invertido.
+def calcular_kpis(df_lotes):
+    return (df_lotes["Valor $"].sum(), df_lotes["No Realizada $"].sum(), df_lotes["Costo $"].sum(),
+            df_lotes["Valor Bs"].sum(), df_lotes["No Realizada Bs"].sum(), df_lotes["Costo Bs"].sum(),
+            df_lotes["Realizada Bs"].sum(), df_lotes["Realizada $"].sum())
+
+def figuras_distribucion(df_lotes):
+    # plotly se importa aquí: los KPIs de arriba ya están en pantalla mientras carga.
+    import plotly.express as px
+    df_pos = df_lotes[df_lotes["Cantidad"] > 0.00001]
+    con_valor = df_pos[df_pos["Valor $"] > 0.01]
+    torta = px.pie(con_valor, values='Valor $', names='Ticker', hole=0.4) if not con_valor.empty else None
+    barras = px.bar(df_pos, x='Ticker', y='No Realizada $', color='No Realizada $', color_continuous_scale="RdBu")
+    return torta, barras
+
 # --- INTERFAZ PRINCIPAL ---
 st.title("🇻🇪 Mi Portafolio de Inversiones")
 st.markdown("---")
 
-# 1. Tasa y Bitácora
-tasa_bcv = obtener_tasa_bcv()
+# 1. Todas las fuentes a la vez: tasa BCV, bitácora, portafolio y precios web
+datos = cargar_pagina({
+    "BCV": obtener_tasa_bcv,
+    "Historial_Tasas": obtener_historial_tasas,
+    "Portafolio": cargar_datos,
+    "Precios_Web": cargar_precios_web_full,
+}, timeouts={"BCV": 6}, defectos={"Portafolio": pd.DataFrame(columns=list(BVC.columnas)), "Precios_Web": {}})
+
+lectura_bcv = datos["BCV"]
+tasa_bcv = lectura_bcv.tasa if lectura_bcv else 0.0
 tasa_uso_hoy = tasa_bcv if tasa_bcv > 0 else 60.0
 
-# GUARDAMOS LA TASA DE HOY EN LA MEMORIA
-actualizar_bitacora_tasas(tasa_uso_hoy)
+# GUARDAMOS LA TASA DE HOY EN LA MEMORIA (solo la del BCV; el 60.0 es para mostrar algo)
+actualizar_bitacora_tasas(lectura_bcv)
 
 col_tasa, _ = st.columns([1, 4])
-if tasa_bcv > 0: col_tasa.metric("Tasa BCV", f"Bs. {tasa_bcv}")
+if tasa_bcv > 0:
+    col_tasa.metric("Tasa BCV", f"Bs. {tasa_bcv}")
+    col_tasa.caption(texto_antiguedad(lectura_bcv))
 else: col_tasa.warning("BCV Offline")
 
-df_portafolio = cargar_datos()
-precios_web_dict = cargar_precios_web_full()
+df_portafolio = datos["Portafolio"]
+precios_web_dict = datos["Precios_Web"]
 
 # --- LISTA DINÁMICA ---
 mis_acciones = df_portafolio["Ticker"].unique().tolist() if not df_portafolio.empty else []
@@ -190,11 +182,11 @@ with st.sidebar:
         st.success(f"Tasa encontrada: {tasa_guardada} Bs/$")
     elif fecha_in == datetime.now().date():
         val_defecto = tasa_uso_hoy
-        msg = "✅ Tasa actual del BCV."
+        msg = "✅ Tasa actual del BCV." if tasa_bcv > 0 else "⚠️ BCV sin tasa todavía: revisa la tasa antes de guardar."
     else:
         val_defecto = tasa_uso_hoy
         msg = "⚠️ No hay registro. Usa la de hoy o ajusta."
-        st.info("Sin datos históricos. Ingresa tasa manual.")
+        st.info("Sin datos históricos. Ingresa tasa manual (o carga el historial con rellenar_tasas.py).")
 
     with st.form("form_compra"):
         st.write("---")
@@ -220,15 +212,25 @@ with st.sidebar:
                 st.error("No tienes suficientes acciones.")
             else:
                 with st.spinner("Guardando..."):
-                    if guardar_operacion(ticker_in, cant_in, costo_in, fecha_in, tasa_in, tipo_operacion):
-                        st.success("Registrado!")
-                        st.rerun()
-                    else:
-                        st.error("Error al guardar en Sheets.")
+                    exito, mensaje = guardar_operacion(libro, BVC, ticker_in, cant_in, costo_in, fecha_in, tasa_in, tipo_operacion)
+                if exito:
+                    st.success("Registrado!")
+                    st.rerun()
+                else:
+                    st.error(f"Error al guardar en Sheets: {mensaje}")
+
+    # Muchas operaciones de una vez (extracto del broker), en una sola escritura.
+    importador_operaciones(libro, BVC, df_portafolio)
 
 # --- SECCIÓN DE PRECIOS ---
+# Tabla indexada por ticker. Al abrir la página arranca con los precios fijados a mano (en disco).
 if 'precios_mercado' not in st.session_state:
-    st.session_state.precios_mercado = pd.DataFrame({"Ticker": acciones_disponibles, "Precio Bs.": [0.0]*len(acciones_disponibles)})
+    st.session_state.precios_mercado = tabla_precios_mercado(acciones_disponibles, obtener_precios_manuales(cartera).leer())
+else:
+    # Si apareció un ticker nuevo en el libro se agrega en 0 sin tocar los demás.
+    nuevos = pd.Index(acciones_disponibles).difference(st.session_state.precios_mercado.index)
+    if len(nuevos):
+        st.session_state.precios_mercado = pd.concat([st.session_state.precios_mercado, tabla_precios_mercado(nuevos)])
 
 st.subheader("📊 Precios de Hoy")
 
@@ -236,60 +238,64 @@ col_man, col_auto = st.columns([3, 1])
 with col_auto:
     st.write("")
     st.write("")
-    if st.button("🔄 Cargar de Sheets"):
+    if st.button("🔄 Cargar de la BVC"):
+        cargar_precios_web_full.clear()
+        precios_web_dict = cargar_precios_web_full()
         if precios_web_dict:
-            df_nuevo = pd.DataFrame(list(precios_web_dict.items()), columns=["Ticker", "Precio Bs."])
-            st.session_state.precios_mercado = df_nuevo
-            st.success(f"¡Actualizados {len(df_nuevo)} precios!")
+            # Los precios de la BVC reemplazan a los fijados a mano.
+            st.session_state.precios_mercado = tabla_precios_mercado(acciones_disponibles, precios_web_dict)
+            obtener_precios_manuales(cartera).borrar()
+            # Editor nuevo: el de antes recordaría lo editado en la sesión y lo volvería a fijar encima.
+            st.session_state.recargas_precios = st.session_state.get("recargas_precios", 0) + 1
+            st.success(f"¡Actualizados {len(precios_web_dict)} precios!")
             st.rerun()
         else:
-            st.warning("Hoja vacía o sin datos.")
+            st.warning("Sin precios: ni la BVC ni la hoja Precios_Web respondieron.")
 
 with col_man:
     ver_todo = st.checkbox("Ver todo el mercado", value=False)
-    df_visual = st.session_state.precios_mercado.copy()
+    df_visual = st.session_state.precios_mercado
     if not ver_todo and mis_acciones:
-        df_visual = df_visual[df_visual["Ticker"].isin(mis_acciones)]
+        df_visual = df_visual[df_visual.index.isin(mis_acciones)]
         
     with st.expander("📝 Tabla de Precios (Editable)", expanded=True):
-        df_editado = st.data_editor(
+        # El editor guarda sus cambios por posición de fila: con otras filas (otro filtro) es otro editor.
+        clave_editor = f"editor_precios_{st.session_state.get('recargas_precios', 0)}_{huella(tuple(df_visual.index))}"
+        st.data_editor(
             df_visual,
+            key=clave_editor,
             column_config={"Precio Bs.": st.column_config.NumberColumn(format="%.2f Bs")},
-            hide_index=True,
             use_container_width=True
         )
-        if not df_editado.equals(df_visual):
-             for i, row in df_editado.iterrows():
-                 idx = st.session_state.precios_mercado.index[st.session_state.precios_mercado["Ticker"] == row["Ticker"]]
-                 if not idx.empty: st.session_state.precios_mercado.at[idx[0], "Precio Bs."] = row["Precio Bs."]
+        # Solo las celdas editadas; las que ya estaban aplicadas no se vuelven a escribir.
+        tabla = st.session_state.precios_mercado
+        cambios = {t: p for t, p in cambios_del_editor(df_visual, st.session_state[clave_editor]).items()
+                   if tabla.at[t, "Precio Bs."] != p}
+        if cambios:
+            tabla.loc[list(cambios), "Precio Bs."] = list(cambios.values())
+            obtener_precios_manuales(cartera).fijar(cambios)
 
 # --- CÁLCULOS Y KPIs ---
 if not df_portafolio.empty:
-    df_final = df_portafolio.merge(st.session_state.precios_mercado, on="Ticker", how="left")
+    # Cada derivado se recalcula solo si cambió el libro, la tabla de precios, la tasa o el método.
+    with medir("Cálculos"):
+        libro_h = con_huella(df_portafolio)
+        precios_h = con_huella(st.session_state.precios_mercado)
+        # df_final es solo para las tablas de operaciones.
+        df_final = derivar("df_final", calcular_df_final, libro_h, precios_h, tasa_uso_hoy).valor
     
-    df_final["Inv. Total (Bs)"] = df_final["Total Invertido (Bs)"]
-    df_final["Precio Bs."] = df_final["Precio Bs."].fillna(0)
-    
-    df_final["Valor Hoy (Bs)"] = df_final["Cantidad"] * df_final["Precio Bs."]
-    df_final["Ganancia (Bs)"] = df_final["Valor Hoy (Bs)"] - df_final["Inv. Total (Bs)"]
-    
-    # Conversión a dólares usando la TASA ACTUAL (del día)
-    df_final["Valor Hoy ($)"] = df_final["Valor Hoy (Bs)"] / tasa_uso_hoy
-    df_final["Inv. Total ($)"] = df_final["Total Invertido ($)"]
-    df_final["Ganancia ($)"] = df_final["Valor Hoy ($)"] - df_final["Inv. Total ($)"]
+        # Ganancia realizada y no realizada casando ventas contra compras (cada lote con su tasa).
+        metodo_costo = st.sidebar.radio("Método de costo:", ["FIFO", "Promedio"], horizontal=True)
+        d_casado = derivar("Casado", casar, libro_h, metodo_costo)
+        d_lotes = derivar("Lotes", calcular_lotes, d_casado, precios_h, tasa_uso_hoy)
+        df_lotes = d_lotes.valor
+        total_usd, gan_usd, inv_usd, total_bs, gan_bs, inv_bs, realizada_bs, realizada_usd = derivar(
+            "KPIs", calcular_kpis, d_lotes).valor
     
     # --- KPIs ---
     st.markdown("### 💰 Estado de Cuenta")
     
-    total_usd = df_final["Valor Hoy ($)"].sum()
-    gan_usd = df_final["Ganancia ($)"].sum()
-    inv_usd = df_final["Inv. Total ($)"].sum()
-    
-    total_bs = df_final["Valor Hoy (Bs)"].sum()
-    gan_bs = df_final["Ganancia (Bs)"].sum()
-    inv_bs = df_final["Inv. Total (Bs)"].sum()
-    
-    rent = ((total_usd - inv_usd) / inv_usd * 100) if inv_usd != 0 else 0
+    rent = (gan_usd / inv_usd * 100) if inv_usd != 0 else 0
     
     st.markdown("##### 💵 Referencia en Divisas")
     k1, k2, k3, k4 = st.columns(4)
@@ -303,32 +309,45 @@ if not df_portafolio.empty:
     b1.metric("Valor Cartera (Bs)", f"Bs. {total_bs:,.2f}")
     b2.metric("Ganancia Neta (Bs)", f"Bs. {gan_bs:,.2f}", delta_color="normal")
     b3.metric("Total Invertido (Bs)", f"Bs. {inv_bs:,.2f}")
-    b4.empty()
+    b4.metric("Ganancia Realizada (Bs)", f"Bs. {realizada_bs:,.2f}", help=f"${realizada_usd:,.2f} en divisas ({metodo_costo})")
     
     # --- GRÁFICOS ---
-    tab1, tab2 = st.tabs(["📈 Distribución", "📋 Detalle"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["📈 Distribución", "📋 Detalle", "🧾 Lotes", "💱 Precio vs. tasa", "⚠️ Riesgo"])
     
-    df_pos = df_final.groupby("Ticker")[["Valor Hoy ($)", "Ganancia ($)"]].sum().reset_index()
-    df_pos = df_pos[df_pos["Valor Hoy ($)"] > 0.01] 
-
-    with tab1:
+    with tab1, medir("Gráficos"):
+        torta, barras = derivar("Figuras", figuras_distribucion, d_lotes).valor
         c1, c2 = st.columns(2)
-        if not df_pos.empty:
-            c1.plotly_chart(px.pie(df_pos, values='Valor Hoy ($)', names='Ticker', hole=0.4), use_container_width=True)
+        if torta is not None:
+            c1.plotly_chart(torta, use_container_width=True)
         else: c1.info("Sin valor positivo.")
-        c2.plotly_chart(px.bar(df_final, x='Ticker', y='Ganancia ($)', color='Ganancia ($)', color_continuous_scale="RdBu"), use_container_width=True)
+        c2.plotly_chart(barras, use_container_width=True)
 
     with tab2:
         cols = ["Tipo", "Ticker", "Cantidad", "Fecha Compra", "Precio Operacion (Bs)", "Valor Hoy ($)", "Ganancia ($)", "Rentabilidad %"]
-        # Calcular rentabilidad para la tabla
-        df_final["Rentabilidad %"] = df_final.apply(lambda x: (x["Ganancia ($)"] / x["Inv. Total ($)"] * 100) if x["Inv. Total ($)"] != 0 else 0, axis=1)
-        
-        st.dataframe(df_final[cols].style.format({
-            "Precio Operacion (Bs)": "{:.2f}",
-            "Valor Hoy ($)": "${:.2f}",
-            "Ganancia ($)": "${:.2f}",
-            "Rentabilidad %": "{:.2f}%"
-        }), use_container_width=True)
+        tabla_paginada(df_final[cols], "detalle", columna_fecha="Fecha Compra", orden="Fecha Compra",
+                       column_config=FORMATO_OPERACIONES)
+
+    with tab3:
+        st.dataframe(df_lotes, use_container_width=True, column_config={
+            "Cantidad": st.column_config.NumberColumn(format="%,.2f"),
+            "Costo Bs": st.column_config.NumberColumn(format="Bs.%,.2f"), "Costo $": st.column_config.NumberColumn(format="$%,.2f"),
+            "Realizada Bs": st.column_config.NumberColumn(format="Bs.%,.2f"), "Realizada $": st.column_config.NumberColumn(format="$%,.2f"),
+            "Precio Bs": st.column_config.NumberColumn(format="%.2f"),
+            "Valor Bs": st.column_config.NumberColumn(format="Bs.%,.2f"), "Valor $": st.column_config.NumberColumn(format="$%,.2f"),
+            "No Realizada Bs": st.column_config.NumberColumn(format="Bs.%,.2f"), "No Realizada $": st.column_config.NumberColumn(format="$%,.2f"),
+            "Rentabilidad %": st.column_config.NumberColumn(format="%.2f%%")
+        })
+
+    with tab4:
+        panel_atribucion("atribucion_bvc", derivar("Atribución", calcular_atribucion, d_casado, precios_h, tasa_uso_hoy))
+
+    with tab5:
+        # La BVC no tiene historial de precios: los retornos salen de los precios de las operaciones.
+        st.caption("Con precios solo de los días en que hubo operaciones la volatilidad sale subestimada; "
+                   "sirve para comparar tickers y periodos, no como cifra absoluta.")
+        panel_riesgo("riesgo_bvc", dict(zip(df_lotes["Ticker"], df_lotes["Cantidad"])),
+                     lambda inicio: precios_riesgo(df_portafolio, st.session_state.precios_mercado, inicio), "Bs",
+                     libro_h, precios_h)
         
     # --- REPORTES ---
     st.markdown("---")
@@ -336,7 +355,17 @@ if not df_portafolio.empty:
     periodo = st.selectbox("Periodo:", ["Todo", "7 días", "30 días", "365 días"])
     dias = {"Todo": 9999, "7 días": 7, "30 días": 30, "365 días": 365}
     fecha_corte = datetime.now() - timedelta(days=dias[periodo])
-    st.dataframe(df_final[df_final["Fecha Compra"] >= fecha_corte])
+    if st.toggle("📈 Ver evolución del portafolio"):
+        with medir("Curva"):
+            curva = curva_portafolio(df_portafolio, st.session_state.precios_mercado)
+        curva = curva[curva.index >= fecha_corte]
+        moneda_curva = st.radio("Moneda:", ["$", "Bs"], horizontal=True, key="moneda_curva")
+        st.line_chart(curva[[f"Valor {moneda_curva}", f"Invertido {moneda_curva}"]])
+    tabla_paginada(df_final[df_final["Fecha Compra"] >= fecha_corte], "reporte", columna_fecha="Fecha Compra",
+                   orden="Fecha Compra", column_config=FORMATO_OPERACIONES)
 
 else:
     st.info("👈 Registra tu primera compra.")
+
+mostrar_tiempos_carga()
+mostrar_panel_medicion()
@@ -0,0 +1,136 @@
+import streamlit as st
+import pandas as pd
+from nucleo import BVC, INTL, cargar_operaciones, posiciones_consolidadas, resumen_por_mercado, texto_antiguedad
+from recursos import (actualizar_bitacora_tasas, cargar_pagina, derivar, elegir_cartera, fallo_de_cache,
+                      iniciar_medicion, leer_precios_bvc, medido, medir, mostrar_panel_medicion, mostrar_tiempos_carga,
+                      obtener_historial_tasas, obtener_libro, obtener_precios_actuales, obtener_tasa_bcv)
+
+# --- CONFIGURACIÓN DE PÁGINA ---
+st.set_page_config(page_title="Patrimonio Consolidado", page_icon="🌐", layout="wide")
+iniciar_medicion("Consolidado")
+
+st.markdown("""
+<style>
+    div[data-testid="stMetricValue"] {font-size: 26px;}
+</style>
+""", unsafe_allow_html=True)
+
+# --- CONEXIÓN Y RECURSOS COMPARTIDOS ---
+cartera = elegir_cartera()
+libro_bvc = obtener_libro(BVC, cartera)
+libro_intl = obtener_libro(INTL, cartera)
+
+def tickers_del_libro(df):
+    return df["Ticker"].dropna().astype(str).unique().tolist() if not df.empty else []
+
+@medido("Precios BVC", cache=True)
+@st.cache_data(ttl=300)
+def cargar_precios_bvc():
+    fallo_de_cache("Precios BVC")
+    return leer_precios_bvc()
+
+# --- CÁLCULOS DERIVADOS (memorizados por contenido, ver recursos.derivar) ---
+def calcular_posiciones(df_bvc, df_intl, precios_bvc, precios_intl, tasas, tasa_hoy, metodo):
+    return posiciones_consolidadas({BVC: df_bvc, INTL: df_intl}, {BVC.nombre: precios_bvc, INTL.nombre: precios_intl},
+                                   tasas, tasa_hoy, metodo)
+
+def figuras_distribucion(df_pos, df_mercados):
+    # plotly se importa aquí: los KPIs de arriba ya están en pantalla mientras carga.
+    import plotly.express as px
+    df_valor = df_pos[df_pos["Valor $"] > 0.01]
+    if df_valor.empty:
+        return None
+    return (px.pie(df_mercados.reset_index(), values="Valor $", names="Mercado", hole=0.4),
+            px.sunburst(df_valor, path=["Mercado", "Ticker"], values="Valor $"))
+
+# --- INTERFAZ PRINCIPAL ---
+st.title("🌐 Patrimonio Consolidado")
+st.markdown("---")
+
+# Todas las fuentes a la vez; las cotizaciones esperan al libro internacional (necesitan sus tickers).
+datos = cargar_pagina({
+    "BCV": obtener_tasa_bcv,
+    "Tasas": lambda: obtener_historial_tasas().serie(),
+    "Portafolio BVC": medido("Portafolio BVC")(lambda: cargar_operaciones(libro_bvc, BVC)),
+    "Portafolio INTL": medido("Portafolio INTL")(lambda: cargar_operaciones(libro_intl, INTL)),
+    "Precios BVC": cargar_precios_bvc,
+    "Cotizaciones": (lambda df: obtener_precios_actuales(tickers_del_libro(df)), "Portafolio INTL"),
+}, timeouts={"BCV": 6}, defectos={
+    "Portafolio BVC": pd.DataFrame(columns=list(BVC.columnas)),
+    "Portafolio INTL": pd.DataFrame(columns=list(INTL.columnas)),
+    "Precios BVC": {}, "Cotizaciones": {},
+})
+
+lectura_bcv = datos["BCV"]
+tasa_hoy = lectura_bcv.tasa if lectura_bcv else 0.0
+if tasa_hoy == 0:
+    tasa_hoy = st.number_input("⚠️ BCV Offline. Tasa Manual:", value=60.0)
+else:
+    st.caption(f"Tasa BCV: Bs. {tasa_hoy} · {texto_antiguedad(lectura_bcv)}")
+actualizar_bitacora_tasas(lectura_bcv)
+
+df_bvc, df_intl = datos["Portafolio BVC"], datos["Portafolio INTL"]
+precios_bvc, precios_intl = datos["Precios BVC"], datos["Cotizaciones"]
+tasas = datos["Tasas"]
+
+metodo_costo = st.sidebar.radio("Método de costo:", ["FIFO", "Promedio"], horizontal=True)
+# Se recalcula solo si cambió alguno de los libros, los precios, las tasas o el método.
+with medir("Cálculos"):
+    d_pos = derivar("Posiciones", calcular_posiciones, df_bvc, df_intl, precios_bvc, precios_intl, tasas, tasa_hoy,
+                    metodo_costo)
+    df_pos = d_pos.valor
+
+if df_pos.empty:
+    st.info("Todavía no hay operaciones en ninguno de los dos portafolios.")
+else:
+    d_mercados = derivar("Por mercado", resumen_por_mercado, d_pos)
+    df_mercados = d_mercados.valor
+    total = df_mercados.sum()
+    rent = (total["No Realizada $"] / total["Costo $"] * 100) if total["Costo $"] != 0 else 0
+
+    st.markdown("### 💰 Patrimonio Total")
+    st.markdown("##### 💵 Referencia en Divisas")
+    k1, k2, k3, k4 = st.columns(4)
+    k1.metric("Patrimonio ($)", f"${total['Valor $']:,.2f}")
+    k2.metric("Ganancia No Realizada ($)", f"${total['No Realizada $']:,.2f}", delta=f"{rent:.2f}%")
+    k3.metric("Ganancia Realizada ($)", f"${total['Realizada $']:,.2f}")
+    k4.metric("Costo Abierto ($)", f"${total['Costo $']:,.2f}")
+
+    st.markdown("##### 🇻🇪 Referencia en Bolívares")
+    b1, b2, b3, b4 = st.columns(4)
+    b1.metric("Patrimonio (Bs)", f"Bs. {total['Valor Bs']:,.2f}")
+    b2.metric("Ganancia No Realizada (Bs)", f"Bs. {total['No Realizada Bs']:,.2f}")
+    b3.metric("Ganancia Realizada (Bs)", f"Bs. {total['Realizada Bs']:,.2f}")
+    b4.metric("Costo Abierto (Bs)", f"Bs. {total['Costo Bs']:,.2f}")
+
+    st.divider()
+    tab1, tab2, tab3 = st.tabs(["📈 Distribución", "🏦 Por Mercado", "📋 Detalle"])
+
+    with tab1, medir("Gráficos"):
+        figuras = derivar("Figuras", figuras_distribucion, d_pos, d_mercados).valor
+        c1, c2 = st.columns(2)
+        if figuras is not None:
+            c1.plotly_chart(figuras[0], use_container_width=True)
+            c2.plotly_chart(figuras[1], use_container_width=True)
+        else: c1.info("Sin valor positivo.")
+
+    with tab2:
+        st.dataframe(df_mercados, use_container_width=True, column_config={
+            "Costo $": st.column_config.NumberColumn(format="$%,.2f"), "Costo Bs": st.column_config.NumberColumn(format="Bs.%,.2f"),
+            "Valor $": st.column_config.NumberColumn(format="$%,.2f"), "Valor Bs": st.column_config.NumberColumn(format="Bs.%,.2f"),
+            "No Realizada $": st.column_config.NumberColumn(format="$%,.2f"), "No Realizada Bs": st.column_config.NumberColumn(format="Bs.%,.2f"),
+            "Realizada $": st.column_config.NumberColumn(format="$%,.2f"), "Realizada Bs": st.column_config.NumberColumn(format="Bs.%,.2f"),
+            "Peso %": st.column_config.NumberColumn(format="%.2f%%")
+        })
+
+    with tab3:
+        st.dataframe(df_pos, use_container_width=True, hide_index=True, column_config={
+            "Cantidad": st.column_config.NumberColumn(format="%,.4f"), "Precio": st.column_config.NumberColumn(format="%,.2f"),
+            "Costo $": st.column_config.NumberColumn(format="$%,.2f"), "Costo Bs": st.column_config.NumberColumn(format="Bs.%,.2f"),
+            "Valor $": st.column_config.NumberColumn(format="$%,.2f"), "Valor Bs": st.column_config.NumberColumn(format="Bs.%,.2f"),
+            "No Realizada $": st.column_config.NumberColumn(format="$%,.2f"), "No Realizada Bs": st.column_config.NumberColumn(format="Bs.%,.2f"),
+            "Realizada $": st.column_config.NumberColumn(format="$%,.2f"), "Realizada Bs": st.column_config.NumberColumn(format="Bs.%,.2f")
+        })
+
+mostrar_tiempos_carga()
+mostrar_panel_medicion()
@@ -1,14 +1,16 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import yfinance as yf
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
-from streamlit_gsheets import GSheetsConnection
+from nucleo import (INTL, HistorialPrecios, atribuir, cargar_operaciones, casar_lotes, normalizar_operaciones,
+                    resumen_posiciones, texto_antiguedad)
+from recursos import (actualizar_bitacora_tasas, buscar_tasa_en_bitacora, cargar_pagina, derivar, elegir_cartera,
+                      guardar_operacion, importador_operaciones, iniciar_medicion, medido, medir, motor_curva,
+                      mostrar_panel_medicion, mostrar_tiempos_carga, obtener_historial_tasas, obtener_libro, obtener_precios_actuales,
+                      obtener_tasa_bcv, panel_atribucion, panel_riesgo, tabla_paginada)
 
 # --- CONFIGURACIÓN DE PÁGINA ---
 st.set_page_config(page_title="Wall St. Portfolio", page_icon="🇺🇸", layout="wide")
+iniciar_medicion("INTL")
 
 # Estilos CSS
 st.markdown("""
@@ -19,136 +21,102 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- CONEXIÓN GOOGLE SHEETS ---
-conn = st.connection("gsheets", type=GSheetsConnection)
+# Conexión, robot BCV, cotizaciones y bitácora de tasas son los de recursos.py (compartidos con la página de la BVC).
+cartera = elegir_cartera()
+libro = obtener_libro(INTL, cartera)
 
-# --- ROBOT BCV ---
-@st.cache_data(ttl=3600)
-def obtener_tasa_bcv_hoy():
-    try:
-        r = requests.get("https://www.bcv.org.ve/", verify=False, timeout=5)
-        soup = BeautifulSoup(r.content, "html.parser")
-        return float(soup.find("div", {"id": "dolar"}).find("strong").text.strip().replace(',', '.'))
-    except:
-        return 0.0
+@medido("Portafolio")
+def cargar_datos():
+    return cargar_operaciones(libro, INTL)
 
-# --- FUNCIONES DE MEMORIA (BITÁCORA) ---
-def actualizar_bitacora_tasas(tasa_actual):
-    if tasa_actual <= 0: return 
+@st.cache_resource
+def obtener_historial_precios():
+    # Velas diarias en disco: cambiar de rango o volver a un ticker no descarga nada.
+    return HistorialPrecios()
+
+@medido("Historial de precios")
+def obtener_historial(ticker, periodo):
     try:
-        try:
-            df_hist = conn.read(worksheet="Historial_Tasas", ttl=0)
-            df_hist["Fecha"] = pd.to_datetime(df_hist["Fecha"])
-        except:
-            df_hist = pd.DataFrame(columns=["Fecha", "Tasa"])
-        
-        hoy = datetime.now().date()
-        fechas_registradas = df_hist["Fecha"].dt.date.tolist() if not df_hist.empty else []
-        
-        if hoy not in fechas_registradas:
-            nuevo = pd.DataFrame([{"Fecha": pd.to_datetime(hoy), "Tasa": tasa_actual}])
-            df_up = pd.concat([df_hist, nuevo], ignore_index=True)
-            df_up["Fecha"] = df_up["Fecha"].dt.strftime('%Y-%m-%d')
-            conn.update(worksheet="Historial_Tasas", data=df_up)
+        return obtener_historial_precios().periodo(ticker, periodo)
     except:
-        pass 
+        return pd.DataFrame()
 
-def buscar_tasa_en_bitacora(fecha_buscada):
+def curva_portafolio(df_ops):
+    """Valor diario del portafolio. El motor vive en la sesión y solo recibe las operaciones nuevas."""
+    ops = pd.DataFrame({
+        "Fecha": df_ops["Fecha"], "Ticker": df_ops["Ticker"], "Cantidad": df_ops["Cantidad"],
+        "Monto $": df_ops["Costo Total $"], "Monto Bs": df_ops["Costo Total Bs"]
+    })
+    motor = motor_curva(libro, ops, "USD")
     try:
-        df_hist = conn.read(worksheet="Historial_Tasas", ttl=600)
-        df_hist["Fecha"] = pd.to_datetime(df_hist["Fecha"]).dt.date
-        fila = df_hist[df_hist["Fecha"] == fecha_buscada]
-        if not fila.empty: return float(fila.iloc[0]["Tasa"])
+        motor.fijar_precios(obtener_historial_precios().cierres(motor.tickers, motor.inicio))
     except: pass
-    return None
+    motor.fijar_tasas(obtener_historial_tasas().serie())
+    motor.extender_hasta(datetime.now())
+    return motor.curva()
 
-# --- FUNCIONES DE DATOS BLINDADAS (AQUÍ ESTÁ EL ARREGLO) ---
-def cargar_datos():
-    try:
-        # 1. Leemos la hoja
-        df = conn.read(worksheet="Portafolio_INTL", ttl=0)
-        
-        # 2. LIMPIEZA CRÍTICA: Eliminar filas que estén completamente vacías
-        df = df.dropna(how='all')
-        
-        # 3. Conversión de Fecha (Con corrección de errores)
-        if "Fecha" in df.columns:
-            df["Fecha"] = pd.to_datetime(df["Fecha"], errors='coerce')
-            df = df.dropna(subset=["Fecha"])
-            
-        # 4. LIMPIEZA NUMÉRICA (CRUCIAL PARA QUE NO DESAPAREZCA EL DASHBOARD)
-        # Convertimos forzosamente estas columnas a números.
-        # Si Google manda texto, esto lo arregla.
-        cols_nums = ["Cantidad", "Precio", "Tasa"]
-        for col in cols_nums:
-            if col in df.columns:
-                # Truco: Convertir a string, cambiar coma por punto (por si acaso), y luego a número
-                df[col] = df[col].astype(str).str.replace(',', '.')
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0.0)
-                
-        return df
-    except Exception as e:
-        # Si falla, devolvemos DataFrame vacío pero con las columnas correctas
-        return pd.DataFrame(columns=["Ticker", "Cantidad", "Precio", "Fecha", "Tipo", "Tasa"])
+# --- CÁLCULOS DERIVADOS (memorizados por contenido, ver recursos.derivar) ---
+def casar(df_portafolio, metodo):
+    # Costo de lo que sigue abierto casando ventas contra compras (cada lote con su tasa).
+    return casar_lotes(normalizar_operaciones(df_portafolio, INTL), "USD", metodo)
 
-def obtener_precios_actuales(lista_tickers):
-    if not lista_tickers: return {}
-    try:
-        datos = yf.download(lista_tickers, period="1d", progress=False)['Close']
-        precios = {}
-        if len(lista_tickers) == 1:
-            val = datos.iloc[-1]
-            precios[lista_tickers[0]] = float(val)
-        else:
-            current = datos.iloc[-1]
-            for tick in lista_tickers:
-                if tick in current: precios[tick] = float(current[tick])
-        return precios
-    except:
-        return {}
+# Lo que sigue parte de los lotes ya casados: con la tasa nueva del día no se vuelve a recorrer el libro.
+def calcular_posiciones(casado, precios, tasa):
+    df_posiciones = resumen_posiciones(casado, precios, tasa)
+    df_final = df_posiciones[df_posiciones["Cantidad"] > 0.00001].rename(columns={
+        "Costo $": "Costo Total $", "Costo Bs": "Costo Total Bs", "Precio $": "Precio Actual $",
+        "Valor $": "Valor Hoy $", "Valor Bs": "Valor Hoy Bs", "No Realizada $": "Ganancia $", "No Realizada Bs": "Ganancia Bs"
+    })
+    return df_posiciones, df_final
 
-def guardar_operacion(ticker, cantidad, precio, fecha, tipo, tasa_historica):
-    try:
-        df_actual = cargar_datos()
-        
-        qty_final = cantidad if tipo == "Compra" else -cantidad
-        
-        nuevo = pd.DataFrame([{
-            "Ticker": ticker.upper(),
-            "Cantidad": qty_final,
-            "Precio": precio,
-            "Fecha": pd.to_datetime(fecha),
-            "Tipo": tipo,
-            "Tasa": tasa_historica
-        }])
-        
-        if df_actual.empty:
-            df_updated = nuevo
-        else:
-            if "Tasa" not in df_actual.columns:
-                df_actual["Tasa"] = 0.0
-            df_updated = pd.concat([df_actual, nuevo], ignore_index=True)
-        
-        df_updated["Fecha"] = pd.to_datetime(df_updated["Fecha"])
-        df_updated["Fecha"] = df_updated["Fecha"].dt.strftime('%Y-%m-%d')
-        
-        conn.update(worksheet="Portafolio_INTL", data=df_updated)
-        st.cache_data.clear()
-        return True, "Éxito"
-        
-    except Exception as e:
-        return False, str(e)
+def calcular_kpis(posiciones):
+    df_posiciones, df_final = posiciones
+    return (df_final["Valor Hoy $"].sum(), df_final["Ganancia $"].sum(), df_final["Costo Total $"].sum(),
+            df_final["Valor Hoy Bs"].sum(), df_final["Ganancia Bs"].sum(), df_final["Costo Total Bs"].sum(),
+            df_posiciones["Realizada $"].sum(), df_posiciones["Realizada Bs"].sum())
+
+def figuras_distribucion(posiciones):
+    # plotly se importa aquí: los KPIs de arriba ya están en pantalla mientras carga.
+    import plotly.express as px
+    df_final = posiciones[1]
+    fig_pie = None
+    if df_final["Valor Hoy $"].sum() > 0:
+        fig_pie = px.pie(df_final, values='Valor Hoy $', names='Ticker', hole=0.4)
+        fig_pie.update_layout(margin=dict(t=0, b=0, l=0, r=0))
+    fig_bar = px.bar(df_final, x='Ticker', y='Ganancia $', color='Ganancia $', color_continuous_scale="RdBu")
+    fig_bar.update_layout(margin=dict(t=0, b=0, l=0, r=0))
+    return fig_pie, fig_bar
 
 # --- INTERFAZ PRINCIPAL ---
 st.title("🌎 Mi Portafolio Internacional")
 st.markdown("---")
 
-# 1. Tasa de Hoy y Bitácora
-tasa_hoy = obtener_tasa_bcv_hoy()
+def precios_riesgo(tickers, inicio):
+    try:
+        return obtener_historial_precios().cierres(tickers, inicio)
+    except:
+        return pd.DataFrame()
+
+def tickers_del_libro(df):
+    return df["Ticker"].dropna().astype(str).unique().tolist() if not df.empty else []
+
+# 1. Todas las fuentes a la vez. Las cotizaciones esperan al libro (necesitan sus tickers).
+datos = cargar_pagina({
+    "BCV": obtener_tasa_bcv,
+    "Historial_Tasas": obtener_historial_tasas,
+    "Portafolio": cargar_datos,
+    "Cotizaciones": (lambda df: obtener_precios_actuales(tickers_del_libro(df)), "Portafolio"),
+}, timeouts={"BCV": 6}, defectos={"Portafolio": pd.DataFrame(columns=list(INTL.columnas)), "Cotizaciones": {}})
+
+lectura_bcv = datos["BCV"]
+tasa_hoy = lectura_bcv.tasa if lectura_bcv else 0.0
 if tasa_hoy == 0:
     tasa_hoy = st.number_input("⚠️ BCV Offline. Tasa Manual:", value=60.0)
+else:
+    st.caption(f"Tasa BCV: Bs. {tasa_hoy} · {texto_antiguedad(lectura_bcv)}")
 
-actualizar_bitacora_tasas(tasa_hoy)
-df_portafolio = cargar_datos()
+actualizar_bitacora_tasas(lectura_bcv)
+df_portafolio = datos["Portafolio"]
 
 # --- BARRA LATERAL ---
 with st.sidebar:
@@ -192,7 +160,7 @@ with st.sidebar:
                 st.error("Fondos insuficientes.")
             else:
                 with st.spinner("Guardando en Google Sheets..."):
-                    exito, mensaje = guardar_operacion(ticker_in, cant_in, prec_in, fecha_in, tipo, tasa_in)
+                    exito, mensaje = guardar_operacion(libro, INTL, ticker_in, cant_in, prec_in, fecha_in, tasa_in, tipo)
                 
                 if exito:
                     st.success("¡Guardado correctamente!")
@@ -201,6 +169,9 @@ with st.sidebar:
                     st.error(f"❌ Error crítico: {mensaje}")
                     st.info("Revisa permisos del robot.")
 
+    # Muchas operaciones de una vez (extracto del broker), en una sola escritura.
+    importador_operaciones(libro, INTL, df_portafolio)
+
 # --- DATOS Y DASHBOARD ---
 if not df_portafolio.empty:
     # Aseguramos que existan columnas numéricas (doble check)
@@ -210,31 +181,23 @@ if not df_portafolio.empty:
     df_portafolio["Costo Total $"] = df_portafolio["Cantidad"] * df_portafolio["Precio"]
     df_portafolio["Costo Total Bs"] = df_portafolio["Costo Total $"] * df_portafolio["Tasa"]
     
-    df_agrupado = df_portafolio.groupby("Ticker").agg({
-        "Cantidad": "sum", "Costo Total $": "sum", "Costo Total Bs": "sum"
-    }).reset_index()
-    
-    df_final = df_agrupado[df_agrupado["Cantidad"] > 0.00001].copy()
-    
-    precios_live = obtener_precios_actuales(df_final["Ticker"].tolist())
-    
-    df_final["Precio Actual $"] = df_final["Ticker"].map(precios_live).fillna(0.0)
-    df_final["Valor Hoy $"] = df_final["Cantidad"] * df_final["Precio Actual $"]
-    df_final["Valor Hoy Bs"] = df_final["Valor Hoy $"] * tasa_hoy
-    df_final["Ganancia $"] = df_final["Valor Hoy $"] - df_final["Costo Total $"]
-    df_final["Ganancia Bs"] = df_final["Valor Hoy Bs"] - df_final["Costo Total Bs"]
+    # Cada derivado se recalcula solo si cambió el libro, las cotizaciones, la tasa o el método.
+    with medir("Cálculos"):
+        metodo_costo = st.sidebar.radio("Método de costo:", ["FIFO", "Promedio"], horizontal=True)
+        d_casado = derivar("Casado", casar, df_portafolio, metodo_costo)
+        d_posiciones = derivar("Posiciones", calcular_posiciones, d_casado, datos["Cotizaciones"], tasa_hoy)
+        df_posiciones, df_final = d_posiciones.valor
+        total_usd, ganancia_usd, invertido_usd, total_bs, ganancia_bs, invertido_bs, realizada_usd, realizada_bs = derivar(
+            "KPIs", calcular_kpis, d_posiciones).valor
 
     # TABS
-    t1, t2, t3 = st.tabs(["📊 Portafolio", "🔍 Buscador", "📅 Reportes"])
+    t1, t2, t3, t4, t5 = st.tabs(["📊 Portafolio", "🔍 Buscador", "📅 Reportes", "💱 Precio vs. tasa", "⚠️ Riesgo"])
 
     # --- TAB 1: PORTAFOLIO (ESTILO VISUAL PRO) ---
     with t1:
         st.markdown("### 💰 Estado de Cuenta")
         
         st.markdown("##### 💵 Referencia en Divisas")
-        total_usd = df_final["Valor Hoy $"].sum()
-        ganancia_usd = df_final["Ganancia $"].sum()
-        invertido_usd = df_final["Costo Total $"].sum()
         rentabilidad_total = (ganancia_usd / invertido_usd * 100) if invertido_usd != 0 else 0
         
         k1, k2, k3, k4 = st.columns(4)
@@ -244,30 +207,23 @@ if not df_portafolio.empty:
         k4.metric("Rentabilidad", f"{rentabilidad_total:.2f}%")
         
         st.markdown("##### 🇻🇪 Referencia en Bolívares")
-        total_bs = df_final["Valor Hoy Bs"].sum()
-        ganancia_bs = df_final["Ganancia Bs"].sum()
-        invertido_bs = df_final["Costo Total Bs"].sum()
-        
         b1, b2, b3, b4 = st.columns(4)
         b1.metric("Valor Cartera (Bs)", f"Bs. {total_bs:,.2f}")
         b2.metric("Ganancia Neta (Bs)", f"Bs. {ganancia_bs:,.2f}", delta_color="normal")
         b3.metric("Total Invertido (Bs)", f"Bs. {invertido_bs:,.2f}")
-        b4.write("")
+        b4.metric("Ganancia Realizada (Bs)", f"Bs. {realizada_bs:,.2f}", help=f"${realizada_usd:,.2f} en divisas ({metodo_costo})")
         
         st.divider()
         subtab_graficos, subtab_detalle = st.tabs(["📈 Distribución", "📋 Detalle"])
         
-        with subtab_graficos:
+        with subtab_graficos, medir("Gráficos"):
+            fig_pie, fig_bar = derivar("Figuras", figuras_distribucion, d_posiciones).valor
             col_pie, col_bar = st.columns(2)
-            if total_usd > 0:
-                fig_pie = px.pie(df_final, values='Valor Hoy $', names='Ticker', hole=0.4)
-                fig_pie.update_layout(margin=dict(t=0, b=0, l=0, r=0))
+            if fig_pie is not None:
                 col_pie.plotly_chart(fig_pie, use_container_width=True)
             else:
                 col_pie.info("Sin datos.")
             
-            fig_bar = px.bar(df_final, x='Ticker', y='Ganancia $', color='Ganancia $', color_continuous_scale="RdBu")
-            fig_bar.update_layout(margin=dict(t=0, b=0, l=0, r=0))
             col_bar.plotly_chart(fig_bar, use_container_width=True)
             
         with subtab_detalle:
@@ -275,21 +231,21 @@ if not df_portafolio.empty:
                 "Ticker", "Cantidad", 
                 "Precio Actual $", "Valor Hoy $", "Ganancia $",
                 "Valor Hoy Bs", "Ganancia Bs"
-            ]].style.format({
-                "Cantidad": "{:.4f}",
-                "Precio Actual $": "${:.2f}",
-                "Valor Hoy $": "${:.2f}",
-                "Ganancia $": "${:.2f}",
-                "Valor Hoy Bs": "Bs.{:,.2f}",
-                "Ganancia Bs": "Bs.{:,.2f}"
-            }), use_container_width=True)
+            ]], use_container_width=True, column_config={
+                "Cantidad": st.column_config.NumberColumn(format="%.4f"),
+                "Precio Actual $": st.column_config.NumberColumn(format="$%.2f"),
+                "Valor Hoy $": st.column_config.NumberColumn(format="$%.2f"),
+                "Ganancia $": st.column_config.NumberColumn(format="$%.2f"),
+                "Valor Hoy Bs": st.column_config.NumberColumn(format="Bs.%,.2f"),
+                "Ganancia Bs": st.column_config.NumberColumn(format="Bs.%,.2f")
+            })
 
     with t2:
         col_s, col_p = st.columns([3, 1])
         with col_s: search = st.text_input("🔍 Buscar:", key="search_box").upper()
         with col_p: per = st.selectbox("Rango:", ["1mo", "6mo", "1y", "5y"], index=2)
         if search:
-            hist = yf.Ticker(search).history(period=per)
+            hist = obtener_historial(search, per)
             if not hist.empty:
                 curr = hist["Close"].iloc[-1]
                 st.metric(f"{search}", f"${curr:,.2f}", f"Bs.{curr*tasa_hoy:,.2f}")
@@ -311,6 +267,13 @@ if not df_portafolio.empty:
             
         df_filtrado = df_hist[df_hist["Fecha"] >= fecha_inicio]
         
+        if st.toggle("📈 Ver evolución del portafolio"):
+            with st.spinner("Calculando evolución..."), medir("Curva"):
+                curva = curva_portafolio(df_portafolio)
+            curva = curva[curva.index >= fecha_inicio]
+            moneda_curva = st.radio("Moneda:", ["$", "Bs"], horizontal=True, key="moneda_curva")
+            st.line_chart(curva[[f"Valor {moneda_curva}", f"Invertido {moneda_curva}"]])
+        
         if not df_filtrado.empty:
             df_compras = df_filtrado[df_filtrado["Tipo"] == "Compra"].copy()
             
@@ -343,16 +306,28 @@ if not df_portafolio.empty:
                 st.info(f"No realizaste nuevas compras en {periodo_selec}.")
             
             st.write("📜 **Detalle de Movimientos**")
-            st.dataframe(df_filtrado.sort_values("Fecha", ascending=False)[[
-                "Fecha", "Ticker", "Tipo", "Cantidad", "Precio", "Tasa", "Costo Total $"
-            ]].style.format({
-                "Precio": "${:.2f}",
-                "Tasa": "Bs.{:.2f}",
-                "Costo Total $": "${:.2f}",
-                "Fecha": "{:%Y-%m-%d}"
-            }), use_container_width=True)
+            tabla_paginada(df_filtrado[["Fecha", "Ticker", "Tipo", "Cantidad", "Precio", "Tasa", "Costo Total $"]],
+                           "movimientos", columna_fecha="Fecha", orden="Fecha", column_config={
+                "Precio": st.column_config.NumberColumn(format="$%.2f"),
+                "Tasa": st.column_config.NumberColumn(format="Bs.%.2f"),
+                "Costo Total $": st.column_config.NumberColumn(format="$%.2f"),
+                "Fecha": st.column_config.DateColumn(format="YYYY-MM-DD")
+            })
         else:
             st.warning("No hay registros en este periodo.")
 
+    # --- TAB 4: GANANCIA POR PRECIO Y POR TASA ---
+    with t4:
+        panel_atribucion("atribucion_intl", derivar("Atribución", atribuir, d_casado, datos["Cotizaciones"], tasa_hoy))
+
+    # --- TAB 5: RIESGO (volatilidad, drawdown, VaR y correlación con los cierres diarios) ---
+    with t5:
+        st.subheader("⚠️ Riesgo del Portafolio")
+        cantidades = dict(zip(df_final["Ticker"], df_final["Cantidad"]))
+        panel_riesgo("riesgo_intl", cantidades, lambda inicio: precios_riesgo(list(cantidades), inicio), "USD")
+
 else:
     st.info("👈 Registra tu primera operación.")
+
+mostrar_tiempos_carga()
+mostrar_panel_medicion()
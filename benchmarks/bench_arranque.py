@@ -0,0 +1,79 @@
+"""Tiempo de arranque: imports en frío y primera ejecución / rerun de cada página.
+
+Uso: python benchmarks/bench_arranque.py [operaciones]
+Cada medición corre en un proceso nuevo para que los imports sean en frío.
+Las páginas se ejecutan con ``streamlit.testing`` contra las hojas CSV
+de ``sinteticos`` (INVERSIONES_HOJAS_LOCALES) y una tasa BCV ya guardada, así que
+no hace falta red.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import sinteticos
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+PAGINAS = ["Dashboard.py", "Dashboard_INTL.py", "Dashboard_Consolidado.py"]
+MODULOS = ["pandas", "streamlit", "nucleo", "plotly.express", "streamlit_gsheets", "yfinance"]
+PESADOS = ["plotly.express", "yfinance", "gspread", "streamlit_gsheets", "requests", "lxml"]
+
+
+def en_proceso_nuevo(codigo, env=None):
+    salida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True,
+                            env={**os.environ, **(env or {})}, check=True)
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def medir_import(modulo):
+    return en_proceso_nuevo(
+        "import json, sys, time\n"
+        "t0 = time.perf_counter()\n"
+        f"import {modulo}\n"
+        "t = time.perf_counter() - t0\n"
+        f"print(json.dumps({{'t': t, 'cargados': [m for m in {PESADOS!r} if m in sys.modules]}}))")
+
+
+def medir_pagina(pagina, env):
+    # El robot BCV encuentra una tasa fresca en disco y no sale a la red.
+    return en_proceso_nuevo(
+        "import json, sys, time\n"
+        "from nucleo.bcv import TasaBCV\n"
+        "TasaBCV(descargar=lambda: {'USD': 36.5}).refrescar()\n"
+        "from streamlit.testing.v1 import AppTest\n"
+        "t0 = time.perf_counter()\n"
+        f"at = AppTest.from_file({os.path.join(RAIZ, pagina)!r}, default_timeout=120).run()\n"
+        "t_frio = time.perf_counter() - t0\n"
+        "t0 = time.perf_counter()\n"
+        "at.run()\n"
+        "t_rerun = time.perf_counter() - t0\n"
+        "errores = [str(e.value) for e in at.exception]\n"
+        f"print(json.dumps({{'frio': t_frio, 'rerun': t_rerun, 'errores': errores,"
+        f" 'cargados': [m for m in {PESADOS!r} if m in sys.modules]}}))", env)
+
+
+if __name__ == "__main__":
+    n_ops = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print("Imports en frío")
+    for modulo in MODULOS:
+        r = medir_import(modulo)
+        print(f"  {modulo:<20} {r['t'] * 1000:8.1f} ms   arrastra: {', '.join(r['cargados']) or '-'}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        hojas = os.path.join(tmp, "hojas")
+        os.makedirs(hojas)
+        sinteticos.escribir_hojas(hojas, n_ops)
+        print(f"Páginas ({n_ops} operaciones por libro)")
+        for pagina in PAGINAS:
+            env = {"INVERSIONES_HOJAS_LOCALES": hojas, "INVERSIONES_CACHE": os.path.join(tmp, f"cache_{pagina}")}
+            t0 = time.perf_counter()
+            r = medir_pagina(pagina, env)
+            total = time.perf_counter() - t0
+            print(f"  {pagina:<24} proceso {total * 1000:7.0f} ms   primera ejecución {r['frio'] * 1000:7.0f} ms"
+                  f"   rerun {r['rerun'] * 1000:6.0f} ms")
+            print(f"  {'':<24} cargados: {', '.join(r['cargados']) or '-'}")
+            if r["errores"]:
+                print(f"  {'':<24} ERRORES: {r['errores']}")
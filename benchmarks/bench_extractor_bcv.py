@@ -0,0 +1,53 @@
+"""Compara el extractor incremental con el BeautifulSoup original.
+
+Uso: python benchmarks/bench_extractor_bcv.py [archivo.html ...]
+Sin argumentos usa las páginas guardadas en benchmarks/fixtures/.
+"""
+
+import glob
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from nucleo.extractor_bcv import extraer_tasa_dolar, extraer_tasas  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def original(html):
+    # Lo que hacía obtener_tasa_bcv() antes del extractor.
+    soup = BeautifulSoup(html, "html.parser")
+    return float(soup.find("div", {"id": "dolar"}).find("strong").text.strip().replace(',', '.'))
+
+
+def por_trozos(html, tam=16384):
+    # Simula la respuesta de requests.iter_content().
+    return extraer_tasas(html[i:i + tam] for i in range(0, len(html), tam))
+
+
+def medir(funcion, html, repeticiones=5):
+    veces = max(1, int(0.2 / max(timeit.timeit(lambda: funcion(html), number=1), 1e-6)))
+    return min(timeit.repeat(lambda: funcion(html), number=veces, repeat=repeticiones)) / veces
+
+
+def main(rutas):
+    for ruta in rutas:
+        with open(ruta, "rb") as f:
+            html = f.read()
+        assert original(html) == extraer_tasa_dolar(html)
+        print(f"{os.path.basename(ruta)} ({len(html) / 1024:.0f} KB)")
+        base = medir(original, html)
+        for nombre, funcion in [("bs4 html.parser", original),
+                                ("lxml solo USD", extraer_tasa_dolar),
+                                ("lxml todas", extraer_tasas),
+                                ("lxml por trozos", por_trozos)]:
+            t = base if funcion is original else medir(funcion, html)
+            print(f"  {nombre:<16} {t * 1000:8.3f} ms   x{base / t:5.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or sorted(glob.glob(os.path.join(FIXTURES, "bcv*.html"))))
@@ -0,0 +1,98 @@
+"""Mide el extractor de la BVC sobre las páginas guardadas y la consulta condicional.
+
+Uso: python benchmarks/bench_extractor_bvc.py [archivo.html ...]
+Sin argumentos usa benchmarks/fixtures/bvc*.html. Después sirve la primera
+página en un servidor local con ETag/Last-Modified y compara ``ClienteBVC``
+(sesión y 304) con un ``requests.get`` suelto por consulta. Que los precios
+y los 304 sean los correctos lo comprueba tests/test_resumen_bvc.py.
+"""
+
+import glob
+import os
+import sys
+import tempfile
+import threading
+import time
+import timeit
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pandas as pd  # noqa: E402
+import requests  # noqa: E402
+
+from nucleo.precios import tabla_precios_web  # noqa: E402
+from nucleo.resumen_bvc import ClienteBVC, extraer_precios_bvc  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def con_pandas(html):
+    # Lo mismo con pandas.read_html: todas las tablas a DataFrame y la primera con precios.
+    from io import StringIO
+    for df in pd.read_html(StringIO(html.decode("utf-8"))):
+        tabla = tabla_precios_web(df.astype(str))
+        if not tabla.empty:
+            return tabla
+    return tabla_precios_web(None)
+
+
+def medir(funcion, *args, repeticiones=5):
+    veces = max(1, int(0.2 / max(timeit.timeit(lambda: funcion(*args), number=1), 1e-6)))
+    return min(timeit.repeat(lambda: funcion(*args), number=veces, repeat=repeticiones)) / veces
+
+
+def servidor(html):
+    etag, modificada = f'"{hash(html) & 0xffffffff:x}"', formatdate(time.time() - 60, usegmt=True)
+    class Manejador(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if self.headers.get("If-None-Match") == etag or self.headers.get("If-Modified-Since") == modificada:
+                self.send_response(304)
+                cuerpo = b""
+            else:
+                self.send_response(200)
+                cuerpo = html
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", modificada)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, *args):
+            pass
+
+    s = ThreadingHTTPServer(("127.0.0.1", 0), Manejador)
+    threading.Thread(target=s.serve_forever, daemon=True).start()
+    return s, f"http://127.0.0.1:{s.server_port}/"
+
+
+def main(rutas):
+    for ruta in rutas:
+        with open(ruta, "rb") as f:
+            html = f.read()
+        print(f"{os.path.basename(ruta)} ({len(html) / 1024:.0f} KB, {len(extraer_precios_bvc(html))} precios)")
+        base = medir(con_pandas, html)
+        t = medir(extraer_precios_bvc, html)
+        print(f"  {'pandas.read_html':<18} {base * 1000:8.3f} ms")
+        print(f"  {'lxml':<18} {t * 1000:8.3f} ms   x{base / t:5.1f}")
+
+    with open(rutas[0], "rb") as f:
+        html = f.read()
+    s, url = servidor(html)
+    with tempfile.TemporaryDirectory() as carpeta:
+        cliente = ClienteBVC(url, ruta=os.path.join(carpeta, "precios_bvc.json"))
+        cliente.consultar()
+        t_cliente = medir(cliente.consultar)
+        t_suelto = medir(lambda: extraer_precios_bvc(requests.get(url, timeout=5).content))
+    s.shutdown()
+    print(f"consulta local de {os.path.basename(rutas[0])}")
+    print(f"  {'get suelto + lxml':<18} {t_suelto * 1000:8.3f} ms")
+    print(f"  {'ClienteBVC (304)':<18} {t_cliente * 1000:8.3f} ms   x{t_suelto / t_cliente:5.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or sorted(glob.glob(os.path.join(FIXTURES, "bvc*.html"))))
@@ -0,0 +1,76 @@
+"""Importación de un extracto del broker: lectura, validación y escritura en un solo lote.
+
+Uso: python benchmarks/bench_importacion.py [filas ...] [--latencia S]
+Por defecto extractos de 1.000, 10.000 y 50.000 filas (CSV con ';', fechas
+dd/mm/aaaa y precios '1.234,56', sin columna de tasa) contra un libro BVC
+de ``sinteticos`` en memoria. Se mide cada etapa y se cuentan los viajes a
+la hoja; el formulario de a una operación hace al menos dos por fila.
+"""
+
+import io
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import sinteticos  # noqa: E402
+from nucleo import (BVC, CacheLibro, HistorialTasas, LibroOperaciones, cargar_operaciones, leer_extracto,  # noqa: E402
+                    preparar_importacion, sugerir_mapeo)
+from nucleo.tasas import COLUMNAS_TASAS  # noqa: E402
+
+
+def extracto_csv(n, semilla=7):
+    """Extracto como lo bajaría alguien de su broker: otros nombres de columna, formato venezolano."""
+    ops = sinteticos.libro_bvc(n, semilla=semilla)
+    df = pd.DataFrame({
+        "Fecha": pd.to_datetime(ops["Fecha Compra"]).dt.strftime("%d/%m/%Y"), "Símbolo": ops["Ticker"],
+        "Operación": ops["Tipo"], "Títulos": ops["Cantidad"].abs().astype(int),
+        "Precio": sinteticos.formato_bvc(ops["Precio Operacion (Bs)"]),
+    })
+    archivo = io.BytesIO(df.to_csv(index=False, sep=";").encode("utf-8"))
+    archivo.name = "extracto.csv"
+    return archivo
+
+
+def medir(n, latencia):
+    conn = sinteticos.ConexionMemoria(sinteticos.hojas(1000), latencia)
+    with tempfile.TemporaryDirectory() as carpeta:
+        cache = CacheLibro(os.path.join(carpeta, "libro.sqlite"))
+        libro = LibroOperaciones(conn, BVC.hoja, BVC.columnas, cache=cache)
+        tasas = HistorialTasas(LibroOperaciones(conn, "Historial_Tasas", COLUMNAS_TASAS, cache=cache))
+        df_portafolio = cargar_operaciones(libro, BVC)
+        archivo = extracto_csv(n)
+        llamadas = sum(conn.llamadas.values())
+
+        tiempos = {}
+        t0 = time.perf_counter()
+        extracto = leer_extracto(archivo)
+        tiempos["leer"] = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        importacion = preparar_importacion(extracto, sugerir_mapeo(list(extracto.columns)), BVC, df_portafolio, tasas)
+        tiempos["validar"] = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        libro.anexar(importacion.filas)
+        tiempos["escribir"] = time.perf_counter() - t0
+        viajes = sum(conn.llamadas.values()) - llamadas
+    return tiempos, importacion, viajes
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    latencia = float(args[args.index("--latencia") + 1]) if "--latencia" in args else 0.0
+    valores = {args[i + 1] for i, a in enumerate(args) if a == "--latencia"}
+    tamanos = [int(a) for a in args if not a.startswith("--") and a not in valores] or [1000, 10000, 50000]
+
+    print(f"{'filas':>8} {'leer':>8} {'validar':>8} {'escribir':>9} {'total':>8} {'válidas':>8} {'errores':>8} "
+          f"{'tasas':>7} {'viajes':>6}")
+    for n in tamanos:
+        tiempos, importacion, viajes = medir(n, latencia)
+        total = sum(tiempos.values())
+        print(f"{n:>8,} {tiempos['leer']:8.2f} {tiempos['validar']:8.2f} {tiempos['escribir']:9.2f} {total:8.2f} "
+              f"{len(importacion.filas):>8,} {len(importacion.errores):>8,} {importacion.tasas_completadas:>7,} "
+              f"{viajes:>6}")
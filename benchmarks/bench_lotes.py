@@ -0,0 +1,63 @@
+"""Casado de lotes FIFO / costo promedio y rentabilidad por fila.
+
+Uso: python benchmarks/bench_lotes.py [operaciones] [tickers]
+Por defecto 100.000 operaciones y 200 tickers. Los casos calculados a mano
+están en tests/test_lotes.py.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from nucleo.lotes import casar_lotes, resumen_posiciones  # noqa: E402
+
+
+def datos_sinteticos(n_ops, n_tickers, semilla=0):
+    rng = np.random.default_rng(semilla)
+    tickers = rng.integers(0, n_tickers, n_ops)
+    cantidad = rng.integers(1, 100, n_ops).astype(float)
+    # Una de cada tres es venta, nunca mayor a lo acumulado del ticker.
+    acumulado = pd.Series(cantidad).groupby(tickers).cumsum().to_numpy()
+    venta = (rng.random(n_ops) < 0.33) & (acumulado > 2 * cantidad)
+    cantidad[venta] *= -1
+    ops = pd.DataFrame({
+        "Fecha": pd.Timestamp("2020-01-01") + pd.to_timedelta(np.arange(n_ops) // 50, unit="D"),
+        "Ticker": np.array([f"T{i:03d}" for i in range(n_tickers)])[tickers],
+        "Cantidad": cantidad,
+        "Precio": rng.uniform(5, 500, n_ops),
+        "Tasa": 36 * np.exp(np.arange(n_ops) * 1e-5),
+    })
+    precios = {f"T{i:03d}": 100.0 for i in range(n_tickers)}
+    return ops, precios
+
+
+def cronometrar(funcion):
+    t0 = time.perf_counter()
+    resultado = funcion()
+    return time.perf_counter() - t0, resultado
+
+
+if __name__ == "__main__":
+    n_ops, n_tickers = [int(a) for a in sys.argv[1:3]] + [100000, 200][len(sys.argv[1:3]):]
+    ops, precios = datos_sinteticos(n_ops, n_tickers)
+
+    t_fifo, fifo = cronometrar(lambda: casar_lotes(ops, "USD", "FIFO"))
+    t_prom, _ = cronometrar(lambda: casar_lotes(ops, "USD", "Promedio"))
+    t_resumen, _ = cronometrar(lambda: resumen_posiciones(fifo, precios, 60.0))
+
+    df = pd.DataFrame({"Ganancia ($)": ops["Cantidad"] * 3, "Inv. Total ($)": ops["Cantidad"] * ops["Precio"]})
+    t_apply, _ = cronometrar(lambda: df.apply(
+        lambda x: (x["Ganancia ($)"] / x["Inv. Total ($)"] * 100) if x["Inv. Total ($)"] != 0 else 0, axis=1))
+    t_vector, _ = cronometrar(lambda: (df["Ganancia ($)"] / df["Inv. Total ($)"] * 100).where(df["Inv. Total ($)"] != 0, 0))
+
+    print(f"{n_ops} operaciones, {n_tickers} tickers ({len(fifo.ventas)} ventas, {len(fifo.lotes)} lotes abiertos)")
+    print(f"  casar FIFO              {t_fifo * 1000:8.1f} ms")
+    print(f"  casar costo promedio    {t_prom * 1000:8.1f} ms")
+    print(f"  resumen por ticker      {t_resumen * 1000:8.1f} ms")
+    print(f"  Rentabilidad % (apply)  {t_apply * 1000:8.1f} ms")
+    print(f"  Rentabilidad % (vector) {t_vector * 1000:8.1f} ms")
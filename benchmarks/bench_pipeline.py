@@ -0,0 +1,209 @@
+"""Carga → cruce → KPIs → gráficos de los dos dashboards, sin red, por etapa.
+
+Uso: python benchmarks/bench_pipeline.py [operaciones ...] [--latencia S] [--repeticiones N] [--guardar]
+Por defecto libros de 1.000, 10.000 y 100.000 operaciones. Todo sale de
+``sinteticos``: Sheets en memoria, portada del BCV de fixtures y
+cotizaciones falsas; ``--latencia`` agrega esos segundos a cada viaje a la
+"red" para ver cuánto pesa la carga en paralelo.
+
+Cada etapa repite los pasos de la página (Dashboard.py o Dashboard_INTL.py)
+con las funciones de ``nucleo``; de cada una se toma el mínimo de las
+repeticiones. ``--guardar`` deja los resultados como línea base en
+benchmarks/resultados/pipeline_base.json; sin él, si hay línea base con
+la misma latencia, se compara contra ella (xN = N veces más rápido que la base).
+"""
+
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+import plotly.express as px
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import sinteticos  # noqa: E402
+from nucleo import (BVC, INTL, CacheLibro, HistorialTasas, LibroOperaciones, ServicioCotizaciones,  # noqa: E402
+                    TasaBCV, cargar_en_paralelo, cargar_operaciones, casar_lotes, normalizar_operaciones,
+                    resumen_posiciones, tabla_precios_mercado, tabla_precios_web)
+from nucleo.tasas import COLUMNAS_TASAS  # noqa: E402
+
+RUTA_BASE = os.path.join(os.path.dirname(__file__), "resultados", "pipeline_base.json")
+ETAPAS = ["carga en frío", "carga en caliente", "cruce", "kpis", "gráficos"]
+
+
+class Cronometro:
+    def __init__(self):
+        self.tiempos = {}
+
+    def medir(self, etapa, funcion):
+        t0 = time.perf_counter()
+        resultado = funcion()
+        self.tiempos[etapa] = time.perf_counter() - t0
+        return resultado
+
+
+def _graficos(df, valor, ganancia):
+    # Lo mismo que arma la pestaña de distribución, incluida la serialización que hace st.plotly_chart.
+    df_valor = df[df[valor] > 0.01]
+    torta = px.pie(df_valor, values=valor, names="Ticker", hole=0.4)
+    barras = px.bar(df, x="Ticker", y=ganancia, color=ganancia, color_continuous_scale="RdBu")
+    return len(torta.to_json()) + len(barras.to_json())
+
+
+def pipeline_bvc(conn, carpeta, tasa_bcv):
+    crono = Cronometro()
+    cache = CacheLibro(os.path.join(carpeta, "libro.sqlite"))
+    libro = LibroOperaciones(conn, BVC.hoja, BVC.columnas, cache=cache)
+    robot = TasaBCV(os.path.join(carpeta, "tasa_bcv.json"),
+                    descargar=sinteticos.descargar_bcv_falso(tasa_bcv, conn.latencia))
+
+    def precios_web():
+        tabla = tabla_precios_web(conn.read(worksheet="Precios_Web"))
+        return dict(zip(tabla["Ticker"], tabla["Precio Bs."]))
+
+    tareas = {
+        "BCV": robot.leer,
+        "Historial_Tasas": lambda: HistorialTasas(LibroOperaciones(conn, "Historial_Tasas", COLUMNAS_TASAS,
+                                                                   cache=cache)),
+        "Portafolio": lambda: cargar_operaciones(libro, BVC),
+        "Precios_Web": precios_web,
+    }
+    datos = crono.medir("carga en frío", lambda: cargar_en_paralelo(tareas))
+    datos = crono.medir("carga en caliente", lambda: cargar_en_paralelo(tareas))
+    df_portafolio = datos["Portafolio"].valor
+    tasa_hoy = datos["BCV"].valor.tasa
+    precios_mercado = tabla_precios_mercado(datos["Precios_Web"].valor, datos["Precios_Web"].valor)
+
+    def cruce():
+        # Mismo cálculo que el bloque "CÁLCULOS Y KPIs" de Dashboard.py.
+        df_final = df_portafolio.copy()
+        df_final["Precio Bs."] = df_final["Ticker"].map(precios_mercado["Precio Bs."])
+        df_final["Inv. Total (Bs)"] = df_final["Total Invertido (Bs)"]
+        df_final["Precio Bs."] = df_final["Precio Bs."].fillna(0)
+        df_final["Valor Hoy (Bs)"] = df_final["Cantidad"] * df_final["Precio Bs."]
+        df_final["Ganancia (Bs)"] = df_final["Valor Hoy (Bs)"] - df_final["Inv. Total (Bs)"]
+        df_final["Valor Hoy ($)"] = df_final["Valor Hoy (Bs)"] / tasa_hoy
+        df_final["Inv. Total ($)"] = df_final["Total Invertido ($)"]
+        df_final["Ganancia ($)"] = df_final["Valor Hoy ($)"] - df_final["Inv. Total ($)"]
+        df_final["Rentabilidad %"] = (df_final["Ganancia ($)"] / df_final["Inv. Total ($)"] * 100).where(
+            df_final["Inv. Total ($)"] != 0, 0)
+        lotes = casar_lotes(normalizar_operaciones(df_portafolio, BVC), "Bs", "FIFO")
+        return df_final, resumen_posiciones(lotes, precios_mercado["Precio Bs."].to_dict(), tasa_hoy)
+
+    df_final, df_lotes = crono.medir("cruce", cruce)
+    crono.medir("kpis", lambda: [df_final[c].sum() for c in ["Valor Hoy ($)", "Ganancia ($)", "Inv. Total ($)",
+                                                            "Valor Hoy (Bs)", "Ganancia (Bs)", "Inv. Total (Bs)"]]
+                + [df_lotes["Realizada Bs"].sum(), df_lotes["Realizada $"].sum()])
+    df_pos = df_final.groupby("Ticker")[["Valor Hoy ($)", "Ganancia ($)"]].sum().reset_index()
+    crono.medir("gráficos", lambda: _graficos(df_pos, "Valor Hoy ($)", "Ganancia ($)"))
+    return crono.tiempos
+
+
+def pipeline_intl(conn, carpeta, tasa_bcv):
+    crono = Cronometro()
+    cache = CacheLibro(os.path.join(carpeta, "libro.sqlite"))
+    libro = LibroOperaciones(conn, INTL.hoja, INTL.columnas, cache=cache)
+    robot = TasaBCV(os.path.join(carpeta, "tasa_bcv.json"),
+                    descargar=sinteticos.descargar_bcv_falso(tasa_bcv, conn.latencia))
+    servicio = ServicioCotizaciones(sinteticos.proveedor_cotizaciones(latencia=conn.latencia))
+
+    def tickers(df):
+        return df["Ticker"].dropna().astype(str).unique().tolist()
+
+    tareas = {
+        "BCV": robot.leer,
+        "Historial_Tasas": lambda: HistorialTasas(LibroOperaciones(conn, "Historial_Tasas", COLUMNAS_TASAS,
+                                                                   cache=cache)),
+        "Portafolio": lambda: cargar_operaciones(libro, INTL),
+        "Cotizaciones": (lambda df: servicio.precios(tickers(df)), "Portafolio"),
+    }
+    datos = crono.medir("carga en frío", lambda: cargar_en_paralelo(tareas))
+    datos = crono.medir("carga en caliente", lambda: cargar_en_paralelo(tareas))
+    df_portafolio = datos["Portafolio"].valor
+    tasa_hoy = datos["BCV"].valor.tasa
+    precios_live = datos["Cotizaciones"].valor
+
+    def cruce():
+        # Mismo cálculo que el bloque "DATOS Y DASHBOARD" de Dashboard_INTL.py.
+        df = df_portafolio.copy()
+        df["Costo Total $"] = df["Cantidad"] * df["Precio"]
+        df["Costo Total Bs"] = df["Costo Total $"] * df["Tasa"]
+        lotes = casar_lotes(normalizar_operaciones(df, INTL), "USD", "FIFO")
+        df_posiciones = resumen_posiciones(lotes, precios_live, tasa_hoy)
+        df_final = df_posiciones[df_posiciones["Cantidad"] > 0.00001].rename(columns={
+            "Costo $": "Costo Total $", "Costo Bs": "Costo Total Bs", "Precio $": "Precio Actual $",
+            "Valor $": "Valor Hoy $", "Valor Bs": "Valor Hoy Bs", "No Realizada $": "Ganancia $",
+            "No Realizada Bs": "Ganancia Bs"})
+        return df_posiciones, df_final
+
+    df_posiciones, df_final = crono.medir("cruce", cruce)
+    crono.medir("kpis", lambda: [df_final[c].sum() for c in ["Valor Hoy $", "Ganancia $", "Costo Total $",
+                                                            "Valor Hoy Bs", "Ganancia Bs", "Costo Total Bs"]]
+                + [df_posiciones["Realizada $"].sum(), df_posiciones["Realizada Bs"].sum()])
+    crono.medir("gráficos", lambda: _graficos(df_final, "Valor Hoy $", "Ganancia $"))
+    return crono.tiempos
+
+
+def medir(n_ops, latencia, repeticiones):
+    hojas = sinteticos.hojas(n_ops)
+    tasa_bcv = float(hojas["Historial_Tasas"]["Tasa"].iloc[-1])
+    # Una sola conexión por tamaño: nucleo.libro recuerda las hojas abiertas por id del cliente.
+    conn = sinteticos.ConexionMemoria(hojas, latencia)
+    resultados = {}
+    for nombre, pipeline in [("BVC", pipeline_bvc), ("INTL", pipeline_intl)]:
+        corridas = []
+        for _ in range(repeticiones):
+            with tempfile.TemporaryDirectory() as carpeta:
+                corridas.append(pipeline(conn, carpeta, tasa_bcv))
+        mejores = {etapa: min(c[etapa] for c in corridas) for etapa in ETAPAS}
+        mejores["total"] = sum(mejores[e] for e in ETAPAS if e != "carga en caliente")
+        resultados[nombre] = mejores
+    return resultados
+
+
+def imprimir(n_ops, resultados, base=None):
+    print(f"{n_ops:,} operaciones por libro")
+    for pagina, tiempos in resultados.items():
+        print(f"  {pagina}")
+        for etapa, t in tiempos.items():
+            linea = f"    {etapa:<18} {t * 1000:9.1f} ms"
+            anterior = (base or {}).get(str(n_ops), {}).get(pagina, {}).get(etapa)
+            if anterior:
+                linea += f"   base {anterior * 1000:9.1f} ms   x{anterior / t:5.2f}"
+            print(linea)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    latencia = float(args[args.index("--latencia") + 1]) if "--latencia" in args else 0.0
+    repeticiones = int(args[args.index("--repeticiones") + 1]) if "--repeticiones" in args else 3
+    guardar = "--guardar" in args
+    valores = {args[i + 1] for i, a in enumerate(args) if a in ("--latencia", "--repeticiones")}
+    tamanos = [int(a) for a in args if not a.startswith("--") and a not in valores] or [1000, 10000, 100000]
+
+    base = None
+    if not guardar and os.path.exists(RUTA_BASE):
+        with open(RUTA_BASE, encoding="utf-8") as f:
+            base = json.load(f)
+        if base.get("latencia") != latencia:
+            base = None
+
+    # La primera figura de plotly carga plantillas y validadores: no es parte de ningún rerun.
+    _graficos(pd.DataFrame({"Ticker": ["A"], "Valor": [1.0]}), "Valor", "Valor")
+    todos = {}
+    for n in tamanos:
+        todos[str(n)] = medir(n, latencia, repeticiones)
+        imprimir(n, todos[str(n)], base["resultados"] if base else None)
+
+    if guardar:
+        os.makedirs(os.path.dirname(RUTA_BASE), exist_ok=True)
+        with open(RUTA_BASE, "w", encoding="utf-8") as f:
+            json.dump({"fecha": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+                       "pandas": pd.__version__, "maquina": platform.machine(), "latencia": latencia,
+                       "repeticiones": repeticiones, "resultados": todos}, f, indent=2, ensure_ascii=False)
+        print(f"Línea base guardada en {RUTA_BASE}")
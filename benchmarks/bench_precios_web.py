@@ -0,0 +1,70 @@
+"""Limpieza de la hoja Precios_Web: bucle con iterrows contra nucleo.precios.
+
+Uso: python benchmarks/bench_precios_web.py [filas]
+Genera una hoja sintética con el formato de la BVC ("1.234,56") y el
+número de filas pedido (12.000 por defecto).
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from nucleo.precios import limpiar_precio_bvc, tabla_precios_web  # noqa: E402
+
+
+def hoja_sintetica(filas, semilla=0):
+    rng = np.random.default_rng(semilla)
+    precios = rng.lognormal(3, 2, filas)
+    texto = pd.Series(precios).map(lambda p: f"{p:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
+    texto[rng.random(filas) < 0.02] = ""
+    return pd.DataFrame({
+        "Nro": np.arange(1, filas + 1),
+        "Símbolo": [f"T{i:05d}.A" for i in range(filas)],
+        "Último Precio": texto,
+        "Variación": rng.normal(0, 2, filas).round(2),
+        "Volumen": rng.integers(0, 10**6, filas),
+    })
+
+
+def original(df_web):
+    # Bucle que usaba cargar_precios_web_full() antes de nucleo.precios.
+    df_web.columns = df_web.columns.str.strip()
+    col_ticker, col_precio = "Símbolo", "Último Precio"
+    dict_precios = {}
+    for _, row in df_web.iterrows():
+        tick = str(row[col_ticker]).strip().upper()
+        precio = limpiar_precio_bvc(row[col_precio])
+        if tick and tick != "NAN" and precio > 0:
+            dict_precios[tick] = precio
+    return dict_precios
+
+
+def vectorizado(df_web):
+    tabla = tabla_precios_web(df_web)
+    return dict(zip(tabla["Ticker"], tabla["Precio Bs."]))
+
+
+def medir(funcion, df, repeticiones=3):
+    tiempos = []
+    for _ in range(repeticiones):
+        copia = df.copy()
+        t0 = time.perf_counter()
+        resultado = funcion(copia)
+        tiempos.append(time.perf_counter() - t0)
+    return min(tiempos), resultado
+
+
+if __name__ == "__main__":
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 12000
+    df = hoja_sintetica(filas)
+    t_orig, r_orig = medir(original, df)
+    t_vec, r_vec = medir(vectorizado, df)
+    assert r_orig == r_vec, "Los resultados no coinciden"
+    print(f"Precios_Web sintética: {filas} filas, {len(r_vec)} precios válidos")
+    print(f"  iterrows     {t_orig * 1000:9.1f} ms")
+    print(f"  vectorizado  {t_vec * 1000:9.1f} ms   x{t_orig / t_vec:.0f}")
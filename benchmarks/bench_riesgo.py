@@ -0,0 +1,74 @@
+"""Análisis de riesgo sobre la matriz de retornos: NumPy vectorizado vs. pandas columna por columna.
+
+Uso: python benchmarks/bench_riesgo.py [tickers ...] [--anos N]
+Por defecto 20, 50 y 200 tickers con 10 años de cierres diarios sintéticos
+(con huecos: tickers que empiezan tarde y días sin cotización) y una
+bitácora de tasas con devaluación. "pandas" es el cálculo directo con
+``DataFrame.pct_change``, ``rolling().std()`` y ``DataFrame.corr``;
+"analizar_riesgo" hace lo mismo en $ y en Bs.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from nucleo import analizar_riesgo  # noqa: E402
+
+
+def datos(n, anos, semilla=7):
+    rng = np.random.default_rng(semilla)
+    fechas = pd.bdate_range(end=pd.Timestamp("2025-01-01"), periods=252 * anos)
+    retornos = rng.normal(0.0003, 0.02, (len(fechas), n)) + rng.normal(0, 0.01, (len(fechas), 1))
+    precios = pd.DataFrame(100 * np.exp(np.cumsum(retornos, axis=0)), index=fechas,
+                           columns=[f"T{i:03d}" for i in range(n)])
+    for i, col in enumerate(precios.columns[::7]):
+        precios.iloc[:(i * 37) % len(fechas), precios.columns.get_loc(col)] = np.nan
+    huecos = rng.random(precios.shape) < 0.01
+    precios = precios.mask(huecos)
+    dias = pd.date_range(fechas[0] - pd.Timedelta(days=30), fechas[-1])
+    tasas = pd.Series(4 * np.exp(np.cumsum(rng.normal(0.001, 0.004, len(dias)))), index=dias)
+    cantidades = {t: float(rng.integers(1, 500)) for t in precios.columns}
+    return precios, tasas, cantidades
+
+
+def con_pandas(precios, cantidades, ventana=63):
+    """Solo en $: retornos, portafolio, volatilidad móvil, drawdown, VaR y correlación."""
+    r = precios.ffill().pct_change(fill_method=None)
+    valores = precios.ffill().iloc[-1] * pd.Series(cantidades)
+    pesos = valores / valores.sum()
+    rp = (r * pesos).sum(axis=1) / r.notna().mul(pesos).sum(axis=1)
+    vol = rp.rolling(ventana).std() * np.sqrt(252)
+    indice = (1 + rp.fillna(0)).cumprod()
+    caida = indice / indice.cummax() - 1
+    return vol, caida, -rp.quantile(0.05), r.corr()
+
+
+def medir(funcion, repeticiones=3):
+    mejor = None
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        funcion()
+        t = time.perf_counter() - t0
+        mejor = t if mejor is None else min(mejor, t)
+    return mejor
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    anos = int(args[args.index("--anos") + 1]) if "--anos" in args else 10
+    valores = {args[i + 1] for i, a in enumerate(args) if a == "--anos"}
+    tamanos = [int(a) for a in args if not a.startswith("--") and a not in valores] or [20, 50, 200]
+
+    print(f"{'tickers':>8} {'días':>6} {'pandas ms':>10} {'riesgo ms':>10} {'dif. corr':>10}")
+    for n in tamanos:
+        precios, tasas, cantidades = datos(n, anos)
+        t_pandas = medir(lambda: con_pandas(precios, cantidades))
+        t_riesgo = medir(lambda: analizar_riesgo(precios, cantidades, tasas))
+        diferencia = np.nanmax(np.abs(con_pandas(precios, cantidades)[3].to_numpy()
+                                      - analizar_riesgo(precios, cantidades, tasas).correlacion.to_numpy()))
+        print(f"{n:>8} {len(precios):>6,} {t_pandas * 1000:10.1f} {t_riesgo * 1000:10.1f} {diferencia:10.1e}")
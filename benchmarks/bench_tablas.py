@@ -0,0 +1,63 @@
+"""Lo que cuesta mandar el detalle de operaciones al navegador: Styler completo vs. una página.
+
+Uso: python benchmarks/bench_tablas.py [operaciones ...]
+Por defecto libros de 1.000, 10.000 y 100.000 operaciones de ``sinteticos``.
+"Styler" es lo que hacía la pestaña Detalle: todo el libro con
+``.style.format`` (Streamlit formatea cada celda en Python y manda los
+textos además de los datos). "Página" es ``tabla_paginada``: filtro por
+ticker, orden por fecha y 50 filas con formato por ``column_config``.
+Se mide el armado del mensaje (``marshall_styler`` + Arrow), no el dibujo.
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+from streamlit.dataframe_util import convert_anything_to_arrow_bytes
+from streamlit.elements.lib.pandas_styler_utils import marshall_styler
+from streamlit.proto.ArrowData_pb2 import ArrowData
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import sinteticos  # noqa: E402
+from nucleo import filtrar_libro, paginar  # noqa: E402
+
+COLUMNAS = ["Tipo", "Ticker", "Cantidad", "Fecha Compra", "Precio Operacion (Bs)", "Total Invertido ($)"]
+
+
+def con_styler(df):
+    proto = ArrowData()
+    marshall_styler(proto, df.style.format({"Precio Operacion (Bs)": "{:.2f}", "Total Invertido ($)": "${:.2f}"}),
+                    "bench")
+    return len(proto.SerializeToString()) + len(convert_anything_to_arrow_bytes(df))
+
+
+def con_pagina(df):
+    filtrado = filtrar_libro(df, tickers=sinteticos.TICKERS_BVC[:6], columna_fecha="Fecha Compra")
+    pagina = paginar(filtrado, 3, 50, "Fecha Compra", ascendente=False)
+    return len(convert_anything_to_arrow_bytes(pagina.filas))
+
+
+def medir(funcion, df, repeticiones=3):
+    mejor = None
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        tamano = funcion(df)
+        t = time.perf_counter() - t0
+        mejor = t if mejor is None else min(mejor, t)
+    return mejor, tamano
+
+
+if __name__ == "__main__":
+    tamanos = [int(a) for a in sys.argv[1:]] or [1000, 10000, 100000]
+    # Con el límite por defecto (262.144 celdas) la pestaña con Styler ni siquiera se dibujaba a partir de ~33.000
+    # operaciones; se sube solo para poder medirla.
+    pd.set_option("styler.render.max_elements", 10**8)
+    print(f"{'operaciones':>12} {'Styler ms':>10} {'Styler KB':>10} {'Página ms':>10} {'Página KB':>10}")
+    for n in tamanos:
+        df = sinteticos.libro_bvc(n)[COLUMNAS]
+        df["Fecha Compra"] = df["Fecha Compra"].astype("datetime64[ns]")
+        t_styler, b_styler = medir(con_styler, df)
+        t_pagina, b_pagina = medir(con_pagina, df)
+        print(f"{n:>12,} {t_styler * 1000:10.1f} {b_styler / 1024:10.1f} {t_pagina * 1000:10.1f} {b_pagina / 1024:10.1f}")
@@ -0,0 +1,66 @@
+"""Curva de patrimonio: construcción completa e incremental.
+
+Uso: python benchmarks/bench_valoracion.py [operaciones] [tickers] [años]
+Por defecto 10.000 operaciones, 100 tickers y 5 años de precios diarios.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from nucleo.valoracion import CurvaPatrimonio  # noqa: E402
+
+
+def datos_sinteticos(n_ops, n_tickers, anios, semilla=0):
+    rng = np.random.default_rng(semilla)
+    dias = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=int(anios * 252))
+    tickers = [f"T{i:03d}" for i in range(n_tickers)]
+    precios = pd.DataFrame(
+        100 * np.exp(np.cumsum(rng.normal(0, 0.02, (len(dias), n_tickers)), axis=0)),
+        index=dias, columns=tickers)
+    tasas = pd.Series(36 * np.exp(np.cumsum(rng.normal(0.001, 0.005, len(dias)))), index=dias)
+    ops = pd.DataFrame({
+        "Fecha": dias[rng.integers(0, len(dias), n_ops)],
+        "Ticker": rng.choice(tickers, n_ops),
+        "Cantidad": rng.integers(1, 100, n_ops).astype(float),
+    }).sort_values("Fecha", ignore_index=True)
+    ops["Monto $"] = ops["Cantidad"] * 100
+    ops["Monto Bs"] = ops["Monto $"] * 36
+    return ops, precios, tasas
+
+
+def cronometrar(funcion):
+    t0 = time.perf_counter()
+    resultado = funcion()
+    return time.perf_counter() - t0, resultado
+
+
+if __name__ == "__main__":
+    n_ops, n_tickers, anios = [int(a) for a in sys.argv[1:4]] + [10000, 100, 5][len(sys.argv[1:4]):]
+    ops, precios, tasas = datos_sinteticos(n_ops, n_tickers, anios)
+    motor = CurvaPatrimonio("USD")
+
+    def completa():
+        motor.agregar_operaciones(ops)
+        motor.fijar_precios(precios)
+        motor.fijar_tasas(tasas)
+        return motor.curva()
+
+    t_completa, curva = cronometrar(completa)
+    hoy = precios.index[-1]
+    nueva = pd.DataFrame({"Fecha": [hoy], "Ticker": ["T000"], "Cantidad": [5.0]})
+    t_op, _ = cronometrar(lambda: (motor.agregar_operaciones(nueva), motor.curva()))
+    cierre = precios.iloc[[-1]] * 1.01
+    t_px, _ = cronometrar(lambda: (motor.fijar_precios(cierre), motor.curva()))
+    t_igual, _ = cronometrar(lambda: (motor.fijar_precios(cierre), motor.curva()))
+
+    print(f"{n_ops} operaciones × {n_tickers} tickers × {len(curva)} días")
+    print(f"  construcción completa   {t_completa * 1000:8.1f} ms")
+    print(f"  + operación de hoy      {t_op * 1000:8.1f} ms")
+    print(f"  + cierre de hoy         {t_px * 1000:8.1f} ms")
+    print(f"  mismos precios otra vez {t_igual * 1000:8.1f} ms")
@@ -0,0 +1,226 @@
+"""Datos sintéticos y backends falsos para medir sin red.
+
+Todo es determinista (misma ``semilla``, mismos datos):
+
+- ``libro_bvc`` / ``libro_intl``: libros de operaciones con compras y
+  ventas (nunca se vende más de lo que se tiene), con las columnas y el
+  formato de texto que tienen en la hoja.
+- ``hoja_precios_bvc``: la hoja Precios_Web de todo el mercado, con precios
+  en formato venezolano ("1.234,56").
+- ``historial_tasas``: años de tasas diarias Bs/$ con devaluación.
+- ``ConexionMemoria``: ``GSheetsConnection`` en memoria (misma API que
+  ``ConexionLocal``), con latencia opcional por llamada.
+- ``descargar_bcv_falso``: la portada del BCV guardada en fixtures, con la
+  tasa pedida, pasada por el extractor real.
+- ``proveedor_cotizaciones`` / ``proveedor_velas``: sustitutos de yfinance
+  para ``ServicioCotizaciones`` y ``HistorialPrecios``.
+"""
+
+import os
+import re
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from nucleo.extractor_bcv import extraer_tasas  # noqa: E402
+from nucleo.hojas_locales import ConexionLocal, HojaLocal, valores_a_dataframe  # noqa: E402
+from nucleo.mercados import BVC, INTL  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+INICIO = pd.Timestamp("2019-01-02")
+TICKERS_BVC = ["BNC", "MVZ.A", "MVZ.B", "TDV.D", "BPV", "CCR", "ABC.A", "BVL", "FVI.B", "RST", "EFE", "PTN"]
+TICKERS_INTL = ["AAPL", "MSFT", "NVDA", "AMZN", "GOOGL", "META", "TSLA", "SPY", "QQQ", "VTI", "KO", "JNJ"]
+
+
+def mercado_bvc(n=80):
+    """Los símbolos conocidos más otros inventados hasta completar ``n``."""
+    return TICKERS_BVC + [f"X{i:02d}.A" for i in range(n - len(TICKERS_BVC))]
+
+
+def formato_bvc(valores):
+    """1234.56 -> '1.234,56'."""
+    return [f"{v:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") for v in valores]
+
+
+def historial_tasas(anios=5, semilla=0):
+    """Serie diaria Bs/$ desde ``INICIO``: deriva de devaluación más ruido."""
+    rng = np.random.default_rng(semilla)
+    dias = pd.date_range(INICIO, periods=int(anios * 365), freq="D")
+    return pd.Series(np.round(4 * np.exp(np.cumsum(rng.normal(0.002, 0.004, len(dias)))), 4), index=dias)
+
+
+def _fechas_y_cantidades(n_ops, tickers, dias, prop_ventas, rng):
+    fechas = np.sort(rng.integers(0, dias, n_ops))
+    elegidos = rng.choice(tickers, n_ops)
+    cantidad = rng.integers(1, 200, n_ops).astype(float)
+    vende = rng.random(n_ops) < prop_ventas
+    # Cada venta es como mucho lo que hay en ese momento: el libro nunca queda en negativo.
+    saldo = {}
+    for i, (t, q, v) in enumerate(zip(elegidos, cantidad, vende)):
+        s = saldo.get(t, 0.0)
+        if v and s > 0:
+            q = -min(q, s)
+            cantidad[i] = q
+        saldo[t] = s + q
+    return fechas, elegidos, cantidad
+
+
+def libro_bvc(n_ops, tasas=None, prop_ventas=0.15, semilla=0):
+    """Hoja 'Portafolio' con ``n_ops`` filas."""
+    rng = np.random.default_rng(semilla)
+    tasas = historial_tasas(semilla=semilla) if tasas is None else tasas
+    fechas, tickers, cantidad = _fechas_y_cantidades(n_ops, TICKERS_BVC, len(tasas), prop_ventas, rng)
+    tasa = tasas.to_numpy()[fechas]
+    # Precios en Bs que siguen a la tasa (las acciones de la BVC se mueven con el dólar).
+    precio = np.round(rng.uniform(0.5, 5, n_ops) * tasa, 2)
+    total_bs = np.round(cantidad * precio, 2)
+    return pd.DataFrame({
+        "Ticker": tickers, "Cantidad": cantidad, "Precio Operacion (Bs)": precio,
+        "Fecha Compra": tasas.index[fechas].strftime("%Y-%m-%d"), "Tasa Cambio (Bs/$)": tasa,
+        "Total Invertido (Bs)": total_bs, "Total Invertido ($)": np.round(total_bs / tasa, 4),
+        "Tipo": np.where(cantidad < 0, "Venta", "Compra"),
+    }, columns=list(BVC.columnas))
+
+
+def libro_intl(n_ops, tasas=None, prop_ventas=0.15, semilla=0):
+    """Hoja 'Portafolio_INTL' con ``n_ops`` filas."""
+    rng = np.random.default_rng(semilla + 1)
+    tasas = historial_tasas(semilla=semilla) if tasas is None else tasas
+    fechas, tickers, cantidad = _fechas_y_cantidades(n_ops, TICKERS_INTL, len(tasas), prop_ventas, rng)
+    return pd.DataFrame({
+        "Ticker": tickers, "Cantidad": cantidad, "Precio": np.round(rng.uniform(20, 600, n_ops), 2),
+        "Fecha": tasas.index[fechas].strftime("%Y-%m-%d"), "Tipo": np.where(cantidad < 0, "Venta", "Compra"),
+        "Tasa": tasas.to_numpy()[fechas],
+    }, columns=list(INTL.columnas))
+
+
+def hoja_precios_bvc(tickers=None, tasa=40.0, semilla=0):
+    """Hoja 'Precios_Web' tal como la deja el scraper: todo el mercado, precios en texto."""
+    rng = np.random.default_rng(semilla + 2)
+    tickers = mercado_bvc() if tickers is None else tickers
+    n = len(tickers)
+    precios = formato_bvc(rng.uniform(0.5, 5, n) * tasa)
+    return pd.DataFrame({
+        "Nro": np.arange(1, n + 1), "Símbolo": tickers, "Último Precio": precios,
+        "Variación": rng.normal(0, 2, n).round(2), "Volumen": rng.integers(0, 10**6, n),
+    })
+
+
+def cotizaciones(tickers=None, semilla=0):
+    """``{ticker: precio en $}`` para los tickers internacionales."""
+    rng = np.random.default_rng(semilla + 3)
+    tickers = TICKERS_INTL if tickers is None else tickers
+    return dict(zip(tickers, np.round(rng.uniform(20, 600, len(tickers)), 2).tolist()))
+
+
+def hojas(n_ops, anios=5, semilla=0):
+    """Todas las hojas que leen los dashboards, como ``{nombre: DataFrame}``."""
+    tasas = historial_tasas(anios, semilla)
+    return {
+        BVC.hoja: libro_bvc(n_ops, tasas, semilla=semilla),
+        INTL.hoja: libro_intl(n_ops, tasas, semilla=semilla),
+        "Precios_Web": hoja_precios_bvc(tasa=float(tasas.iloc[-1]), semilla=semilla),
+        "Historial_Tasas": pd.DataFrame({"Fecha": tasas.index.strftime("%Y-%m-%d"), "Tasa": tasas.to_numpy()}),
+        "Cotizaciones": pd.DataFrame(list(cotizaciones(semilla=semilla).items()), columns=["Ticker", "Precio"]),
+    }
+
+
+def escribir_hojas(carpeta, n_ops, anios=5, semilla=0):
+    """Las mismas hojas como CSV, para ``INVERSIONES_HOJAS_LOCALES``."""
+    os.makedirs(carpeta, exist_ok=True)
+    for nombre, df in hojas(n_ops, anios, semilla).items():
+        df.to_csv(os.path.join(carpeta, f"{nombre}.csv"), index=False)
+
+
+# --- BACKENDS FALSOS ---
+def _a_filas(df):
+    df = df.astype(object).where(df.notna(), "")
+    return [[str(c) for c in df.columns]] + [[str(v) for v in fila] for fila in df.itertuples(index=False)]
+
+
+class HojaMemoria(HojaLocal):
+    def __init__(self, nombre, llamadas, latencia=0.0):
+        super().__init__(f"{nombre}.csv", llamadas)
+        self.filas = []
+        self.latencia = latencia
+
+    def _leer(self):
+        if self.latencia:
+            time.sleep(self.latencia)
+        return [list(f) for f in self.filas]
+
+    def _escribir(self, filas):
+        if self.latencia:
+            time.sleep(self.latencia)
+        self.filas = [list(f) for f in filas]
+
+
+class ConexionMemoria(ConexionLocal):
+    """``GSheetsConnection`` en memoria. ``latencia`` son segundos por viaje a la "red"."""
+
+    def __init__(self, hojas=None, latencia=0.0):
+        # La carpeta no se usa: las hojas viven en memoria.
+        super().__init__(tempfile.gettempdir())
+        self.latencia = latencia
+        for nombre, df in (hojas or {}).items():
+            self.hoja(nombre).filas = _a_filas(df)
+
+    def hoja(self, nombre):
+        if nombre not in self._hojas:
+            self._hojas[nombre] = HojaMemoria(nombre, self.llamadas, self.latencia)
+        return self._hojas[nombre]
+
+    def read(self, worksheet=None, ttl=None, **options):
+        ws = self.hoja(worksheet)
+        if not ws.filas:
+            raise FileNotFoundError(f"No existe la hoja '{worksheet}'")
+        return valores_a_dataframe(ws.get_all_values())
+
+
+def pagina_bcv(tasa):
+    """La portada del BCV de fixtures con ``tasa`` en el bloque del dólar."""
+    with open(os.path.join(FIXTURES, "bcv_inicio.html"), encoding="utf-8") as f:
+        html = f.read()
+    texto = f"{tasa:.8f}".replace(".", ",")
+    return re.sub(r'(<div id="dolar".*?<strong>)[^<]*(</strong>)', rf"\g<1> {texto} \g<2>", html, count=1,
+                  flags=re.S)
+
+
+def descargar_bcv_falso(tasa=40.0, latencia=0.0):
+    """Sustituto de ``descargar_tasas_bcv``: misma página y mismo extractor, sin red."""
+    html = pagina_bcv(tasa).encode("utf-8")
+
+    def descargar(url=None):
+        if latencia:
+            time.sleep(latencia)
+        return extraer_tasas(html[i:i + 16384] for i in range(0, len(html), 16384))
+    return descargar
+
+
+def proveedor_cotizaciones(precios=None, latencia=0.0):
+    """Sustituto de ``proveedor_yfinance`` para ``ServicioCotizaciones``."""
+    precios = cotizaciones() if precios is None else precios
+
+    def proveedor(tickers):
+        if latencia:
+            time.sleep(latencia)
+        return {t: precios[t] for t in tickers if t in precios}
+    return proveedor
+
+
+def proveedor_velas(semilla=0, latencia=0.0):
+    """Sustituto de yfinance para ``HistorialPrecios``: velas diarias deterministas por ticker."""
+    def proveedor(ticker, inicio, fin):
+        if latencia:
+            time.sleep(latencia)
+        dias = pd.bdate_range(inicio, fin)
+        rng = np.random.default_rng([semilla, sum(map(ord, ticker))])
+        cierre = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(dias))))
+        return pd.DataFrame({"Open": cierre, "High": cierre * 1.01, "Low": cierre * 0.99, "Close": cierre,
+                             "Volume": rng.integers(10**5, 10**7, len(dias)).astype(float)}, index=dias)
+    return proveedor
@@ -0,0 +1,28 @@
+"""Lógica compartida por los dashboards, sin dependencias de la interfaz."""
+
+from nucleo.atribucion import atribuir, resumir_atribucion
+from nucleo.bcv import TasaBCV, lectura_de_foto, texto_antiguedad
+from nucleo.cache_libro import CacheLibro
+from nucleo.carga import Resultado, cargar_en_paralelo
+from nucleo.consolidado import completar_tasas, posiciones_consolidadas, resumen_por_mercado
+from nucleo.cotizaciones import ServicioCotizaciones, proveedor_tabla, proveedor_yfinance
+from nucleo.historial_precios import HistorialPrecios
+from nucleo.hojas_locales import ConexionLocal, abrir_conexion
+from nucleo.importacion import Importacion, leer_extracto, preparar_importacion, sugerir_mapeo
+from nucleo.instantaneas import Instantanea, Instantaneas
+from nucleo.libro import ConflictoDeVersion, LibroOperaciones, contar_filas
+from nucleo.lotes import ResultadoLotes, casar_lotes, resumen_posiciones
+from nucleo.medicion import Medicion, a_json_lines, exportar_json_lines
+from nucleo.memo import Derivado, Memo, con_huella, huella
+from nucleo.mercados import (BVC, INTL, Mercado, cargar_operaciones, carteras_configuradas, fila_operacion,
+                              filas_operaciones, hoja_de_cartera, limpiar_operaciones, normalizar_cartera,
+                              normalizar_operaciones, registrar_operacion)
+from nucleo.paginacion import Pagina, filtrar_libro, paginar
+from nucleo.precios import limpiar_precio_bvc, limpiar_precios_bvc, tabla_precios_web
+from nucleo.precios_manuales import PreciosManuales, cambios_del_editor, tabla_precios_mercado
+from nucleo.relleno_tasas import Relleno, leer_archivo_tasas, rellenar_bitacora, rellenar_huecos
+from nucleo.resumen_bvc import ClienteBVC, PreciosBVC, extraer_precios_bvc
+from nucleo.riesgo import Riesgo, analizar_riesgo
+from nucleo.tasas import HistorialTasas
+from nucleo.trabajador import Tarea, Trabajador, tarea_bcv, tarea_cotizaciones, tarea_precios_bvc
+from nucleo.valoracion import CurvaPatrimonio, curva_patrimonio
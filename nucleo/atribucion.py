@@ -0,0 +1,94 @@
+"""Atribución de la ganancia a precio y a tasa (devaluación), en $ y en Bs.
+
+Cada lote abierto y cada venta de ``casar_lotes`` ya traen su costo en las
+dos monedas con la tasa del día de la compra. Con el precio y la tasa de
+hoy (o los de la venta) la ganancia en la moneda del libro es solo precio,
+y la de la otra moneda se separa en dos partes que suman exacto:
+
+    precio = cantidad × (precio final − costo unit.) × tasa final
+    tasa   = cantidad × costo unit. × tasa final − costo en la otra moneda
+
+"tasa final" es el factor de la moneda del libro a la otra (Bs/$ para un
+libro en $, $/Bs para uno en Bs). Todo es por columnas sobre los lotes, así
+que con la tasa nueva del día solo se rehace esto; el casado de lotes, que
+es lo que recorre el libro, se reutiliza.
+"""
+
+import numpy as np
+import pandas as pd
+
+from nucleo.lotes import _monedas
+
+COLUMNAS_EFECTOS = ["Costo $", "Costo Bs", "Valor $", "Valor Bs", "Precio $", "Tasa $", "Precio Bs", "Tasa Bs"]
+
+
+def _factor(tasa, moneda):
+    """De la moneda del libro a la otra."""
+    tasa = np.asarray(tasa, dtype=float)
+    if moneda == "USD":
+        return tasa
+    return np.divide(1.0, tasa, out=np.zeros_like(tasa), where=tasa > 0)
+
+
+def _efectos(ticker, fecha, estado, cantidad, costo_l, costo_o, valor_l, factor, moneda):
+    """Filas de atribución; ``costo_*`` y ``valor_l`` son totales (no unitarios)."""
+    local, otra = _monedas(moneda)
+    valor_o = valor_l * factor
+    efecto_tasa = costo_l * factor - costo_o
+    return pd.DataFrame({
+        "Ticker": ticker, "Fecha": fecha, "Estado": estado, "Cantidad": cantidad,
+        f"Costo {local}": costo_l, f"Costo {otra}": costo_o, f"Valor {local}": valor_l, f"Valor {otra}": valor_o,
+        f"Precio {local}": valor_l - costo_l, f"Tasa {local}": np.zeros(len(costo_l)),
+        f"Precio {otra}": valor_o - costo_o - efecto_tasa, f"Tasa {otra}": efecto_tasa,
+    })
+
+
+def atribuir(resultado, precios, tasa_hoy):
+    """Atribución por lote abierto (a ``precios`` y ``tasa_hoy``) y por venta (a su precio y tasa).
+
+    ``resultado`` es el de ``casar_lotes``; ``precios`` es ``{ticker: precio}``
+    en la moneda del libro. Los lotes sin precio de hoy quedan fuera.
+    """
+    moneda = resultado.moneda
+    local, otra = _monedas(moneda)
+    lotes, ventas = resultado.lotes, resultado.ventas
+
+    precio_hoy = lotes["Ticker"].map(pd.Series(precios, dtype=float)).to_numpy(dtype=float)
+    con_precio = precio_hoy > 0
+    lotes, precio_hoy = lotes[con_precio], precio_hoy[con_precio]
+    cantidad = lotes["Cantidad"].to_numpy(dtype=float)
+    abiertas = _efectos(lotes["Ticker"].to_numpy(), lotes["Fecha"].to_numpy(), "Abierta", cantidad,
+                        cantidad * lotes[f"Costo Unit. {local}"].to_numpy(dtype=float),
+                        cantidad * lotes[f"Costo Unit. {otra}"].to_numpy(dtype=float),
+                        cantidad * precio_hoy, np.full(len(lotes), _factor(tasa_hoy, moneda)), moneda)
+
+    # La tasa de cada venta sale de su ingreso en las dos monedas.
+    ventas = ventas[ventas["Cantidad"] > 0]
+    ingreso_l = ventas[f"Ingreso {local}"].to_numpy(dtype=float)
+    factor_venta = np.divide(ventas[f"Ingreso {otra}"].to_numpy(dtype=float), ingreso_l,
+                             out=np.zeros_like(ingreso_l), where=ingreso_l > 0)
+    realizadas = _efectos(ventas["Ticker"].to_numpy(), ventas["Fecha"].to_numpy(), "Realizada",
+                          ventas["Cantidad"].to_numpy(dtype=float), ventas[f"Costo {local}"].to_numpy(dtype=float),
+                          ventas[f"Costo {otra}"].to_numpy(dtype=float), ingreso_l, factor_venta, moneda)
+
+    detalle = pd.concat([abiertas, realizadas], ignore_index=True)
+    return detalle[["Ticker", "Fecha", "Estado", "Cantidad"] + COLUMNAS_EFECTOS]
+
+
+def resumir_atribucion(detalle, por="Ticker", frecuencia="Y"):
+    """Efectos sumados por ``por`` ("Ticker", "Estado" o "Periodo") con sus porcentajes sobre el costo.
+
+    Con "Periodo" se agrupa por la fecha de la operación (compra del lote
+    abierto o la venta) con ``frecuencia`` ("Y", "Q" o "M").
+    """
+    if por == "Periodo":
+        claves = pd.to_datetime(detalle["Fecha"]).dt.to_period(frecuencia).astype(str).rename("Periodo")
+    else:
+        claves = detalle[por]
+    tabla = detalle[COLUMNAS_EFECTOS].groupby(claves).sum()
+    for m in ("$", "Bs"):
+        costo = tabla[f"Costo {m}"].where(tabla[f"Costo {m}"] != 0)
+        tabla[f"Precio {m} %"] = (tabla[f"Precio {m}"] / costo * 100).fillna(0.0)
+        tabla[f"Tasa {m} %"] = (tabla[f"Tasa {m}"] / costo * 100).fillna(0.0)
+        tabla[f"Total {m} %"] = tabla[f"Precio {m} %"] + tabla[f"Tasa {m} %"]
+    return tabla.reset_index()
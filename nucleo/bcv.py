@@ -0,0 +1,158 @@
+"""Tasa oficial del BCV servida desde disco y refrescada en segundo plano.
+
+La última tasa buena se guarda en ``tasa_bcv.json`` dentro de la carpeta de
+caché, así que la comparten todas las sesiones y procesos. Leerla nunca
+espera a la red (salvo la primera vez, cuando no hay nada guardado): si
+está vieja se lanza un hilo que consulta bcv.org.ve y actualiza el archivo.
+Un archivo ``.lock`` evita que varios procesos consulten a la vez.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+
+from nucleo.cache_libro import RUTA_CACHE
+from nucleo.extractor_bcv import extraer_tasas
+
+URL_BCV = os.environ.get("INVERSIONES_URL_BCV", "https://www.bcv.org.ve/")
+
+LecturaTasa = namedtuple("LecturaTasa", ["tasa", "obtenida", "edad", "vieja", "actualizando", "tasas"])
+
+
+def descargar_tasas_bcv(url=None, timeout=5):
+    """Todas las tasas de la portada (``{"USD": ..., "EUR": ...}``).
+
+    La respuesta se lee por trozos y se corta apenas aparecen las monedas.
+    """
+    import requests
+
+    with requests.get(url or URL_BCV, verify=False, timeout=timeout, stream=True) as r:
+        r.raise_for_status()
+        tasas = extraer_tasas(r.iter_content(16384))
+    if "USD" not in tasas:
+        raise ValueError("La página del BCV no trae la tasa del dólar")
+    return tasas
+
+
+class TasaBCV:
+    def __init__(self, ruta=None, ttl=3600, reintento=300, url=None, descargar=descargar_tasas_bcv):
+        self.ruta = ruta or os.path.join(RUTA_CACHE, "tasa_bcv.json")
+        self.ttl = ttl
+        self.reintento = reintento
+        self.url = url
+        self.descargar = descargar
+        self._hilo = None
+        self._lock = threading.Lock()
+        carpeta = os.path.dirname(self.ruta)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+
+    def _leer_archivo(self):
+        try:
+            with open(self.ruta, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _escribir_archivo(self, datos):
+        temporal = f"{self.ruta}.{os.getpid()}.tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(datos, f)
+        os.replace(temporal, self.ruta)
+
+    def _tomar_lock(self):
+        ruta_lock = f"{self.ruta}.lock"
+        try:
+            # Un lock de más de un minuto es de un proceso que murió.
+            if time.time() - os.path.getmtime(ruta_lock) > 60:
+                os.remove(ruta_lock)
+        except OSError:
+            pass
+        try:
+            os.close(os.open(ruta_lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            return False
+
+    def refrescar(self):
+        """Consulta el BCV ahora mismo y guarda el resultado. Devuelve la tasa o ``None``."""
+        if not self._tomar_lock():
+            return None
+        try:
+            datos = self._leer_archivo()
+            try:
+                tasas = self.descargar(self.url) if self.url else self.descargar()
+                tasa = tasas.get("USD", 0)
+                if not tasa > 0:
+                    raise ValueError(f"Tasa inválida: {tasa}")
+                datos.update({"tasa": tasa, "tasas": tasas, "obtenida": time.time()})
+                datos.pop("error", None)
+                datos.pop("fallo", None)
+            except Exception as e:
+                tasa = None
+                datos.update({"error": str(e), "fallo": time.time()})
+            self._escribir_archivo(datos)
+            return tasa
+        finally:
+            try:
+                os.remove(f"{self.ruta}.lock")
+            except OSError:
+                pass
+
+    def _refrescar_en_segundo_plano(self):
+        with self._lock:
+            if self._hilo is not None and self._hilo.is_alive():
+                return self._hilo
+            self._hilo = threading.Thread(target=self.refrescar, name="refresco-bcv", daemon=True)
+            self._hilo.start()
+            return self._hilo
+
+    def leer(self, espera_inicial=5):
+        """Devuelve la última tasa conocida y, si está vieja, la refresca en segundo plano.
+
+        Solo cuando no hay ninguna tasa guardada se espera hasta
+        ``espera_inicial`` segundos por la primera consulta.
+        """
+        datos = self._leer_archivo()
+        ahora = time.time()
+        vieja = "tasa" not in datos or ahora - datos.get("obtenida", 0) > self.ttl
+        actualizando = False
+        # Tras un fallo se espera ``reintento`` segundos antes de volver a consultar.
+        if vieja and ahora - datos.get("fallo", 0) > self.reintento:
+            hilo = self._refrescar_en_segundo_plano()
+            actualizando = True
+            if "tasa" not in datos and espera_inicial:
+                hilo.join(espera_inicial)
+                datos = self._leer_archivo()
+                actualizando = hilo.is_alive()
+        if "tasa" not in datos:
+            return LecturaTasa(0.0, None, None, True, actualizando, {})
+        edad = max(time.time() - datos["obtenida"], 0)
+        return LecturaTasa(float(datos["tasa"]), datos["obtenida"], edad, edad > self.ttl, actualizando,
+                           datos.get("tasas", {"USD": datos["tasa"]}))
+
+
+def lectura_de_foto(foto, ttl=3600):
+    """``LecturaTasa`` a partir de la foto "bcv" del trabajador (``{"USD": ..., "EUR": ...}``)."""
+    edad = max(time.time() - foto.obtenida, 0)
+    return LecturaTasa(float(foto.datos["USD"]), foto.obtenida, edad, edad > ttl, False, dict(foto.datos))
+
+
+def texto_antiguedad(lectura):
+    """Texto corto para mostrar bajo la tasa: cuándo se obtuvo y si se está refrescando."""
+    if lectura.obtenida is None:
+        return "⏳ Consultando BCV..." if lectura.actualizando else "Sin datos del BCV"
+    minutos = int(lectura.edad // 60)
+    if minutos < 1:
+        texto = "Actualizada hace instantes"
+    elif minutos < 120:
+        texto = f"Actualizada hace {minutos} min"
+    else:
+        texto = f"Actualizada hace {minutos // 60} h"
+    if lectura.actualizando:
+        texto += " · ⏳ actualizando"
+    elif lectura.vieja:
+        texto += " · ⚠️ desactualizada"
+    return texto
@@ -0,0 +1,115 @@
+"""Copia local (SQLite) de las hojas de operaciones con sincronización incremental.
+
+La versión de la copia es el número de filas de datos. En cada sincronización
+se pide en una sola llamada el encabezado, la columna A (para saber cuántas
+filas hay) y solo las filas posteriores a las que ya tenemos. Si la hoja se
+achicó o cambió el encabezado, se vuelve a bajar completa; cada
+``ttl_completo`` segundos también, para recoger ediciones en filas viejas.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from nucleo.hojas_locales import valores_a_dataframe
+
+RUTA_CACHE = os.environ.get("INVERSIONES_CACHE", ".cache")
+
+
+class CacheLibro:
+    def __init__(self, ruta=None, intervalo=15, ttl_completo=3600):
+        self.ruta = ruta or os.path.join(RUTA_CACHE, "libro.sqlite")
+        self.intervalo = intervalo
+        self.ttl_completo = ttl_completo
+        # Un candado por hoja: sincronizar una no frena la lectura de otra.
+        self._lock = threading.Lock()
+        self._locks_hoja = {}
+        self._memoria = {}
+        carpeta = os.path.dirname(self.ruta)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        with self._db() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS hojas (hoja TEXT PRIMARY KEY, encabezado TEXT,"
+                       " filas INTEGER, revisado REAL, completo REAL)")
+            db.execute("CREATE TABLE IF NOT EXISTS filas (hoja TEXT, n INTEGER, valores TEXT,"
+                       " PRIMARY KEY (hoja, n))")
+
+    def _db(self):
+        return sqlite3.connect(self.ruta, timeout=10)
+
+    def _estado(self, db, hoja):
+        fila = db.execute("SELECT encabezado, filas, revisado, completo FROM hojas WHERE hoja = ?",
+                          (hoja,)).fetchone()
+        if fila is None:
+            return None
+        return {"encabezado": json.loads(fila[0]), "filas": fila[1],
+                "revisado": fila[2], "completo": fila[3]}
+
+    def _lock_hoja(self, hoja):
+        with self._lock:
+            return self._locks_hoja.setdefault(hoja, threading.Lock())
+
+    def invalidar(self, hoja):
+        """Obliga a consultar la hoja remota en la próxima lectura."""
+        with self._lock_hoja(hoja), self._db() as db:
+            db.execute("UPDATE hojas SET revisado = 0 WHERE hoja = ?", (hoja,))
+
+    def sincronizar(self, hoja, ws, ahora=None):
+        """Trae lo nuevo de ``ws`` si toca. Devuelve el número de filas locales."""
+        ahora = time.time() if ahora is None else ahora
+        with self._lock_hoja(hoja), self._db() as db:
+            estado = self._estado(db, hoja)
+            if estado and ahora - estado["revisado"] < self.intervalo:
+                return estado["filas"]
+            if estado is None or not estado["encabezado"] or ahora - estado["completo"] >= self.ttl_completo:
+                return self._completa(db, hoja, ws.get_all_values(), ahora)
+
+            from gspread.utils import rowcol_to_a1
+
+            n = estado["filas"]
+            ultima_col = rowcol_to_a1(1, len(estado["encabezado"])).rstrip("0123456789")
+            encabezado, col_a, cola = ws.batch_get(["1:1", "A:A", f"A{n + 2}:{ultima_col}"])
+            remotas = max(len(col_a) - 1, 0)
+            if (encabezado[0] if encabezado else []) != estado["encabezado"] or remotas < n:
+                return self._completa(db, hoja, ws.get_all_values(), ahora)
+
+            cola = cola[:remotas - n]
+            db.executemany("INSERT OR REPLACE INTO filas VALUES (?, ?, ?)",
+                           [(hoja, n + i, json.dumps(f)) for i, f in enumerate(cola)])
+            db.execute("UPDATE hojas SET filas = ?, revisado = ? WHERE hoja = ?",
+                       (n + len(cola), ahora, hoja))
+            return n + len(cola)
+
+    def _completa(self, db, hoja, valores, ahora):
+        # Se quitan las filas del final sin columna A para que la versión
+        # coincida con la que se calcula al anexar.
+        while len(valores) > 1 and not (valores[-1] and str(valores[-1][0]).strip()):
+            valores = valores[:-1]
+        encabezado, datos = (valores[0], valores[1:]) if valores else ([], [])
+        db.execute("DELETE FROM filas WHERE hoja = ?", (hoja,))
+        db.executemany("INSERT INTO filas VALUES (?, ?, ?)",
+                       [(hoja, i, json.dumps(f)) for i, f in enumerate(datos)])
+        db.execute("INSERT OR REPLACE INTO hojas VALUES (?, ?, ?, ?, ?)",
+                   (hoja, json.dumps(encabezado), len(datos), ahora, ahora))
+        self._memoria.pop(hoja, None)
+        return len(datos)
+
+    def leer(self, hoja):
+        """DataFrame de la copia local, con los mismos tipos que ``conn.read``."""
+        with self._lock_hoja(hoja), self._db() as db:
+            estado = self._estado(db, hoja)
+            if estado is None:
+                return None
+            clave = (estado["filas"], estado["completo"])
+            guardado = self._memoria.get(hoja)
+            if guardado and guardado[0] == clave:
+                return guardado[1].copy()
+            filas = [json.loads(v) for (v,) in db.execute(
+                "SELECT valores FROM filas WHERE hoja = ? ORDER BY n", (hoja,))]
+        df = valores_a_dataframe([estado["encabezado"]] + filas) if estado["encabezado"] else None
+        if df is not None:
+            self._memoria[hoja] = (clave, df)
+            return df.copy()
+        return None
@@ -0,0 +1,64 @@
+"""Carga en paralelo de las fuentes de una página, con tiempo máximo por fuente.
+
+Cada fuente es una función sin argumentos (o, si depende de otra, una
+función que recibe el valor de esa otra). Todas se lanzan a la vez en un
+pool compartido por el proceso; a cada una se le espera como mucho su
+``timeout`` contado desde el inicio de la carga. Las que fallan o no llegan
+a tiempo devuelven su valor por defecto, así la página se dibuja con lo que
+sí llegó. El hilo de una fuente que se pasó del tiempo sigue corriendo en
+segundo plano (no se puede interrumpir), pero nadie lo espera.
+"""
+
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as TiempoAgotado
+
+Resultado = namedtuple("Resultado", ["valor", "segundos", "error", "agotado"])
+
+_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="carga")
+
+
+def _correr(funcion, previo):
+    """Devuelve ``(valor, segundos, error)``; nunca lanza, así el tiempo de un fallo es el real."""
+    if previo is not None:
+        # Lo que falle en la fuente previa se propaga como error de esta.
+        valor_previo, _, error = previo.result()
+        if error is not None:
+            return None, 0.0, error
+    t0 = time.perf_counter()
+    try:
+        valor = funcion(valor_previo) if previo is not None else funcion()
+        return valor, time.perf_counter() - t0, None
+    except Exception as e:
+        return None, time.perf_counter() - t0, e
+
+
+def cargar_en_paralelo(tareas, timeout=10, timeouts=None, defectos=None, envolver=None):
+    """Ejecuta ``tareas`` (``{nombre: funcion}`` o ``{nombre: (funcion, nombre_previo)}``) a la vez.
+
+    ``timeouts`` y ``defectos`` son diccionarios por nombre; ``envolver`` se
+    aplica a cada función antes de mandarla al pool (p.ej. para darle el
+    contexto de Streamlit). Devuelve ``{nombre: Resultado}`` en el mismo orden.
+    """
+    timeouts, defectos = timeouts or {}, defectos or {}
+    inicio = time.perf_counter()
+    futuros = {}
+    for nombre, tarea in tareas.items():
+        funcion, previo = tarea if isinstance(tarea, tuple) else (tarea, None)
+        if envolver is not None:
+            funcion = envolver(funcion)
+        futuros[nombre] = _POOL.submit(_correr, funcion, futuros[previo] if previo else None)
+
+    resultados = {}
+    for nombre, futuro in futuros.items():
+        restante = max(inicio + timeouts.get(nombre, timeout) - time.perf_counter(), 0)
+        try:
+            valor, segundos, error = futuro.result(timeout=restante)
+        except TiempoAgotado:
+            resultados[nombre] = Resultado(defectos.get(nombre), time.perf_counter() - inicio, None, True)
+            continue
+        if error is not None:
+            valor = defectos.get(nombre)
+        resultados[nombre] = Resultado(valor, segundos, error, False)
+    return resultados
@@ -0,0 +1,64 @@
+"""Vista consolidada de los dos portafolios (BVC en Bs e internacional en $).
+
+Cada libro se casa por lotes en su propia moneda y se lleva a la otra con
+una sola serie de tasas Bs/$: la de la bitácora para las operaciones que no
+trajeron tasa y la del día para valorar. El resultado es una tabla por
+ticker con columna ``Mercado`` y todo en ambas monedas, lista para sumar.
+"""
+
+import numpy as np
+import pandas as pd
+
+from nucleo.lotes import casar_lotes, resumen_posiciones
+from nucleo.mercados import normalizar_operaciones
+
+COLUMNAS_CONSOLIDADO = ["Mercado", "Ticker", "Cantidad", "Precio", "Costo $", "Costo Bs", "Valor $", "Valor Bs",
+                        "No Realizada $", "No Realizada Bs", "Realizada $", "Realizada Bs"]
+
+
+def completar_tasas(ops, tasas, max_dias=4):
+    """Pone la tasa de la bitácora (la del día o la anterior más cercana) donde ``Tasa`` falta o es 0."""
+    ops = ops.copy()
+    tasa = pd.to_numeric(ops["Tasa"], errors="coerce")
+    faltan = ~(tasa > 0)
+    if faltan.any() and tasas is not None and len(tasas):
+        tasas = tasas.sort_index()
+        fechas = pd.to_datetime(ops.loc[faltan, "Fecha"]).dt.normalize().to_numpy().astype("datetime64[D]")
+        dias = tasas.index.to_numpy().astype("datetime64[D]")
+        i = np.searchsorted(dias, fechas, side="right") - 1
+        validos = (i >= 0) & ((fechas - dias[np.maximum(i, 0)]).astype(int) <= max_dias)
+        tasa.loc[faltan] = np.where(validos, tasas.to_numpy(dtype=float)[np.maximum(i, 0)], np.nan)
+    ops["Tasa"] = tasa.fillna(0.0)
+    return ops
+
+
+def posiciones_consolidadas(libros, precios, tasas, tasa_hoy, metodo="FIFO"):
+    """Una fila por mercado y ticker con costo, valor y ganancias en $ y Bs.
+
+    ``libros`` es ``{Mercado: DataFrame del libro}``, ``precios`` es
+    ``{nombre del mercado: {ticker: precio en su moneda}}`` y ``tasas`` la
+    serie Bs/$ de la bitácora.
+    """
+    partes = []
+    for mercado, df in libros.items():
+        if df is None or df.empty:
+            continue
+        ops = completar_tasas(normalizar_operaciones(df, mercado), tasas)
+        lotes = casar_lotes(ops, mercado.moneda, metodo)
+        tabla = resumen_posiciones(lotes, precios.get(mercado.nombre, {}), tasa_hoy)
+        tabla = tabla.rename(columns={"Precio $": "Precio", "Precio Bs": "Precio"})
+        tabla.insert(0, "Mercado", mercado.nombre)
+        partes.append(tabla[COLUMNAS_CONSOLIDADO])
+    if not partes:
+        return pd.DataFrame(columns=COLUMNAS_CONSOLIDADO)
+    return pd.concat(partes, ignore_index=True)
+
+
+def resumen_por_mercado(posiciones):
+    """Totales por mercado más el peso de cada uno en el patrimonio (sobre el valor en $)."""
+    columnas = ["Costo $", "Costo Bs", "Valor $", "Valor Bs", "No Realizada $", "No Realizada Bs",
+                "Realizada $", "Realizada Bs"]
+    tabla = posiciones.groupby("Mercado")[columnas].sum()
+    total = tabla["Valor $"].sum()
+    tabla["Peso %"] = tabla["Valor $"] / total * 100 if total else 0.0
+    return tabla
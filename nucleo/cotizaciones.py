@@ -0,0 +1,98 @@
+"""Servicio de cotizaciones con caché por ticker, compartido entre sesiones.
+
+Cada ticker guarda su último precio con la hora en que se obtuvo. Al pedir
+una lista se deduplica, se sirven de memoria los que siguen vigentes y los
+demás se piden todos juntos en una sola llamada al proveedor. El proveedor
+es cualquier función ``lista_de_tickers -> {ticker: precio}``; por defecto
+yfinance, y ``proveedor_tabla`` permite trabajar sin red.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def proveedor_yfinance(tickers):
+    import yfinance as yf
+
+    datos = yf.download(tickers, period="5d", progress=False)["Close"]
+    if isinstance(datos, pd.Series):
+        datos = datos.to_frame(tickers[0])
+    if datos.empty:
+        return {}
+    # El último cierre disponible de cada ticker (no todos cotizan el mismo día).
+    ultimos = datos.ffill().iloc[-1]
+    return {t: float(ultimos[t]) for t in tickers if t in ultimos and pd.notna(ultimos[t])}
+
+
+def proveedor_tabla(tabla):
+    """Proveedor sin red a partir de una tabla ``Ticker``/``Precio`` (o un dict)."""
+    if isinstance(tabla, pd.DataFrame):
+        tabla = dict(zip(tabla["Ticker"].astype(str).str.upper(), tabla["Precio"].astype(float)))
+
+    def proveedor(tickers):
+        return {t: tabla[t] for t in tickers if t in tabla}
+    return proveedor
+
+
+class ServicioCotizaciones:
+    def __init__(self, proveedor=None, ttl=300, ttl_fallidos=60, max_tickers=2000):
+        self.proveedor = proveedor or proveedor_yfinance
+        self.ttl = ttl
+        self.ttl_fallidos = ttl_fallidos
+        self.max_tickers = max_tickers
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.llamadas = 0
+
+    def _vigente(self, entrada, ahora):
+        precio, obtenido = entrada
+        return ahora - obtenido < (self.ttl if precio is not None else self.ttl_fallidos)
+
+    def precios(self, tickers):
+        """``{ticker: precio}`` para los tickers que tienen cotización."""
+        pedidos = list(dict.fromkeys(str(t).upper() for t in tickers if t))
+        if not pedidos:
+            return {}
+        ahora = time.time()
+        with self._lock:
+            faltan = []
+            for t in pedidos:
+                entrada = self._cache.get(t)
+                if entrada is not None and self._vigente(entrada, ahora):
+                    self._cache.move_to_end(t)
+                    self.aciertos += 1
+                else:
+                    faltan.append(t)
+            self.fallos += len(faltan)
+
+        if faltan:
+            try:
+                nuevos = self.proveedor(faltan)
+                self.llamadas += 1
+            except Exception:
+                nuevos = None
+            with self._lock:
+                if nuevos is not None:
+                    for t in faltan:
+                        # Los que no vinieron se recuerdan como None un rato, para no pedirlos en cada rerun.
+                        self._cache[t] = (nuevos.get(t), ahora)
+                        self._cache.move_to_end(t)
+                while len(self._cache) > self.max_tickers:
+                    self._cache.popitem(last=False)
+
+        with self._lock:
+            resultado = {}
+            for t in pedidos:
+                entrada = self._cache.get(t)
+                if entrada is not None and entrada[0] is not None:
+                    resultado[t] = entrada[0]
+            return resultado
+
+    def tasa_aciertos(self):
+        total = self.aciertos + self.fallos
+        return self.aciertos / total if total else 0.0
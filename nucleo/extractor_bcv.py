@@ -0,0 +1,71 @@
+"""Extractor incremental de las tasas publicadas en la portada del BCV.
+
+La portada trae cada moneda en un bloque ``<div id="dolar">…<strong> 36,53 </strong>``
+(igual para euro, yuan, lira y rublo). En vez de construir el árbol completo
+con BeautifulSoup, se alimenta un ``lxml.etree.HTMLPullParser`` por trozos y
+se deja de leer en cuanto aparecen todas las monedas pedidas, así que con
+``requests(stream=True)`` ni siquiera se descarga el resto de la página.
+"""
+
+IDS_BCV = {"dolar": "USD", "euro": "EUR", "yuan": "CNY", "lira": "TRY", "rublo": "RUB"}
+
+
+def limpiar_tasa(texto):
+    """'36,53210000' -> 36.5321; acepta también '1.234,56'."""
+    texto = texto.strip().replace(" ", "")
+    if "," in texto:
+        texto = texto.replace(".", "").replace(",", ".")
+    return float(texto)
+
+
+def extraer_tasas(trozos, monedas=("USD", "EUR", "CNY", "TRY", "RUB")):
+    """Recorre ``trozos`` (bytes o str) y devuelve ``{"USD": 36.53, ...}``.
+
+    Se detiene en cuanto tiene todas las ``monedas``; las que no aparezcan
+    simplemente no están en el resultado.
+    """
+    if isinstance(trozos, (bytes, str)):
+        # Con la página entera en memoria se trocea igual: lxml procesa todo
+        # lo que recibe en cada feed() y así se puede cortar a tiempo.
+        html = trozos
+        trozos = (html[i:i + 8192] for i in range(0, len(html), 8192))
+    from lxml import etree
+
+    pendientes = {i: m for i, m in IDS_BCV.items() if m in monedas}
+    parser = etree.HTMLPullParser(events=("start", "end"))
+    tasas = {}
+    actual = None
+    profundidad = 0
+    for trozo in trozos:
+        parser.feed(trozo)
+        for evento, elem in parser.read_events():
+            if evento == "start":
+                if actual is not None:
+                    profundidad += 1
+                elif elem.tag == "div" and elem.get("id") in pendientes:
+                    actual, profundidad = pendientes.pop(elem.get("id")), 0
+                continue
+            if actual is not None:
+                if elem.tag == "strong" and actual not in tasas:
+                    try:
+                        tasas[actual] = limpiar_tasa("".join(elem.itertext()))
+                    except ValueError:
+                        pass
+                if profundidad == 0:
+                    actual = None
+                else:
+                    profundidad -= 1
+            else:
+                # Lo ya leído no hace falta: se libera para no crecer en memoria.
+                elem.clear()
+            if actual is None and not pendientes:
+                return tasas
+    return tasas
+
+
+def extraer_tasa_dolar(html):
+    """Solo la tasa del dólar; lanza ``ValueError`` si no aparece."""
+    tasas = extraer_tasas(html, monedas=("USD",))
+    if "USD" not in tasas:
+        raise ValueError("La página del BCV no trae la tasa del dólar")
+    return tasas["USD"]
@@ -0,0 +1,212 @@
+"""Historial diario OHLC guardado en SQLite para el Buscador.
+
+Por ticker se guarda qué rango de fechas ya está en disco. Al pedir un
+periodo ("1mo", "6mo", "1y", "5y") solo se descarga lo que falta: el tramo
+anterior a lo guardado (si se pide más atrás) y la cola desde la última
+vela (como mucho una vez cada ``ttl`` segundos, porque la vela de hoy
+cambia durante la sesión). El resto sale de cortar los datos locales.
+Con varios tickers a la vez (``cierres``) lo que falta se baja en un solo
+``yf.download`` por rango, no ticker por ticker.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import ExitStack
+
+import pandas as pd
+
+from nucleo.cache_libro import RUTA_CACHE
+
+COLUMNAS_OHLC = ["Open", "High", "Low", "Close", "Volume"]
+PERIODOS = {"1mo": pd.DateOffset(months=1), "6mo": pd.DateOffset(months=6),
+            "1y": pd.DateOffset(years=1), "2y": pd.DateOffset(years=2), "5y": pd.DateOffset(years=5)}
+
+
+def proveedor_yfinance(ticker, inicio, fin):
+    """Velas diarias de ``inicio`` a ``fin`` (ambas incluidas)."""
+    import yfinance as yf
+
+    return yf.Ticker(ticker).history(start=inicio, end=fin + pd.Timedelta(days=1), auto_adjust=True)
+
+
+def proveedor_yfinance_varios(tickers, inicio, fin):
+    """``{ticker: velas}`` de varios tickers en un solo ``yf.download``; los que no existen no están."""
+    import yfinance as yf
+
+    datos = yf.download(tickers, start=inicio, end=fin + pd.Timedelta(days=1), auto_adjust=True,
+                        group_by="ticker", progress=False)
+    if datos is None or datos.empty:
+        return {}
+    if not isinstance(datos.columns, pd.MultiIndex):
+        return {tickers[0]: datos}
+    velas = {}
+    for t in tickers:
+        if t in datos.columns.get_level_values(0):
+            df = datos[t].dropna(how="all")
+            if not df.empty:
+                velas[t] = df
+    return velas
+
+
+def uno_por_uno(proveedor):
+    """Proveedor de varios tickers a partir de uno de a un ticker."""
+    def proveedor_varios(tickers, inicio, fin):
+        return {t: proveedor(t, inicio, fin) for t in tickers}
+    return proveedor_varios
+
+
+class HistorialPrecios:
+    def __init__(self, ruta=None, proveedor=None, ttl=900, ttl_no_encontrado=600, proveedor_varios=None):
+        self.ruta = ruta or os.path.join(RUTA_CACHE, "historial_precios.sqlite")
+        self.proveedor = proveedor or proveedor_yfinance
+        if proveedor_varios is None:
+            proveedor_varios = proveedor_yfinance_varios if proveedor is None else uno_por_uno(proveedor)
+        self.proveedor_varios = proveedor_varios
+        self.ttl = ttl
+        self.ttl_no_encontrado = ttl_no_encontrado
+        # El lock del almacén solo cuida SQLite y los diccionarios; cada ticker descarga con el suyo.
+        self._lock = threading.Lock()
+        self._locks = {}
+        self._no_encontrados = {}
+        carpeta = os.path.dirname(self.ruta)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        with self._db() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS velas (ticker TEXT, fecha TEXT, Open REAL, High REAL,"
+                       " Low REAL, Close REAL, Volume REAL, PRIMARY KEY (ticker, fecha))")
+            db.execute("CREATE TABLE IF NOT EXISTS cobertura (ticker TEXT PRIMARY KEY, desde TEXT,"
+                       " hasta TEXT, revisado REAL)")
+
+    def _db(self):
+        return sqlite3.connect(self.ruta, timeout=10)
+
+    def _guardar(self, db, ticker, df):
+        if df is None or df.empty:
+            return
+        df = df.reindex(columns=COLUMNAS_OHLC)
+        fechas = pd.DatetimeIndex(df.index)
+        if fechas.tz is not None:
+            fechas = fechas.tz_localize(None)
+        filas = zip([ticker] * len(df), fechas.strftime("%Y-%m-%d"),
+                    *(df[c].astype(float).tolist() for c in COLUMNAS_OHLC))
+        db.executemany("INSERT OR REPLACE INTO velas VALUES (?, ?, ?, ?, ?, ?, ?)", filas)
+
+    def _lock_de(self, ticker):
+        with self._lock:
+            return self._locks.setdefault(ticker, threading.Lock())
+
+    def _tramos(self, fila, inicio, hoy, ahora):
+        """Rangos a descargar y la cobertura (desde, hasta, revisado) que queda después.
+
+        Cada rango va con la clave que lo agrupa con los de otros tickers:
+        los nuevos piden todos lo mismo, lo anterior a lo guardado empieza en
+        ``inicio`` y la cola termina en ``hoy``.
+        """
+        if fila is None:
+            return [(("nuevo", inicio, hoy), inicio, hoy)], inicio, hoy, ahora
+        desde, hasta, revisado = pd.Timestamp(fila[0]), pd.Timestamp(fila[1]), fila[2]
+        tramos = []
+        if inicio < desde:
+            tramos.append((("antes", inicio), inicio, desde - pd.Timedelta(days=1)))
+            desde = inicio
+        if hasta < hoy or ahora - revisado >= self.ttl:
+            # Se vuelve a pedir la última vela guardada: pudo cerrar distinto.
+            tramos.append((("cola", hoy), min(hasta, hoy), hoy))
+            hasta, revisado = max(hasta, hoy), ahora
+        return tramos, desde, hasta, revisado
+
+    def asegurar_varios(self, tickers, inicio, hoy=None, ahora=None):
+        """Como ``asegurar`` para varios tickers; devuelve los que existen, en el orden pedido.
+
+        Los rangos que faltan se agrupan (ver ``_tramos``) y cada grupo se baja
+        en una sola llamada a ``proveedor_varios``, desde el inicio más
+        temprano hasta el fin más tardío del grupo.
+        """
+        hoy = pd.Timestamp(hoy or pd.Timestamp.now()).normalize()
+        inicio = pd.Timestamp(inicio).normalize()
+        ahora = time.time() if ahora is None else ahora
+        tickers = [t for t in dict.fromkeys(tickers) if t]
+        with ExitStack() as locks:
+            # Siempre en el mismo orden, para que dos pedidos que se cruzan no se traben.
+            for t in sorted(tickers):
+                locks.enter_context(self._lock_de(t))
+            with self._lock:
+                vigentes = [t for t in tickers if ahora - self._no_encontrados.get(t, 0) >= self.ttl_no_encontrado]
+                with self._db() as db:
+                    filas = {t: db.execute("SELECT desde, hasta, revisado FROM cobertura WHERE ticker = ?",
+                                           (t,)).fetchone() for t in vigentes}
+            planes = {t: self._tramos(filas[t], inicio, hoy, ahora) for t in vigentes}
+            grupos = {}
+            for t in vigentes:
+                for clave, a, b in planes[t][0]:
+                    if a <= b:
+                        grupo = grupos.setdefault(clave, [a, b, []])
+                        grupo[0], grupo[1] = min(grupo[0], a), max(grupo[1], b)
+                        grupo[2].append(t)
+            velas = {t: [] for t in vigentes}
+            for a, b, grupo in grupos.values():
+                if len(grupo) == 1:
+                    bajadas = {grupo[0]: self.proveedor(grupo[0], a, b)}
+                else:
+                    bajadas = self.proveedor_varios(grupo, a, b)
+                for t, df in bajadas.items():
+                    if t in velas and df is not None and not df.empty:
+                        velas[t].append(df)
+            encontrados = []
+            with self._lock, self._db() as db:
+                for t in vigentes:
+                    if filas[t] is None and not velas[t]:
+                        self._no_encontrados[t] = ahora
+                        continue
+                    for df in velas[t]:
+                        self._guardar(db, t, df)
+                    _, desde, hasta, revisado = planes[t]
+                    db.execute("INSERT OR REPLACE INTO cobertura VALUES (?, ?, ?, ?)",
+                               (t, desde.strftime("%Y-%m-%d"), hasta.strftime("%Y-%m-%d"), revisado))
+                    encontrados.append(t)
+            return encontrados
+
+    def asegurar(self, ticker, inicio, hoy=None, ahora=None):
+        """Completa en disco el rango ``inicio``..``hoy``. Devuelve False si el ticker no existe.
+
+        La descarga se hace sin el lock del almacén: solo espera quien pide el mismo ticker.
+        """
+        return bool(self.asegurar_varios([ticker], inicio, hoy, ahora))
+
+    def velas(self, ticker, inicio, fin=None):
+        """Velas guardadas entre ``inicio`` y ``fin`` como DataFrame indexado por fecha."""
+        fin = pd.Timestamp(fin or pd.Timestamp.now())
+        with self._db() as db:
+            df = pd.read_sql_query(
+                "SELECT fecha, Open, High, Low, Close, Volume FROM velas"
+                " WHERE ticker = ? AND fecha >= ? AND fecha <= ? ORDER BY fecha", db,
+                params=(ticker, pd.Timestamp(inicio).strftime("%Y-%m-%d"), fin.strftime("%Y-%m-%d")))
+        df.index = pd.DatetimeIndex(pd.to_datetime(df.pop("fecha")), name="Date")
+        return df
+
+    def periodo(self, ticker, periodo="1y"):
+        """Equivalente a ``yf.Ticker(ticker).history(period=periodo)`` servido desde disco."""
+        ticker = ticker.upper().strip()
+        hoy = pd.Timestamp.now().normalize()
+        inicio = hoy - PERIODOS[periodo]
+        if not self.asegurar(ticker, inicio, hoy):
+            return pd.DataFrame(columns=COLUMNAS_OHLC)
+        return self.velas(ticker, inicio, hoy)
+
+    def cierres(self, tickers, inicio, fin=None):
+        """Cierres de varios tickers como DataFrame fechas × tickers (lo que falte se baja junto)."""
+        fin = pd.Timestamp(fin or pd.Timestamp.now()).normalize()
+        encontrados = self.asegurar_varios(tickers, inicio, fin)
+        if not encontrados:
+            return pd.DataFrame()
+        marcas = ",".join("?" * len(encontrados))
+        with self._db() as db:
+            df = pd.read_sql_query(
+                f"SELECT ticker, fecha, Close FROM velas WHERE ticker IN ({marcas})"
+                " AND fecha >= ? AND fecha <= ?", db,
+                params=(*encontrados, pd.Timestamp(inicio).strftime("%Y-%m-%d"), fin.strftime("%Y-%m-%d")))
+        tabla = df.pivot(index="fecha", columns="ticker", values="Close")
+        tabla.index = pd.to_datetime(tabla.index)
+        return tabla.sort_index()
@@ -0,0 +1,147 @@
+"""Sustituto local de ``GSheetsConnection`` para trabajar sin internet.
+
+Cada hoja es un CSV dentro de una carpeta. Imita la parte de la API que
+usan los dashboards (``read``/``update``/``clear``) y, a través de
+``client._select_worksheet``, la parte de la hoja de gspread que usa
+``nucleo`` (``get_all_values``, ``batch_get``, ``append_rows``, ``update``).
+``llamadas`` cuenta los viajes que serían a la red.
+"""
+
+import csv
+import os
+import threading
+from collections import Counter
+
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+
+def valores_a_dataframe(valores):
+    """Convierte una lista de filas de texto en DataFrame igual que gspread_dataframe."""
+    if not valores:
+        return pd.DataFrame()
+    ancho = max(len(f) for f in valores)
+    valores = [list(f) + [""] * (ancho - len(f)) for f in valores]
+    df = TextParser(valores, header=0).read()
+    df = df.dropna(how='all', axis=0)
+    sin_nombre = [c for c in df.columns if str(c).startswith("Unnamed:") and df[c].isna().all()]
+    return df.drop(columns=sin_nombre)
+
+
+class HojaLocal:
+    def __init__(self, ruta, llamadas):
+        self.ruta = ruta
+        self.title = os.path.splitext(os.path.basename(ruta))[0]
+        self._llamadas = llamadas
+        self._lock = threading.Lock()
+
+    def _leer(self):
+        if not os.path.exists(self.ruta):
+            return []
+        with open(self.ruta, newline="", encoding="utf-8") as f:
+            filas = [fila for fila in csv.reader(f)]
+        while filas and not any(c.strip() for c in filas[-1]):
+            filas.pop()
+        return filas
+
+    def _escribir(self, filas):
+        with open(self.ruta, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows(filas)
+
+    def get_all_values(self, **kwargs):
+        self._llamadas[self.title] += 1
+        return self._leer()
+
+    def batch_get(self, rangos, **kwargs):
+        from gspread.utils import a1_range_to_grid_range
+
+        self._llamadas[self.title] += 1
+        filas = self._leer()
+        resultado = []
+        for rango in rangos:
+            g = a1_range_to_grid_range(rango)
+            r0, r1 = g.get("startRowIndex", 0), g.get("endRowIndex", len(filas))
+            c0, c1 = g.get("startColumnIndex", 0), g.get("endColumnIndex")
+            bloque = [fila[c0:c1] for fila in filas[r0:r1]]
+            # La API recorta las filas vacías del final.
+            while bloque and not any(bloque[-1]):
+                bloque.pop()
+            resultado.append(bloque)
+        return resultado
+
+    def get(self, rango=None, **kwargs):
+        return self.batch_get([rango or "A:ZZ"])[0]
+
+    def append_rows(self, values, **kwargs):
+        self._llamadas[self.title] += 1
+        with self._lock:
+            filas = self._leer()
+            filas.extend([["" if v is None else str(v) for v in fila] for fila in values])
+            self._escribir(filas)
+
+    def update(self, range_name=None, values=None, **kwargs):
+        # Solo se usa para reescribir el encabezado desde A1.
+        self._llamadas[self.title] += 1
+        with self._lock:
+            filas = self._leer() or [[]]
+            filas[0] = [str(v) for v in values[0]]
+            self._escribir(filas)
+
+    def clear(self):
+        self._llamadas[self.title] += 1
+        self._escribir([])
+
+
+class _ClienteLocal:
+    def __init__(self, conexion):
+        self._conexion = conexion
+
+    def _select_worksheet(self, worksheet=None, **kwargs):
+        return self._conexion.hoja(worksheet)
+
+
+class ConexionLocal:
+    """Conexión falsa: cada ``worksheet`` es ``<carpeta>/<worksheet>.csv``."""
+
+    def __init__(self, carpeta):
+        self.carpeta = carpeta
+        self.llamadas = Counter()
+        self.client = _ClienteLocal(self)
+        self._hojas = {}
+        os.makedirs(carpeta, exist_ok=True)
+
+    def hoja(self, nombre):
+        if nombre not in self._hojas:
+            ruta = os.path.join(self.carpeta, f"{nombre}.csv")
+            self._hojas[nombre] = HojaLocal(ruta, self.llamadas)
+        return self._hojas[nombre]
+
+    def read(self, worksheet=None, ttl=None, **options):
+        ws = self.hoja(worksheet)
+        if not os.path.exists(ws.ruta):
+            raise FileNotFoundError(f"No existe la hoja '{worksheet}'")
+        return valores_a_dataframe(ws.get_all_values())
+
+    def update(self, worksheet=None, data=None, **kwargs):
+        ws = self.hoja(worksheet)
+        ws._llamadas[worksheet] += 1
+        df = pd.DataFrame(data).astype(object)
+        df = df.where(df.notna(), "")
+        ws._escribir([list(df.columns)] + df.astype(str).values.tolist())
+        return data
+
+    def clear(self, worksheet=None, **kwargs):
+        return self.hoja(worksheet).clear()
+
+
+def abrir_conexion(carpeta=None):
+    """Conexión para procesos sin página: la carpeta local si se indica, si no Google Sheets.
+
+    Para Sheets se usa el mismo conector que los dashboards (credenciales en
+    .streamlit/secrets.toml); funciona sin levantar ninguna página.
+    """
+    if carpeta:
+        return ConexionLocal(carpeta)
+    import streamlit as st
+    from streamlit_gsheets import GSheetsConnection
+    return st.connection("gsheets", type=GSheetsConnection)
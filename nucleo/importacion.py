@@ -0,0 +1,168 @@
+"""Importación masiva de operaciones desde extractos del broker (CSV o Excel).
+
+El extracto trae sus propias columnas; ``sugerir_mapeo`` adivina cuál es
+cuál y el usuario corrige. ``preparar_importacion`` limpia y valida todo el
+archivo por columnas (sin recorrer fila por fila): fechas, números con
+coma o punto decimal, compra/venta, la tasa del día sacada de la bitácora
+cuando falta, y que ninguna venta deje un ticker en negativo contando lo
+que ya está en el libro. Si no hay errores, las filas se anexan en una sola
+llamada con ``LibroOperaciones.anexar``.
+"""
+
+import re
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from nucleo.mercados import filas_operaciones, normalizar_operaciones
+
+CAMPOS = ("Fecha", "Ticker", "Tipo", "Cantidad", "Precio", "Tasa")
+OBLIGATORIOS = ("Fecha", "Ticker", "Cantidad", "Precio")
+SINONIMOS = {
+    "Fecha": ["fecha", "date", "trade date", "fecha operacion", "fecha compra", "fecha de operacion"],
+    "Ticker": ["ticker", "simbolo", "symbol", "instrumento", "accion", "valor"],
+    "Tipo": ["tipo", "side", "operacion", "accion", "buy/sell", "type", "transaccion"],
+    "Cantidad": ["cantidad", "quantity", "qty", "shares", "titulos", "acciones"],
+    "Precio": ["precio", "price", "precio operacion", "precio (bs)", "precio ($)", "trade price"],
+    "Tasa": ["tasa", "rate", "tasa cambio", "tasa cambio (bs/$)", "tasa bcv", "fx"],
+}
+# Primera letra de la columna Tipo: compra/buy y venta/sell.
+TIPOS = {"c": "Compra", "b": "Compra", "v": "Venta", "s": "Venta"}
+
+Importacion = namedtuple("Importacion", ["filas", "errores", "tasas_completadas"])
+
+
+def leer_extracto(archivo, nombre=None):
+    """DataFrame del extracto. ``archivo`` es una ruta o un archivo abierto (p.ej. el de ``st.file_uploader``)."""
+    nombre = (nombre or getattr(archivo, "name", None) or str(archivo)).lower()
+    if nombre.endswith((".xlsx", ".xlsm", ".xls")):
+        # pandas importa openpyxl recién aquí.
+        return pd.read_excel(archivo)
+    # Separador ',' o ';' según el archivo.
+    return pd.read_csv(archivo, sep=None, engine="python", dtype=str, skipinitialspace=True)
+
+
+def _clave(texto):
+    texto = str(texto).strip().lower()
+    for con, sin in zip("áéíóú", "aeiou"):
+        texto = texto.replace(con, sin)
+    return re.sub(r"\s+", " ", texto)
+
+
+def sugerir_mapeo(columnas):
+    """``{campo: columna del extracto o None}``: primero nombres exactos, después parecidos."""
+    claves = {c: _clave(c) for c in columnas}
+    mapeo, usadas = {}, set()
+    for campo in CAMPOS:
+        libres = [c for c in columnas if c not in usadas]
+        exacta = next((c for c in libres if claves[c] in SINONIMOS[campo]), None)
+        parecida = next((c for c in libres if any(s in claves[c] for s in SINONIMOS[campo][:2])), None)
+        mapeo[campo] = exacta or parecida
+        if mapeo[campo] is not None:
+            usadas.add(mapeo[campo])
+    return mapeo
+
+
+def a_numeros(serie, decimal=","):
+    """Columna de números; el texto se lee con ``decimal`` como separador decimal ('1.234,56' o '1,234.56')."""
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie.astype(float)
+    texto = serie.astype(str).str.replace(r"[^\d,.\-]", "", regex=True)
+    miles = "." if decimal == "," else ","
+    texto = texto.str.replace(miles, "", regex=False).str.replace(decimal, ".", regex=False)
+    return pd.to_numeric(texto, errors="coerce").where(serie.notna())
+
+
+def a_fechas(serie, dayfirst=True):
+    """Fechas del extracto; las ISO ('2024-01-31') se leen igual aunque se pida día primero."""
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+    texto = serie.astype(str).str.strip()
+    if texto[serie.notna()].str.match(r"\d{4}-\d{1,2}-\d{1,2}").all():
+        return pd.to_datetime(texto.where(serie.notna()), format="ISO8601", errors="coerce")
+    return pd.to_datetime(texto.where(serie.notna()), dayfirst=dayfirst, errors="coerce")
+
+
+def _tipos(serie, cantidad):
+    """Compra/Venta por la columna Tipo; si no hay, por el signo de la cantidad."""
+    por_signo = pd.Series(np.where(cantidad < 0, "Venta", "Compra"), index=cantidad.index).where(cantidad.notna())
+    if serie is None:
+        return por_signo
+    inicial = serie.astype(str).str.strip().str[:1].str.lower().where(serie.notna())
+    return inicial.map(TIPOS).where(inicial.notna(), por_signo)
+
+
+def _sobreventas(actuales, nuevas):
+    """Posiciones de ``nuevas`` en las que el saldo del ticker queda negativo.
+
+    Todo se ordena por fecha (lo que ya está en el libro primero y, dentro
+    del mismo día, las compras antes que las ventas) y se acumula por ticker.
+    """
+    movimientos = pd.concat([
+        pd.DataFrame({"Fecha": actuales["Fecha"], "Ticker": actuales["Ticker"], "Cantidad": actuales["Cantidad"],
+                      "Posicion": -1, "Nueva": 0}),
+        pd.DataFrame({"Fecha": nuevas["Fecha"], "Ticker": nuevas["Ticker"], "Cantidad": nuevas["Cantidad"],
+                      "Posicion": nuevas.index, "Nueva": 1}),
+    ], ignore_index=True)
+    movimientos["Fecha"] = movimientos["Fecha"].dt.normalize()
+    movimientos["Venta"] = movimientos["Cantidad"] < 0
+    movimientos = movimientos.sort_values(["Fecha", "Nueva", "Venta"], kind="stable")
+    saldo = movimientos.groupby("Ticker", sort=False)["Cantidad"].cumsum()
+    return movimientos.loc[(saldo < -1e-9) & (movimientos["Nueva"] == 1), "Posicion"].to_numpy()
+
+
+def preparar_importacion(df, mapeo, mercado, df_portafolio, tasas=None, decimal=",", dayfirst=True, max_dias=4):
+    """Filas listas para anexar al libro de ``mercado`` y la tabla de errores (vacía si todo está bien).
+
+    ``tasas`` es un ``HistorialTasas``: completa la tasa de las filas que no
+    la traen con la del día (o la del último día hábil, hasta ``max_dias``).
+    """
+    df = df.reset_index(drop=True)
+    faltan = [c for c in OBLIGATORIOS if not mapeo.get(c)]
+    if faltan:
+        raise ValueError(f"Falta indicar la columna de: {', '.join(faltan)}")
+
+    def columna(campo):
+        return df[mapeo[campo]] if mapeo.get(campo) else None
+
+    fecha = a_fechas(columna("Fecha"), dayfirst)
+    ticker = columna("Ticker").astype(str).str.strip().str.upper().where(columna("Ticker").notna(), "")
+    cantidad = a_numeros(columna("Cantidad"), decimal)
+    precio = a_numeros(columna("Precio"), decimal).abs()
+    tipo = _tipos(columna("Tipo"), cantidad)
+    cantidad = cantidad.abs()
+    tasa = a_numeros(columna("Tasa"), decimal) if mapeo.get("Tasa") else pd.Series(np.nan, index=df.index)
+    sin_tasa = ~(tasa > 0)
+    if tasas is not None and sin_tasa.any():
+        tasa = tasa.mask(sin_tasa, pd.Series(tasas.buscar_varias(fecha[sin_tasa], max_dias), index=fecha[sin_tasa].index))
+    tasas_completadas = int((sin_tasa & (tasa > 0)).sum())
+
+    problemas = [
+        (fecha.isna(), "fecha inválida"),
+        (ticker.isin(["", "NAN"]), "falta el ticker"),
+        (tipo.isna(), "tipo desconocido"),
+        (~(cantidad > 0), "cantidad inválida"),
+        (~(precio > 0), "precio inválido"),
+        (~(tasa > 0), "sin tasa para esa fecha"),
+    ]
+    motivos = pd.Series("", index=df.index)
+    for mascara, motivo in problemas:
+        motivos = motivos.mask(mascara, motivos + "; " + motivo)
+    ops = pd.DataFrame({"Ticker": ticker, "Cantidad": cantidad, "Precio": precio, "Fecha": fecha,
+                        "Tasa": tasa, "Tipo": tipo})
+    validas = ops[motivos == ""]
+    if len(validas):
+        actuales = normalizar_operaciones(df_portafolio, mercado) if not df_portafolio.empty else \
+            pd.DataFrame({"Fecha": pd.Series(dtype="datetime64[ns]"), "Ticker": [], "Cantidad": []})
+        firmadas = validas.assign(Cantidad=validas["Cantidad"].where(validas["Tipo"] != "Venta", -validas["Cantidad"]))
+        malas = _sobreventas(actuales, firmadas)
+        motivos.loc[malas] = "; vende más de lo que hay en cartera"
+
+    con_error = motivos != ""
+    errores = pd.DataFrame({
+        # Número de fila como se ve en el archivo (la 1 es el encabezado).
+        "Fila": df.index[con_error] + 2, "Ticker": ticker[con_error], "Fecha": fecha[con_error],
+        "Motivo": motivos[con_error].str[2:],
+    })
+    return Importacion(filas_operaciones(mercado, ops[~con_error]), errores.reset_index(drop=True), tasas_completadas)
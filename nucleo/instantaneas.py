@@ -0,0 +1,77 @@
+"""Fotos diarias de lo que baja el trabajador (tasa del BCV, precios de la BVC, cotizaciones).
+
+Cada fuente guarda una foto por día en ``<carpeta>/<fuente>/<AAAA-MM-DD>.json``.
+La del día se reemplaza entera con cada consulta (se escribe a un temporal
+y se renombra, así que quien lee nunca ve un archivo a medias); las de días
+anteriores ya no se tocan y quedan como historial. Los dashboards solo leen.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from nucleo.cache_libro import RUTA_CACHE
+
+Instantanea = namedtuple("Instantanea", ["fuente", "fecha", "obtenida", "datos"])
+
+
+class Instantaneas:
+    def __init__(self, carpeta=None):
+        self.carpeta = carpeta or os.path.join(RUTA_CACHE, "instantaneas")
+        self._lock = threading.Lock()
+        # Última foto leída por ruta, con su mtime: releer solo si cambió el archivo.
+        self._leidas = {}
+
+    def _ruta(self, fuente, fecha):
+        return os.path.join(self.carpeta, fuente, f"{fecha}.json")
+
+    def guardar(self, fuente, datos, obtenida=None):
+        """Foto de hoy de ``fuente`` (``datos`` debe poder pasarse a JSON)."""
+        obtenida = obtenida or time.time()
+        fecha = datetime.fromtimestamp(obtenida).strftime("%Y-%m-%d")
+        ruta = self._ruta(fuente, fecha)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump({"fuente": fuente, "fecha": fecha, "obtenida": obtenida, "datos": datos}, f)
+        os.replace(temporal, ruta)
+        return Instantanea(fuente, fecha, obtenida, datos)
+
+    def fechas(self, fuente):
+        """Días con foto de ``fuente``, del más viejo al más nuevo."""
+        try:
+            nombres = os.listdir(os.path.join(self.carpeta, fuente))
+        except OSError:
+            return []
+        return sorted(n[:-5] for n in nombres if n.endswith(".json"))
+
+    def del_dia(self, fuente, fecha):
+        ruta = self._ruta(fuente, fecha)
+        try:
+            mtime = os.path.getmtime(ruta)
+        except OSError:
+            return None
+        with self._lock:
+            guardada = self._leidas.get(ruta)
+            if guardada is not None and guardada[0] == mtime:
+                return guardada[1]
+        try:
+            with open(ruta, encoding="utf-8") as f:
+                d = json.load(f)
+        except (OSError, ValueError):
+            return None
+        foto = Instantanea(d["fuente"], d["fecha"], d["obtenida"], d["datos"])
+        with self._lock:
+            self._leidas[ruta] = (mtime, foto)
+        return foto
+
+    def ultima(self, fuente, max_edad=None):
+        """La foto más reciente; ``None`` si no hay o si tiene más de ``max_edad`` segundos."""
+        fechas = self.fechas(fuente)
+        foto = self.del_dia(fuente, fechas[-1]) if fechas else None
+        if foto is None or (max_edad is not None and time.time() - foto.obtenida > max_edad):
+            return None
+        return foto
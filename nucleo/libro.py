@@ -0,0 +1,187 @@
+import threading
+from datetime import date, datetime
+
+import pandas as pd
+
+_HOJAS_ABIERTAS = {}
+_LOCK_HOJAS = threading.Lock()
+
+
+class ConflictoDeVersion(Exception):
+    """La hoja cambió desde la última lectura (otra sesión escribió)."""
+
+
+def _hoja_inexistente(error):
+    # gspread solo se importa si hace falta (igual que en cache_libro).
+    from gspread.exceptions import WorksheetNotFound
+    return isinstance(error, WorksheetNotFound)
+
+
+def contar_filas(df):
+    """Filas de datos hasta la última con la primera columna llena."""
+    if df is None or df.empty:
+        return 0
+    col = df.iloc[:, 0]
+    llenas = col.notna() & (col.astype(str).str.strip() != "")
+    if not llenas.any():
+        return 0
+    # El lector de gspread descarta filas vacías pero conserva el índice
+    # original, así que el último índice lleno da la posición en la hoja.
+    return int(df.index[llenas.to_numpy()][-1]) + 1
+
+
+def _a_celda(v):
+    if isinstance(v, str):
+        return v
+    if pd.isna(v):
+        return ""
+    if isinstance(v, (datetime, date)):
+        return v.strftime('%Y-%m-%d')
+    if hasattr(v, "item"):
+        return v.item()
+    return v
+
+
+def _a_valores(df, columnas):
+    """Convierte el DataFrame en filas de celdas listas para la API de Sheets.
+
+    Se convierte columna por columna: fechas y números de una vez, y solo
+    las columnas de texto (que pueden traer de todo) celda por celda.
+    """
+    df = df.reindex(columns=columnas)
+    celdas = []
+    for col in columnas:
+        serie = df[col]
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            celdas.append(serie.dt.strftime('%Y-%m-%d').astype(object).where(serie.notna(), "").tolist())
+        elif pd.api.types.is_numeric_dtype(serie) or pd.api.types.is_bool_dtype(serie):
+            celdas.append(serie.astype(object).where(serie.notna(), "").tolist())
+        else:
+            celdas.append([_a_celda(v) for v in serie.tolist()])
+    return [list(fila) for fila in zip(*celdas)]
+
+
+class LibroOperaciones:
+    """Libro de operaciones guardado en una hoja de Google Sheets.
+
+    Las escrituras anexan filas al final en vez de reescribir la hoja
+    completa. Antes de anexar se compara el número de filas con el que
+    se leyó (la "versión"); si otra sesión escribió en el medio se lanza
+    ``ConflictoDeVersion`` y no se toca nada.
+
+    Con ``cache`` (un ``CacheLibro``) las lecturas salen de la copia local
+    y solo se piden a Sheets las filas nuevas.
+
+    Si la hoja no existe (una cartera nueva), se crea con el encabezado
+    ``columnas`` la primera vez que se abre, y se lee como un libro vacío.
+    """
+
+    def __init__(self, conn, hoja, columnas, cache=None):
+        self.conn = conn
+        self.hoja = hoja
+        self.columnas = list(columnas)
+        self.cache = cache
+        self.version = None
+
+    def leer(self, ttl=0):
+        ws = self._worksheet() if self.cache is not None else None
+        if ws is not None:
+            self.version = self.cache.sincronizar(self.hoja, ws)
+            df = self.cache.leer(self.hoja)
+            if df is not None:
+                return df
+        try:
+            df = self.conn.read(worksheet=self.hoja, ttl=ttl)
+        except Exception as e:
+            if not _hoja_inexistente(e):
+                raise
+            df = pd.DataFrame(columns=self.columnas)
+        self.version = contar_filas(df)
+        return df
+
+    def _worksheet(self):
+        # Solo el cliente con cuenta de servicio expone la hoja de gspread.
+        cliente = getattr(self.conn, "client", None)
+        selector = getattr(cliente, "_select_worksheet", None)
+        if selector is None:
+            return None
+        # Abrir la hoja cuesta dos viajes a la API; se reutiliza entre reruns.
+        clave = (id(cliente), self.hoja)
+        with _LOCK_HOJAS:
+            if clave not in _HOJAS_ABIERTAS:
+                try:
+                    ws = selector(worksheet=self.hoja)
+                except Exception as e:
+                    if not _hoja_inexistente(e):
+                        raise
+                    ws = self._crear_hoja(cliente)
+                _HOJAS_ABIERTAS[clave] = ws
+            return _HOJAS_ABIERTAS[clave]
+
+    def _crear_hoja(self, cliente):
+        # El encabezado va de una vez: así la versión de la hoja nueva es 0.
+        ws = cliente._open_spreadsheet().add_worksheet(title=self.hoja, rows=1000,
+                                                       cols=max(len(self.columnas), 26))
+        ws.update(range_name="A1", values=[self.columnas])
+        return ws
+
+    def _invalidar_cache(self):
+        if self.cache is not None:
+            self.cache.invalidar(self.hoja)
+
+    def anexar(self, df_nuevos, version=None):
+        """Anexa todas las filas de ``df_nuevos`` en una sola llamada.
+
+        ``version`` es el número de filas que se esperaba encontrar
+        (por defecto, el de la última lectura). Devuelve la nueva versión.
+        """
+        if version is None:
+            version = self.version
+        if df_nuevos.empty:
+            return version
+
+        ws = self._worksheet()
+        if ws is None:
+            return self._anexar_reescribiendo(df_nuevos, version)
+
+        encabezado, col_a = ws.batch_get(["1:1", "A:A"])
+        columnas = encabezado[0] if encabezado else self.columnas
+        actuales = max(len(col_a) - 1, 0)
+        if version is not None and actuales != version:
+            self._invalidar_cache()
+            raise ConflictoDeVersion(
+                f"'{self.hoja}' tiene {actuales} filas y se esperaban {version}."
+            )
+
+        faltantes = [c for c in df_nuevos.columns if c not in columnas]
+        if encabezado and faltantes:
+            # Hojas viejas sin alguna columna (p.ej. "Tasa"): ampliar el encabezado.
+            columnas = columnas + faltantes
+            ws.update(range_name="A1", values=[columnas])
+
+        valores = _a_valores(df_nuevos, columnas)
+        if not encabezado:
+            valores = [columnas] + valores
+        ws.append_rows(valores, value_input_option="USER_ENTERED", table_range="A1")
+        self._invalidar_cache()
+        self.version = actuales + len(df_nuevos)
+        return self.version
+
+    def _anexar_reescribiendo(self, df_nuevos, version):
+        # Respaldo para conexiones sin acceso a gspread: leer, unir y reescribir.
+        df_actual = self.conn.read(worksheet=self.hoja, ttl=0)
+        actuales = contar_filas(df_actual)
+        if version is not None and actuales != version:
+            raise ConflictoDeVersion(
+                f"'{self.hoja}' tiene {actuales} filas y se esperaban {version}."
+            )
+        df_actual = df_actual[df_actual.index < actuales]
+        columnas = list(df_actual.columns) if len(df_actual.columns) else self.columnas
+        for col in columnas:
+            if col not in df_nuevos.columns:
+                df_nuevos = df_nuevos.assign(**{col: None})
+        df_up = pd.concat([df_actual, df_nuevos[columnas]], ignore_index=True)
+        df_up = pd.DataFrame(_a_valores(df_up, columnas), columns=columnas)
+        self.conn.update(worksheet=self.hoja, data=df_up)
+        self.version = actuales + len(df_nuevos)
+        return self.version
@@ -0,0 +1,141 @@
+"""Casado de lotes (FIFO o costo promedio) y ganancias realizadas / no realizadas.
+
+Cada compra abre un lote con su costo unitario en las dos monedas: la del
+libro y la otra convertida con la ``Tasa`` de ese día. Cada venta consume
+lotes (los más viejos primero en FIFO, o el costo promedio ponderado) y su
+ganancia realizada queda en ambas monedas con las tasas históricas.
+
+Los lotes de cada ticker se guardan en tres listas planas (cantidad
+pendiente, costo local, costo en la otra moneda) con un puntero al primer
+lote abierto, así que casar N operaciones cuesta O(N).
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+ResultadoLotes = namedtuple("ResultadoLotes", ["lotes", "ventas", "moneda"])
+
+_EPS = 1e-9
+
+
+def _monedas(moneda):
+    if moneda not in ("USD", "Bs"):
+        raise ValueError("moneda debe ser 'USD' o 'Bs'")
+    return ("$", "Bs") if moneda == "USD" else ("Bs", "$")
+
+
+def _a_otra(precio, tasa, moneda):
+    if moneda == "USD":
+        return precio * tasa
+    return np.divide(precio, tasa, out=np.zeros_like(precio), where=tasa > 0)
+
+
+def casar_lotes(operaciones, moneda="USD", metodo="FIFO"):
+    """Casa compras y ventas de ``operaciones`` (``Fecha``, ``Ticker``, ``Cantidad`` con signo, ``Precio``, ``Tasa``).
+
+    ``Precio`` está en la moneda del libro (``moneda``) y ``Tasa`` es Bs/$
+    del día. Devuelve los lotes que siguen abiertos y el detalle de cada
+    venta. Lo que se venda por encima de lo que hay no se casa con nada.
+    """
+    if metodo not in ("FIFO", "Promedio"):
+        raise ValueError("metodo debe ser 'FIFO' o 'Promedio'")
+    local, otra = _monedas(moneda)
+    ops = operaciones.sort_values("Fecha", kind="stable")
+    codigos, tickers = pd.factorize(ops["Ticker"].astype(str))
+    cant = ops["Cantidad"].to_numpy(dtype=float)
+    precio = ops["Precio"].to_numpy(dtype=float)
+    precio_otra = _a_otra(precio, ops["Tasa"].to_numpy(dtype=float), moneda)
+    fechas = ops["Fecha"].to_numpy()
+
+    orden = np.argsort(codigos, kind="stable")
+    cortes = np.flatnonzero(np.diff(codigos[orden])) + 1
+    cant_l, precio_l, otra_l = cant.tolist(), precio.tolist(), precio_otra.tolist()
+
+    # Columnas de salida como listas planas: filas de los lotes abiertos y de las ventas.
+    l_fila, l_cant, l_costo_l, l_costo_o = [], [], [], []
+    v_fila, v_cant, v_costo_l, v_costo_o = [], [], [], []
+
+    for grupo in np.split(orden, cortes):
+        pendiente, costo_l, costo_o, fila_lote = [], [], [], []
+        cabeza = 0
+        for i in grupo.tolist():
+            q = cant_l[i]
+            if q > 0:
+                if metodo == "Promedio" and cabeza < len(pendiente):
+                    # Un solo lote con el costo promedio ponderado.
+                    total = pendiente[cabeza] + q
+                    costo_l[cabeza] = (costo_l[cabeza] * pendiente[cabeza] + precio_l[i] * q) / total
+                    costo_o[cabeza] = (costo_o[cabeza] * pendiente[cabeza] + otra_l[i] * q) / total
+                    pendiente[cabeza] = total
+                else:
+                    pendiente.append(q)
+                    costo_l.append(precio_l[i])
+                    costo_o.append(otra_l[i])
+                    fila_lote.append(i)
+                continue
+            if q == 0:
+                continue
+            vender, casado, c_l, c_o = -q, 0.0, 0.0, 0.0
+            while vender > _EPS and cabeza < len(pendiente):
+                toma = min(pendiente[cabeza], vender)
+                c_l += toma * costo_l[cabeza]
+                c_o += toma * costo_o[cabeza]
+                casado += toma
+                vender -= toma
+                pendiente[cabeza] -= toma
+                if pendiente[cabeza] <= _EPS:
+                    cabeza += 1
+            v_fila.append(i)
+            v_cant.append(casado)
+            v_costo_l.append(c_l)
+            v_costo_o.append(c_o)
+        l_fila += fila_lote[cabeza:]
+        l_cant += pendiente[cabeza:]
+        l_costo_l += costo_l[cabeza:]
+        l_costo_o += costo_o[cabeza:]
+
+    l_fila, v_fila = np.asarray(l_fila, dtype=int), np.asarray(v_fila, dtype=int)
+    df_lotes = pd.DataFrame({
+        "Ticker": tickers[codigos[l_fila]], "Fecha": fechas[l_fila], "Cantidad": l_cant,
+        f"Costo Unit. {local}": l_costo_l, f"Costo Unit. {otra}": l_costo_o,
+    })
+    v_cant = np.asarray(v_cant, dtype=float)
+    df_ventas = pd.DataFrame({
+        "Ticker": tickers[codigos[v_fila]], "Fecha": fechas[v_fila], "Cantidad": v_cant,
+        f"Costo {local}": v_costo_l, f"Costo {otra}": v_costo_o,
+        f"Ingreso {local}": v_cant * precio[v_fila], f"Ingreso {otra}": v_cant * precio_otra[v_fila],
+    })
+    for m in (local, otra):
+        df_ventas[f"Realizada {m}"] = df_ventas[f"Ingreso {m}"] - df_ventas[f"Costo {m}"]
+    return ResultadoLotes(df_lotes, df_ventas, moneda)
+
+
+def resumen_posiciones(resultado, precios, tasa_hoy):
+    """Una fila por ticker con lo abierto, su valor de hoy y la ganancia realizada y no realizada.
+
+    ``precios`` es ``{ticker: precio}`` en la moneda del libro y ``tasa_hoy`` la tasa Bs/$ actual.
+    """
+    local, otra = _monedas(resultado.moneda)
+    lotes, ventas = resultado.lotes, resultado.ventas
+    abiertos = pd.DataFrame({
+        "Ticker": lotes["Ticker"],
+        "Cantidad": lotes["Cantidad"],
+        f"Costo {local}": lotes["Cantidad"] * lotes[f"Costo Unit. {local}"],
+        f"Costo {otra}": lotes["Cantidad"] * lotes[f"Costo Unit. {otra}"],
+    }).groupby("Ticker").sum()
+    realizadas = ventas.groupby("Ticker")[[f"Realizada {local}", f"Realizada {otra}"]].sum()
+    tabla = abiertos.join(realizadas, how="outer").fillna(0.0)
+    tabla = tabla.reindex(columns=["Cantidad", f"Costo {local}", f"Costo {otra}",
+                                   f"Realizada {local}", f"Realizada {otra}"], fill_value=0.0)
+
+    tabla[f"Precio {local}"] = pd.Series(precios, dtype=float).reindex(tabla.index).fillna(0.0)
+    tabla[f"Valor {local}"] = tabla["Cantidad"] * tabla[f"Precio {local}"]
+    tabla[f"Valor {otra}"] = _a_otra(tabla[f"Valor {local}"].to_numpy(), np.full(len(tabla), float(tasa_hoy)),
+                                      resultado.moneda)
+    for m in (local, otra):
+        tabla[f"No Realizada {m}"] = tabla[f"Valor {m}"] - tabla[f"Costo {m}"]
+    costo = tabla["Costo $"]
+    tabla["Rentabilidad %"] = (tabla["No Realizada $"] / costo * 100).where(costo != 0, 0.0)
+    return tabla.reset_index()
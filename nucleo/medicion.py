@@ -0,0 +1,79 @@
+"""Medición ligera de los tramos calientes de un rerun.
+
+Una ``Medicion`` acumula, por nombre de tramo, tiempo de pared, número de
+llamadas y aciertos/fallos de caché. Se usa como context manager
+(``with medicion.tramo("Gráficos"):``) y se puede llamar desde varios hilos a
+la vez. ``registro()`` deja todo en un dict plano, listo para una línea JSON.
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+COLUMNAS_MEDICION = ["Tramo", "Llamadas", "Segundos", "Aciertos", "Fallos", "Aciertos %"]
+
+
+class Medicion:
+    def __init__(self, etiqueta=""):
+        self.etiqueta = etiqueta
+        self.inicio = time.time()
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self._tramos = {}
+
+    def _tramo(self, nombre):
+        # Se llama con el candado tomado.
+        return self._tramos.setdefault(nombre, {"llamadas": 0, "segundos": 0.0, "aciertos": 0, "fallos": 0})
+
+    @contextmanager
+    def tramo(self, nombre, cache=False):
+        """Mide el bloque. Con ``cache=True`` cuenta un acierto si dentro no se registró un fallo."""
+        with self._lock:
+            fallos_antes = self._tramo(nombre)["fallos"]
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            segundos = time.perf_counter() - t0
+            with self._lock:
+                datos = self._tramo(nombre)
+                datos["llamadas"] += 1
+                datos["segundos"] += segundos
+                if cache and datos["fallos"] == fallos_antes:
+                    datos["aciertos"] += 1
+
+    def contar_cache(self, nombre, aciertos=0, fallos=0):
+        with self._lock:
+            datos = self._tramo(nombre)
+            datos["aciertos"] += aciertos
+            datos["fallos"] += fallos
+
+    def total(self):
+        return time.perf_counter() - self._t0
+
+    def tabla(self):
+        with self._lock:
+            filas = [(n, d["llamadas"], d["segundos"], d["aciertos"], d["fallos"]) for n, d in self._tramos.items()]
+        tabla = pd.DataFrame(filas, columns=COLUMNAS_MEDICION[:-1])
+        consultas = tabla["Aciertos"] + tabla["Fallos"]
+        tabla["Aciertos %"] = (tabla["Aciertos"] / consultas * 100).where(consultas > 0)
+        return tabla.sort_values("Segundos", ascending=False, ignore_index=True)
+
+    def registro(self):
+        with self._lock:
+            tramos = {n: dict(d) for n, d in self._tramos.items()}
+        return {"etiqueta": self.etiqueta, "inicio": self.inicio, "total": self.total(), "tramos": tramos}
+
+
+def a_json_lines(registros):
+    """Una línea JSON por registro (p.ej. uno por rerun)."""
+    return "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in registros)
+
+
+def exportar_json_lines(registros, ruta):
+    """Anexa los registros a ``ruta`` en formato JSON lines."""
+    with open(ruta, "a", encoding="utf-8") as f:
+        f.write(a_json_lines(registros))
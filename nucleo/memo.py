@@ -0,0 +1,75 @@
+"""Memoización de tablas y figuras derivadas, por huella del contenido.
+
+Cada resultado se guarda bajo su nombre más las huellas de sus entradas
+(libro, tabla de precios, tasa, método...). Si en el rerun siguiente las
+entradas son las mismas, se devuelve lo guardado sin recalcular. Un
+resultado se entrega como ``Derivado`` (valor + clave), y pasado como
+entrada de otro cálculo aporta su clave en vez de volver a hashear la tabla:
+así se encadenan df_final → KPIs → figuras. Las entradas más viejas se
+descartan por LRU al pasar de ``max_entradas``.
+
+Los valores guardados se comparten entre reruns: quien los use no debe
+modificarlos en su lugar.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+
+import pandas as pd
+
+Derivado = namedtuple("Derivado", ["valor", "clave"])
+
+
+def huella(obj):
+    """Huella corta del contenido (tablas, series, dicts o escalares)."""
+    if isinstance(obj, Derivado):
+        return obj.clave
+    h = hashlib.blake2b(digest_size=12)
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        columnas = list(obj.columns) if isinstance(obj, pd.DataFrame) else [obj.name]
+        tipos = [str(t) for t in obj.dtypes] if isinstance(obj, pd.DataFrame) else [str(obj.dtype)]
+        h.update(repr((type(obj).__name__, columnas, tipos, obj.shape)).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, dict):
+        h.update(repr(sorted(obj.items(), key=lambda kv: str(kv[0]))).encode())
+    else:
+        h.update(repr(obj).encode())
+    return h.hexdigest()
+
+
+def con_huella(obj):
+    """Calcula la huella una sola vez para una entrada que se usa en varios cálculos."""
+    return obj if isinstance(obj, Derivado) else Derivado(obj, huella(obj))
+
+
+class Memo:
+    def __init__(self, max_entradas=16):
+        self.max_entradas = max_entradas
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def __len__(self):
+        return len(self._datos)
+
+    def derivar(self, nombre, funcion, *entradas):
+        """``funcion(*valores de entradas)``, recalculada solo si cambió alguna entrada."""
+        clave = huella((nombre,) + tuple(huella(e) for e in entradas))
+        with self._lock:
+            if clave in self._datos:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return Derivado(self._datos[clave], clave)
+        valor = funcion(*(e.valor if isinstance(e, Derivado) else e for e in entradas))
+        with self._lock:
+            self.fallos += 1
+            self._datos[clave] = valor
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+        return Derivado(valor, clave)
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
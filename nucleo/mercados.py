@@ -0,0 +1,114 @@
+"""Formato del libro de operaciones de cada mercado.
+
+El portafolio de la BVC (hoja "Portafolio", precios en Bs) y el
+internacional (hoja "Portafolio_INTL", precios en $) guardan lo mismo con
+columnas distintas. ``Mercado`` dice cómo se llama cada cosa en cada hoja y
+las funciones de aquí leen, limpian y arman filas nuevas para cualquiera
+de los dos.
+
+Varias carteras (un portafolio por analista) comparten el mismo documento:
+la principal usa las hojas de siempre y la cartera ``ana`` usa
+``Portafolio@ana`` y ``Portafolio_INTL@ana``. Historial_Tasas y Precios_Web
+son del mercado y las comparten todas.
+"""
+
+import re
+from collections import namedtuple
+
+import pandas as pd
+
+Mercado = namedtuple("Mercado", ["nombre", "hoja", "columnas", "fecha", "precio", "tasa", "moneda", "numericas"])
+
+BVC = Mercado(
+    nombre="BVC", hoja="Portafolio",
+    columnas=("Ticker", "Cantidad", "Precio Operacion (Bs)", "Fecha Compra", "Tasa Cambio (Bs/$)",
+              "Total Invertido (Bs)", "Total Invertido ($)", "Tipo"),
+    fecha="Fecha Compra", precio="Precio Operacion (Bs)", tasa="Tasa Cambio (Bs/$)", moneda="Bs",
+    numericas=("Cantidad", "Precio Operacion (Bs)", "Tasa Cambio (Bs/$)", "Total Invertido (Bs)", "Total Invertido ($)"),
+)
+
+INTL = Mercado(
+    nombre="INTL", hoja="Portafolio_INTL",
+    columnas=("Ticker", "Cantidad", "Precio", "Fecha", "Tipo", "Tasa"),
+    fecha="Fecha", precio="Precio", tasa="Tasa", moneda="USD",
+    numericas=("Cantidad", "Precio", "Tasa"),
+)
+
+
+def normalizar_cartera(nombre):
+    """Minúsculas, solo letras, números, '-' y '_'; vacío es la cartera principal."""
+    return re.sub(r"[^a-z0-9_-]", "", str(nombre or "").strip().lower())[:40]
+
+
+def carteras_configuradas(texto):
+    """``["", "ana", "luis"]`` a partir de "ana,luis": la principal siempre, primero."""
+    nombres = (normalizar_cartera(c) for c in str(texto or "").split(","))
+    return [""] + list(dict.fromkeys(c for c in nombres if c))
+
+
+def hoja_de_cartera(hoja, cartera=""):
+    """``Portafolio`` para la principal, ``Portafolio@ana`` para la cartera ``ana``."""
+    cartera = normalizar_cartera(cartera)
+    return f"{hoja}@{cartera}" if cartera else hoja
+
+
+def limpiar_operaciones(df, mercado):
+    """Quita filas vacías o sin fecha y fuerza los números (Sheets puede mandarlos como texto con coma)."""
+    df = df.dropna(how="all").copy()
+    if mercado.fecha in df.columns:
+        df[mercado.fecha] = pd.to_datetime(df[mercado.fecha], errors="coerce")
+        df = df.dropna(subset=[mercado.fecha])
+    for col in mercado.numericas:
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col].astype(str).str.replace(",", "."), errors="coerce")
+        if col in df.columns:
+            df[col] = df[col].fillna(0.0)
+    if "Tipo" not in df.columns:
+        df["Tipo"] = "Compra"
+    return df
+
+
+def cargar_operaciones(libro, mercado):
+    """Libro limpio; si no se puede leer, un DataFrame vacío con las columnas del mercado."""
+    try:
+        return limpiar_operaciones(libro.leer(ttl=0), mercado)
+    except Exception:
+        return pd.DataFrame(columns=list(mercado.columnas))
+
+
+def filas_operaciones(mercado, ops):
+    """Filas listas para ``LibroOperaciones.anexar`` a partir de columnas ``Ticker``, ``Cantidad``,
+    ``Precio``, ``Fecha``, ``Tasa`` y ``Tipo`` (cantidades positivas; las ventas se guardan en negativo)."""
+    cantidad = ops["Cantidad"].where(ops["Tipo"] != "Venta", -ops["Cantidad"])
+    fecha = pd.to_datetime(ops["Fecha"])
+    if mercado.moneda == "Bs":
+        total_bs = cantidad * ops["Precio"]
+        filas = {
+            "Ticker": ops["Ticker"], "Cantidad": cantidad, "Precio Operacion (Bs)": ops["Precio"],
+            "Fecha Compra": fecha, "Tasa Cambio (Bs/$)": ops["Tasa"],
+            "Total Invertido (Bs)": total_bs, "Total Invertido ($)": (total_bs / ops["Tasa"]).where(ops["Tasa"] > 0, 0),
+            "Tipo": ops["Tipo"],
+        }
+    else:
+        filas = {"Ticker": ops["Ticker"].str.upper(), "Cantidad": cantidad, "Precio": ops["Precio"],
+                 "Fecha": fecha, "Tipo": ops["Tipo"], "Tasa": ops["Tasa"]}
+    return pd.DataFrame(filas, columns=list(mercado.columnas))
+
+
+def fila_operacion(mercado, ticker, cantidad, precio, fecha, tasa, tipo):
+    """DataFrame de una fila lista para ``LibroOperaciones.anexar``. Las ventas van en negativo."""
+    return filas_operaciones(mercado, pd.DataFrame([{"Ticker": ticker, "Cantidad": cantidad, "Precio": precio,
+                                                      "Fecha": fecha, "Tasa": tasa, "Tipo": tipo}]))
+
+
+def registrar_operacion(libro, mercado, ticker, cantidad, precio, fecha, tasa, tipo):
+    """Anexa la operación; lanza ``ConflictoDeVersion`` si el libro cambió desde la última lectura."""
+    libro.anexar(fila_operacion(mercado, ticker, cantidad, precio, fecha, tasa, tipo))
+
+
+def normalizar_operaciones(df, mercado):
+    """Columnas comunes ``Fecha``, ``Ticker``, ``Cantidad``, ``Precio``, ``Tasa`` (precio en la moneda del mercado)."""
+    return pd.DataFrame({
+        "Fecha": df[mercado.fecha], "Ticker": df["Ticker"], "Cantidad": df["Cantidad"],
+        "Precio": df[mercado.precio], "Tasa": df[mercado.tasa] if mercado.tasa in df.columns else 0.0,
+    })
@@ -0,0 +1,44 @@
+"""Filtro, orden y paginación de libros grandes del lado del servidor.
+
+Al navegador solo llega la página que se ve, así que lo que cuesta
+serializar y dibujar la tabla no crece con el libro. Para ordenar se ordena
+solo la columna elegida y después se toman las filas de la página.
+"""
+
+import math
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+Pagina = namedtuple("Pagina", ["filas", "numero", "paginas", "total", "inicio"])
+
+
+def filtrar_libro(df, tickers=None, tipos=None, desde=None, hasta=None, columna_fecha="Fecha"):
+    """Filas con esos tickers y tipos, entre ``desde`` y ``hasta`` (ambos incluidos)."""
+    mascara = np.ones(len(df), dtype=bool)
+    if tickers:
+        mascara &= df["Ticker"].isin(tickers).to_numpy()
+    if tipos:
+        mascara &= df["Tipo"].isin(tipos).to_numpy()
+    if desde is not None:
+        mascara &= (df[columna_fecha] >= pd.Timestamp(desde)).to_numpy()
+    if hasta is not None:
+        # ``hasta`` es un día: entra completo aunque la columna tenga hora.
+        mascara &= (df[columna_fecha] < pd.Timestamp(hasta) + pd.Timedelta(days=1)).to_numpy()
+    return df if mascara.all() else df[mascara]
+
+
+def paginar(df, numero=1, tamano=50, orden=None, ascendente=True):
+    """La página ``numero`` (desde 1, ajustado al rango) de ``df`` ordenado por ``orden``."""
+    total = len(df)
+    paginas = max(1, math.ceil(total / tamano))
+    numero = min(max(1, int(numero)), paginas)
+    inicio = (numero - 1) * tamano
+    if orden:
+        columna = df[orden].reset_index(drop=True)
+        posiciones = columna.sort_values(ascending=ascendente, kind="stable", na_position="last").index
+        filas = df.iloc[posiciones[inicio:inicio + tamano]]
+    else:
+        filas = df.iloc[inicio:inicio + tamano]
+    return Pagina(filas, numero, paginas, total, inicio)
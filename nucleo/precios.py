@@ -0,0 +1,71 @@
+import pandas as pd
+
+CLAVES_TICKER = ["símbolo", "simbolo", "ticker"]
+CLAVES_PRECIO = ["último", "precio", "valor"]
+
+
+def limpiar_precio_bvc(valor):
+    if isinstance(valor, (int, float)): return float(valor)
+    texto = str(valor).strip()
+    if not texto: return 0.0
+    try: return float(texto.replace('.', '').replace(',', '.'))
+    except: return 0.0
+
+
+def limpiar_precios_bvc(serie):
+    """Versión por columna de ``limpiar_precio_bvc``: '1.234,56' -> 1234.56.
+
+    Los números que ya vienen como número se respetan; el texto que no se
+    puede convertir queda en 0.0.
+    """
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie.astype(float)
+    if serie.dtype == object:
+        try:
+            # .str devuelve NaN en lo que no es texto: así se separan sin recorrer fila por fila.
+            es_texto = serie.str.len().notna()
+        except AttributeError:
+            # Ningún valor es texto.
+            return pd.to_numeric(serie, errors="coerce").astype(float)
+        if not (es_texto | serie.isna()).all():
+            # Mezcla de números y texto: cada parte por su lado.
+            resultado = pd.to_numeric(serie.where(~es_texto), errors="coerce").astype(float)
+            resultado[es_texto] = limpiar_precios_bvc(serie[es_texto].astype(str))
+            return resultado
+        serie = serie.astype(str).where(serie.notna())
+    limpio = serie.str.strip().str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+    numeros = pd.to_numeric(limpio, errors="coerce").astype(float)
+    return numeros.fillna(0.0).where(serie.notna())
+
+
+def detectar_columnas(columnas):
+    """Nombres de la columna de ticker y de precio en la hoja Precios_Web."""
+    columnas = list(columnas)
+    col_ticker = next((c for c in columnas if any(t in c.lower() for t in CLAVES_TICKER)), None)
+    if not col_ticker: col_ticker = columnas[1] if len(columnas) > 1 else columnas[0]
+
+    col_precio = next((c for c in columnas if any(p in c.lower() for p in CLAVES_PRECIO)), None)
+    if not col_precio and len(columnas) > 2: col_precio = columnas[2]
+    return col_ticker, col_precio
+
+
+def tabla_precios_web(df_web):
+    """Tabla ``Ticker`` / ``Precio Bs.`` limpia a partir de la hoja Precios_Web.
+
+    Se descartan tickers vacíos y precios no positivos; si un ticker se repite
+    vale el último, igual que cuando se armaba el diccionario fila por fila.
+    """
+    vacia = pd.DataFrame({"Ticker": pd.Series(dtype=str), "Precio Bs.": pd.Series(dtype=float)})
+    if df_web is None or df_web.empty:
+        return vacia
+    df_web = df_web.copy()
+    df_web.columns = df_web.columns.astype(str).str.strip()
+    col_ticker, col_precio = detectar_columnas(df_web.columns)
+    if not col_ticker or not col_precio:
+        return vacia
+
+    tickers = df_web[col_ticker].astype(str).str.strip().str.upper()
+    precios = limpiar_precios_bvc(df_web[col_precio])
+    validos = (tickers != "") & (tickers != "NAN") & (precios > 0)
+    tabla = pd.DataFrame({"Ticker": tickers[validos].to_numpy(), "Precio Bs.": precios[validos].to_numpy()})
+    return tabla.drop_duplicates("Ticker", keep="last").reset_index(drop=True)
@@ -0,0 +1,81 @@
+"""Tabla de precios de la BVC indexada por ticker y precios fijados a mano.
+
+La tabla de la página es un DataFrame con índice ``Ticker`` y una columna
+``Precio Bs.``: buscar o cambiar un ticker es directo, sin máscaras.
+Lo que el usuario corrige en el editor se guarda en
+``precios_manuales.json`` dentro de la carpeta de caché (igual que la tasa
+del BCV), así que sobrevive a una recarga sin volver a leer Precios_Web.
+Cada cartera tiene su archivo (``precios_manuales@ana.json``).
+"""
+
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+from nucleo.cache_libro import RUTA_CACHE
+from nucleo.mercados import hoja_de_cartera
+
+COLUMNA_PRECIO = "Precio Bs."
+
+
+def tabla_precios_mercado(tickers, precios=None):
+    """Tabla con índice ``Ticker``; los que no están en ``precios`` quedan en 0."""
+    indice = pd.Index(list(dict.fromkeys(tickers)), name="Ticker", dtype=object)
+    serie = pd.Series(precios or {}, dtype=float).reindex(indice).fillna(0.0)
+    return serie.to_frame(COLUMNA_PRECIO)
+
+
+def cambios_del_editor(visual, estado):
+    """``{ticker: precio}`` con solo las celdas editadas.
+
+    ``estado`` es lo que ``st.data_editor`` deja en ``session_state[key]``:
+    ``edited_rows`` viene por posición de fila dentro de ``visual``.
+    """
+    cambios = {}
+    for fila, columnas in (estado or {}).get("edited_rows", {}).items():
+        if COLUMNA_PRECIO in columnas and columnas[COLUMNA_PRECIO] is not None:
+            cambios[visual.index[int(fila)]] = float(columnas[COLUMNA_PRECIO])
+    return cambios
+
+
+class PreciosManuales:
+    def __init__(self, ruta=None, cartera=""):
+        self.ruta = ruta or os.path.join(RUTA_CACHE, hoja_de_cartera("precios_manuales", cartera) + ".json")
+        self._lock = threading.Lock()
+        carpeta = os.path.dirname(self.ruta)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+
+    def _leer_archivo(self):
+        try:
+            with open(self.ruta, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _escribir_archivo(self, datos):
+        temporal = f"{self.ruta}.{os.getpid()}.tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(datos, f)
+        os.replace(temporal, self.ruta)
+
+    def leer(self):
+        """``{ticker: precio}`` de lo fijado a mano."""
+        return {t: d["precio"] for t, d in self._leer_archivo().items()}
+
+    def fijar(self, cambios):
+        """Guarda ``{ticker: precio}`` encima de lo que ya había."""
+        if not cambios:
+            return
+        ahora = time.time()
+        with self._lock:
+            datos = self._leer_archivo()
+            datos.update({t: {"precio": float(p), "fijado": ahora} for t, p in cambios.items()})
+            self._escribir_archivo(datos)
+
+    def borrar(self):
+        with self._lock:
+            self._escribir_archivo({})
@@ -0,0 +1,130 @@
+"""Carga masiva de tasas históricas en 'Historial_Tasas' desde archivos del BCV.
+
+La bitácora solo anota la tasa de los días en que alguien abrió un
+dashboard. Esto la completa con los boletines del BCV (los .xls de "tipo de
+cambio de referencia": una pestaña por día hábil con la "Fecha Valor" y una
+fila por moneda) o con un CSV de fecha y tasa. Los fines de semana y
+feriados se rellenan con la tasa del último día hábil (hasta ``max_hueco``
+días, para no inventar meses enteros si falta un archivo).
+
+Todo lo que falta se anexa en una sola escritura con
+``HistorialTasas.registrar_varias``, que salta las fechas que ya están:
+correrlo dos veces no duplica nada. Con ``lote`` se parte en varias
+escrituras (cada una vuelve a leer la hoja); si se corta a mitad de camino,
+la bitácora queda a medias y correrlo otra vez sigue donde quedó.
+"""
+
+import re
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from nucleo.extractor_bcv import limpiar_tasa
+from nucleo.importacion import a_fechas, a_numeros
+
+# rellenadas: cuántas de las anexadas son días sin publicación que tomaron la tasa anterior.
+Relleno = namedtuple("Relleno", ["leidas", "rellenadas", "anexadas", "ya_estaban"])
+
+_FECHA = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})")
+
+
+def _a_tasa(celda):
+    if isinstance(celda, (int, float, np.number)) and not pd.isna(celda):
+        return float(celda)
+    try:
+        return limpiar_tasa(str(celda))
+    except ValueError:
+        return None
+
+
+def _fecha_de_pestana(hoja, nombre):
+    """La "Fecha Valor" de la pestaña; si no aparece, el nombre de la pestaña (ddmmaaaa)."""
+    for fila in hoja.itertuples(index=False):
+        textos = [str(c) for c in fila if not pd.isna(c)]
+        for j, texto in enumerate(textos):
+            if "fecha valor" in texto.lower():
+                encontrada = _FECHA.search(" ".join(textos[j:]))
+                if encontrada:
+                    dia, mes, ano = map(int, encontrada.groups())
+                    return pd.Timestamp(ano, mes, dia)
+    solo_digitos = re.sub(r"\D", "", str(nombre))
+    if len(solo_digitos) == 8:
+        return pd.to_datetime(solo_digitos, format="%d%m%Y", errors="coerce")
+    return pd.NaT
+
+
+def _tasa_de_pestana(hoja, moneda):
+    """Último número de la fila de ``moneda`` (la columna de venta)."""
+    for fila in hoja.itertuples(index=False):
+        if any(str(c).strip().upper() == moneda for c in fila if not pd.isna(c)):
+            numeros = [t for t in map(_a_tasa, fila) if t is not None and t > 0]
+            if numeros:
+                return numeros[-1]
+    return None
+
+
+def leer_boletin_bcv(archivo, moneda="USD"):
+    """``pd.Series`` fecha → tasa de un boletín del BCV (.xls o .xlsx, una pestaña por día)."""
+    pestanas = pd.read_excel(archivo, sheet_name=None, header=None)
+    tasas = {}
+    for nombre, hoja in pestanas.items():
+        fecha, tasa = _fecha_de_pestana(hoja, nombre), _tasa_de_pestana(hoja, moneda)
+        if not pd.isna(fecha) and tasa:
+            tasas.setdefault(fecha, tasa)
+    return pd.Series(tasas, dtype=float, name="Tasa").sort_index()
+
+
+def leer_csv_tasas(archivo, decimal=",", dayfirst=True):
+    """``pd.Series`` fecha → tasa de un CSV con columnas Fecha y Tasa (o las dos primeras)."""
+    df = pd.read_csv(archivo, sep=None, engine="python", dtype=str, skipinitialspace=True)
+    columnas = {str(c).strip().lower(): c for c in df.columns}
+    fecha = df[columnas.get("fecha", df.columns[0])]
+    tasa = df[columnas.get("tasa", df.columns[1])]
+    serie = pd.Series(a_numeros(tasa, decimal).to_numpy(), index=a_fechas(fecha, dayfirst).to_numpy(), name="Tasa")
+    return serie[serie.index.notna() & (serie > 0)].sort_index()
+
+
+def leer_archivo_tasas(ruta, moneda="USD", decimal=",", dayfirst=True):
+    """Boletín del BCV o CSV según la extensión."""
+    if str(ruta).lower().endswith((".xls", ".xlsx", ".xlsm")):
+        return leer_boletin_bcv(ruta, moneda)
+    return leer_csv_tasas(ruta, decimal, dayfirst)
+
+
+def rellenar_huecos(tasas, hasta=None, max_hueco=7):
+    """Una tasa por día calendario: los días sin publicación toman la del último día con tasa.
+
+    Solo se rellenan huecos de hasta ``max_hueco`` días; ``hasta`` estira el
+    final (p.ej. hasta hoy) con el mismo límite.
+    """
+    tasas = pd.Series(tasas, dtype=float)
+    tasas.index = pd.DatetimeIndex(tasas.index).normalize()
+    tasas = tasas[~tasas.index.duplicated(keep="first")].sort_index()
+    if tasas.empty:
+        return tasas
+    fin = max(tasas.index[-1], pd.Timestamp(hasta).normalize()) if hasta is not None else tasas.index[-1]
+    dias = pd.date_range(tasas.index[0], fin, freq="D")
+    return tasas.reindex(dias).ffill(limit=max_hueco).dropna().rename("Tasa")
+
+
+def rellenar_bitacora(historial, tasas, hasta=None, max_hueco=7, lote=None, avance=None):
+    """Completa ``historial`` (un ``HistorialTasas``) con ``tasas`` y rellena fines de semana y feriados.
+
+    Las tasas de la bitácora valen más que las del archivo. Se anexa todo en
+    una escritura, o en lotes de ``lote`` fechas si se pide; ``avance(hechas, total)``
+    se llama después de cada escritura. Devuelve un ``Relleno``.
+    """
+    tasas = pd.Series(tasas, dtype=float)
+    tasas.index = pd.DatetimeIndex(tasas.index).normalize()
+    actuales = historial.serie()
+    # Se rellena sobre la unión para que también se cubran los huecos entre lo que ya estaba y el archivo.
+    completas = rellenar_huecos(pd.concat([actuales, tasas]), hasta, max_hueco)
+    faltan = completas[~completas.index.isin(actuales.index)]
+    lote = lote or max(len(faltan), 1)
+    anexadas = 0
+    for inicio in range(0, len(faltan), lote):
+        anexadas += historial.registrar_varias(faltan.iloc[inicio:inicio + lote])
+        if avance is not None:
+            avance(min(inicio + lote, len(faltan)), len(faltan))
+    return Relleno(len(tasas), int((~faltan.index.isin(tasas.index)).sum()), anexadas, len(completas) - len(faltan))
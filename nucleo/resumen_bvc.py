@@ -0,0 +1,168 @@
+"""Precios del resumen de mercado de la Bolsa de Caracas, leídos directamente de su página.
+
+Reemplaza a la hoja Precios_Web, que había que llenar a mano o con otra
+herramienta. La página trae una tabla con una fila por emisora (símbolo,
+último precio, variación, volumen...); se busca la primera tabla cuyo
+encabezado tenga una columna de símbolo y otra de precio, y los precios se
+limpian igual que los de la hoja (``tabla_precios_web``: '1.234,56' -> 1234.56).
+
+``ClienteBVC`` mantiene una sesión de ``requests`` (la conexión se reutiliza
+de una consulta a otra) y guarda la última tabla en ``precios_bvc.json``,
+con la hora en que se obtuvo y el ``ETag``/``Last-Modified`` de la
+respuesta. La siguiente consulta es condicional: si la página no cambió el
+servidor contesta 304 sin cuerpo y se reusa la tabla guardada.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+
+import pandas as pd
+
+from nucleo.cache_libro import RUTA_CACHE
+from nucleo.precios import CLAVES_TICKER, tabla_precios_web
+
+URL_BVC = os.environ.get("INVERSIONES_URL_BVC", "https://www.bolsadecaracas.com/resumen-mercado/")
+
+# En orden de preferencia: "Precio Apertura" solo vale si no hay último ni cierre.
+CLAVES_ULTIMO = ["último", "ultimo", "cierre", "precio"]
+
+# precios: {ticker: precio Bs.}; modificada: el Last-Modified del servidor, si lo manda;
+# sin_cambios: la página contestó 304 y la tabla es la guardada.
+PreciosBVC = namedtuple("PreciosBVC", ["precios", "obtenida", "modificada", "sin_cambios"])
+
+
+def _texto(celda):
+    return " ".join(celda.text_content().split())
+
+
+def _columna(encabezado, claves):
+    for clave in claves:
+        for i, nombre in enumerate(encabezado):
+            if clave in nombre.lower():
+                return i
+    return None
+
+
+def extraer_precios_bvc(html, encoding=None):
+    """Tabla ``Ticker`` / ``Precio Bs.`` del resumen de mercado (``html`` en bytes o str).
+
+    Los bytes se leen como ``encoding`` (por defecto UTF-8, el de la página).
+    Si ninguna tabla de la página tiene símbolo y precio la tabla sale vacía.
+    """
+    from lxml import html as lxml_html
+
+    vacia = tabla_precios_web(None)
+    if not html or not html.strip():
+        return vacia
+    if isinstance(html, bytes):
+        raiz = lxml_html.fromstring(html, parser=lxml_html.HTMLParser(encoding=encoding or "utf-8"))
+    else:
+        raiz = lxml_html.fromstring(html)
+    for tabla in raiz.iter("table"):
+        filas = [[_texto(c) for c in fila.xpath("./th|./td")] for fila in tabla.iter("tr")]
+        for n, encabezado in enumerate(filas):
+            col_ticker, col_precio = _columna(encabezado, CLAVES_TICKER), _columna(encabezado, CLAVES_ULTIMO)
+            if col_ticker is None or col_precio is None or col_ticker == col_precio:
+                continue
+            ancho = max(col_ticker, col_precio) + 1
+            datos = [(f[col_ticker], f[col_precio]) for f in filas[n + 1:] if len(f) >= ancho]
+            precios = tabla_precios_web(pd.DataFrame(datos, columns=["Símbolo", "Precio"], dtype=object))
+            if not precios.empty:
+                return precios
+            break
+    return vacia
+
+
+class ClienteBVC:
+    def __init__(self, url=None, ruta=None, timeout=10, reintento=300, sesion=None):
+        self.url = url or URL_BVC
+        self.ruta = ruta or os.path.join(RUTA_CACHE, "precios_bvc.json")
+        self.timeout = timeout
+        self.reintento = reintento
+        self._sesion = sesion
+        self._lock = threading.Lock()
+        carpeta = os.path.dirname(self.ruta)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+
+    @property
+    def sesion(self):
+        """Sesión con su propio pool de conexiones; se crea en la primera consulta."""
+        if self._sesion is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            sesion = requests.Session()
+            reintentos = Retry(total=2, backoff_factor=0.5, status_forcelist=(502, 503, 504), allowed_methods=["GET"])
+            adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=reintentos)
+            sesion.mount("https://", adaptador)
+            sesion.mount("http://", adaptador)
+            sesion.headers.update({"User-Agent": "inversiones/1.0", "Accept": "text/html"})
+            self._sesion = sesion
+        return self._sesion
+
+    def _leer_archivo(self):
+        try:
+            with open(self.ruta, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _escribir_archivo(self, datos):
+        temporal = f"{self.ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(datos, f)
+        os.replace(temporal, self.ruta)
+
+    def consultar(self):
+        """Consulta la página ahora mismo (condicional si hay tabla guardada). Devuelve ``PreciosBVC``."""
+        with self._lock:
+            datos = self._leer_archivo()
+            cabeceras = {}
+            if datos.get("precios"):
+                # Sin tabla guardada un 304 no serviría de nada: se pide la página entera.
+                if datos.get("etag"):
+                    cabeceras["If-None-Match"] = datos["etag"]
+                if datos.get("modificada"):
+                    cabeceras["If-Modified-Since"] = datos["modificada"]
+            try:
+                r = self.sesion.get(self.url, headers=cabeceras, timeout=self.timeout)
+                ahora = time.time()
+                if r.status_code == 304 and cabeceras:
+                    r.close()
+                    datos.update({"obtenida": ahora})
+                else:
+                    r.raise_for_status()
+                    # Sin charset en la cabecera, requests supondría latin-1: mejor el UTF-8 de la página.
+                    charset = "charset" in r.headers.get("Content-Type", "").lower()
+                    tabla = extraer_precios_bvc(r.content, r.encoding if charset else None)
+                    if tabla.empty:
+                        raise ValueError("El resumen de la BVC no trae precios")
+                    datos = {"precios": dict(zip(tabla["Ticker"], tabla["Precio Bs."].astype(float))),
+                             "obtenida": ahora, "etag": r.headers.get("ETag"),
+                             "modificada": r.headers.get("Last-Modified")}
+            except Exception:
+                datos["fallo"] = time.time()
+                self._escribir_archivo(datos)
+                raise
+            datos.pop("fallo", None)
+            self._escribir_archivo(datos)
+            return PreciosBVC(datos["precios"], datos["obtenida"], datos.get("modificada"), r.status_code == 304)
+
+    def leer(self, ttl=300):
+        """La tabla guardada si tiene menos de ``ttl`` segundos; si no, consulta la página.
+
+        Tras un fallo no se vuelve a consultar hasta pasados ``reintento``
+        segundos: mientras tanto lanza ``ConnectionError`` sin tocar la red.
+        """
+        datos = self._leer_archivo()
+        ahora = time.time()
+        if datos.get("precios") and ahora - datos.get("obtenida", 0) <= ttl:
+            return PreciosBVC(datos["precios"], datos["obtenida"], datos.get("modificada"), True)
+        if ahora - datos.get("fallo", 0) <= self.reintento:
+            raise ConnectionError("La BVC falló hace poco; se reintenta más tarde")
+        return self.consultar()
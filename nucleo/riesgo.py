@@ -0,0 +1,173 @@
+"""Métricas de riesgo del portafolio en $ y en Bs.
+
+Todo sale de la matriz de retornos diarios días × tickers, alineada con la
+bitácora de tasas: los precios se pasan a la otra moneda con la tasa de
+cada día y se calcula lo mismo en las dos. El portafolio se toma con los
+pesos de hoy (lo que vale cada posición), que es lo que se pregunta al
+medir VaR o volatilidad: "con lo que tengo ahora, ¿cuánto puedo perder?".
+
+Nada recorre fila por fila: volatilidad móvil por sumas acumuladas,
+drawdown por máximos acumulados y correlación por pares con productos de
+matrices sobre las máscaras de datos válidos (cada par usa los días en que
+ambos tienen precio). 200 tickers × 10 años se calculan en milisegundos.
+"""
+
+import math
+from collections import namedtuple
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+DIAS_HABILES = 252
+MONEDAS = ("$", "Bs")
+
+Riesgo = namedtuple("Riesgo", ["metricas", "volatilidad_movil", "drawdown", "correlacion", "retornos"])
+
+
+def alinear_precios(precios, tasas, moneda="USD"):
+    """``{"$": precios en $, "Bs": precios en Bs}`` sobre las fechas de ``precios``.
+
+    ``moneda`` es la de ``precios``; ``tasas`` es la serie Bs/$ (se rellena
+    hacia adelante y, antes de la primera, con la primera que haya).
+    """
+    precios = precios.sort_index().ffill()
+    tasa = pd.Series(tasas, dtype=float).sort_index()
+    tasa = tasa[~tasa.index.duplicated(keep="last")]
+    tasa = tasa.reindex(tasa.index.union(precios.index)).ffill().bfill().reindex(precios.index)
+    t = tasa.to_numpy()[:, None]
+    if moneda == "USD":
+        return {"$": precios, "Bs": precios * t}
+    return {"$": precios / t, "Bs": precios}
+
+
+def matriz_retornos(precios):
+    """Retornos simples días × tickers (NaN donde falta el precio de ayer o de hoy)."""
+    px = precios.to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = px[1:] / px[:-1] - 1
+    r[~np.isfinite(r)] = np.nan
+    return r
+
+
+def retorno_portafolio(r, pesos):
+    """Retorno diario con ``pesos`` fijos; cada día se reparten entre los tickers que tienen dato."""
+    validos = ~np.isnan(r)
+    suma = np.where(validos, r, 0.0) @ pesos
+    peso_valido = validos @ pesos
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(peso_valido > 0, suma / peso_valido, np.nan)
+
+
+def volatilidad_movil(rp, ventana):
+    """Volatilidad anualizada de ``ventana`` días (NaN hasta juntar la ventana)."""
+    x = np.nan_to_num(rp)
+    n = np.concatenate([[0], np.cumsum(~np.isnan(rp))])
+    s1 = np.concatenate([[0.0], np.cumsum(x)])
+    s2 = np.concatenate([[0.0], np.cumsum(x * x)])
+    vol = np.full(len(rp), np.nan)
+    if len(rp) >= ventana:
+        cuenta = n[ventana:] - n[:-ventana]
+        suma = s1[ventana:] - s1[:-ventana]
+        var = (s2[ventana:] - s2[:-ventana] - suma * suma / np.maximum(cuenta, 1)) / np.maximum(cuenta - 1, 1)
+        vol[ventana - 1:] = np.where(cuenta >= 2, np.sqrt(np.clip(var, 0, None) * DIAS_HABILES), np.nan)
+    return vol
+
+
+def drawdown(rp):
+    """Caída desde el máximo anterior de la cuenta que empieza en 1."""
+    indice = np.cumprod(1 + np.nan_to_num(rp))
+    return indice / np.maximum.accumulate(indice) - 1
+
+
+def correlacion(r):
+    """Correlación por pares con los días en que ambos tienen dato (como ``DataFrame.corr``)."""
+    m = (~np.isnan(r)).astype(float)
+    x = np.where(m > 0, r, 0.0)
+    n = m.T @ m
+    sx = x.T @ m            # suma de x_i en los días en que también hay x_j
+    sxx = (x * x).T @ m
+    sxy = x.T @ x
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sxy - sx * sx.T / n
+        var_i = sxx - sx * sx / n
+        corr = cov / np.sqrt(var_i * var_i.T)
+    corr[n < 3] = np.nan
+    return np.clip(corr, -1, 1)
+
+
+def retorno_anual(rp):
+    """Retorno diario compuesto a un año, en escala logarítmica para no desbordar.
+
+    Se compone la media de ``log(1 + r)``: con precios que saltan de un lado a
+    otro (los de operaciones de la BVC) la media simple elevada a 252 da
+    infinito. NaN sin datos o si algún día se perdió todo (r <= -1).
+    """
+    rp = rp[~np.isnan(rp)]
+    if not len(rp) or (rp <= -1).any():
+        return np.nan
+    with np.errstate(over="ignore"):
+        anual = float(np.expm1(DIAS_HABILES * np.log1p(rp).mean()))
+    return anual if math.isfinite(anual) else np.nan
+
+
+def var_historico(rp, confianza=0.95):
+    """Pérdida (positiva) que no se supera en ``confianza`` de los días observados."""
+    rp = rp[~np.isnan(rp)]
+    return -float(np.quantile(rp, 1 - confianza)) if len(rp) else np.nan
+
+
+def var_parametrico(rp, confianza=0.95):
+    """VaR normal: -(media + z·desvío)."""
+    rp = rp[~np.isnan(rp)]
+    if len(rp) < 2:
+        return np.nan
+    return -float(rp.mean() + NormalDist().inv_cdf(1 - confianza) * rp.std(ddof=1))
+
+
+def analizar_riesgo(precios, cantidades, tasas, moneda="USD", ventana=63, confianza=0.95, tasa_libre=0.0):
+    """Métricas de riesgo del portafolio de ``cantidades`` (``{ticker: cantidad}``) en $ y en Bs.
+
+    ``precios`` es DataFrame fechas × tickers en ``moneda`` ("USD" o "Bs");
+    ``tasa_libre`` es anual. Los montos de VaR son sobre el valor de hoy.
+    """
+    tickers = [t for t in precios.columns if cantidades.get(t, 0) > 0]
+    precios = precios[tickers].dropna(how="all")
+    monedas = alinear_precios(precios, tasas, moneda)
+    metricas, vol, caidas, retornos = {}, {}, {}, {}
+    corr = None
+    for nombre in MONEDAS:
+        px = monedas[nombre]
+        ultimo = px.iloc[-1].to_numpy(dtype=float) if len(px) else np.zeros(len(tickers))
+        valores = np.nan_to_num(ultimo) * np.array([cantidades[t] for t in tickers], dtype=float)
+        total = valores.sum()
+        pesos = valores / total if total > 0 else valores
+        r = matriz_retornos(px)
+        rp = retorno_portafolio(r, pesos) if len(r) else np.array([])
+        validos = rp[~np.isnan(rp)]
+        desvio = validos.std(ddof=1) if len(validos) > 1 else np.nan
+        media = validos.mean() if len(validos) else np.nan
+        dd = drawdown(rp)
+        v_hist, v_param = var_historico(rp, confianza), var_parametrico(rp, confianza)
+        metricas[nombre] = {
+            "Valor": total,
+            "Retorno anual %": retorno_anual(rp) * 100,
+            "Volatilidad anual %": desvio * math.sqrt(DIAS_HABILES) * 100,
+            "Sharpe": (media - tasa_libre / DIAS_HABILES) / desvio * math.sqrt(DIAS_HABILES) if desvio else np.nan,
+            "Máx. drawdown %": dd.min() * 100 if len(dd) else np.nan,
+            f"VaR histórico {confianza:.0%} (1 día) %": v_hist * 100,
+            f"VaR histórico {confianza:.0%} (1 día)": v_hist * total,
+            f"VaR paramétrico {confianza:.0%} (1 día) %": v_param * 100,
+            f"VaR paramétrico {confianza:.0%} (1 día)": v_param * total,
+            "Días": len(validos),
+        }
+        fechas = px.index[1:]
+        vol[nombre] = pd.Series(volatilidad_movil(rp, ventana) * 100, index=fechas)
+        caidas[nombre] = pd.Series(dd * 100, index=fechas)
+        retornos[nombre] = pd.Series(rp, index=fechas)
+        if nombre == "$" and len(r):
+            # La correlación entre tickers se mide en $: en Bs la devaluación común la infla.
+            corr = pd.DataFrame(correlacion(r), index=tickers, columns=tickers)
+    return Riesgo(pd.DataFrame(metricas), pd.DataFrame(vol), pd.DataFrame(caidas),
+                  corr if corr is not None else pd.DataFrame(index=tickers, columns=tickers, dtype=float),
+                  pd.DataFrame(retornos))
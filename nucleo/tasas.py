@@ -0,0 +1,163 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from nucleo.libro import ConflictoDeVersion
+
+COLUMNAS_TASAS = ["Fecha", "Tasa"]
+
+
+def _a_dia(fecha):
+    return np.datetime64(pd.Timestamp(fecha).date(), "D")
+
+
+class HistorialTasas:
+    """Bitácora de tasas BCV en memoria, ordenada por fecha.
+
+    Se carga una vez por proceso desde 'Historial_Tasas' (a través de un
+    ``LibroOperaciones``) y se mantiene en dos arreglos ordenados, así que
+    buscar una fecha es una búsqueda binaria. Lo que se registra se inserta
+    en su lugar sin volver a leer la hoja; cada ``intervalo`` segundos se
+    revisa si otro proceso anexó filas.
+    """
+
+    def __init__(self, libro, intervalo=600):
+        self.libro = libro
+        self.intervalo = intervalo
+        self._lock = threading.RLock()
+        self._fechas = np.array([], dtype="datetime64[D]")
+        self._tasas = np.array([], dtype=float)
+        self._version = None
+        self._revisado = 0.0
+        self.refrescar(forzar=True)
+
+    def __len__(self):
+        return len(self._fechas)
+
+    def __contains__(self, fecha):
+        self.refrescar()
+        dia = _a_dia(fecha)
+        i = np.searchsorted(self._fechas, dia)
+        return i < len(self._fechas) and self._fechas[i] == dia
+
+    def refrescar(self, forzar=False):
+        """Relee la hoja (vía caché) si pasó el intervalo y cambió la versión."""
+        with self._lock:
+            if not forzar and time.time() - self._revisado < self.intervalo:
+                return
+            self._revisado = time.time()
+            try:
+                df = self.libro.leer(ttl=0)
+            except Exception:
+                if self._version is None:
+                    self._version = 0
+                return
+            if self.libro.version == self._version and not forzar:
+                return
+            self._version = self.libro.version
+            self._cargar(df)
+
+    def _cargar(self, df):
+        if df is None or df.empty or not set(COLUMNAS_TASAS) <= set(df.columns):
+            self._fechas = np.array([], dtype="datetime64[D]")
+            self._tasas = np.array([], dtype=float)
+            return
+        fechas = pd.to_datetime(df["Fecha"], errors="coerce")
+        tasas = pd.to_numeric(df["Tasa"].astype(str).str.replace(',', '.'), errors="coerce")
+        serie = pd.Series(tasas.to_numpy(), index=fechas.dt.normalize().to_numpy())
+        serie = serie[serie.index.notna() & serie.notna() & (serie > 0)]
+        # Si una fecha quedó repetida vale la primera, como en la búsqueda original.
+        serie = serie[~serie.index.duplicated(keep="first")].sort_index()
+        self._fechas = serie.index.to_numpy().astype("datetime64[D]")
+        self._tasas = serie.to_numpy(dtype=float)
+
+    def buscar(self, fecha, max_dias=4):
+        """Tasa de ``fecha``; si no hay, la del último día hábil anterior.
+
+        ``max_dias`` limita cuánto hacia atrás se acepta (cubre fines de
+        semana y feriados). Devuelve ``None`` si no hay nada cercano.
+        """
+        self.refrescar()
+        with self._lock:
+            dia = _a_dia(fecha)
+            i = np.searchsorted(self._fechas, dia, side="right") - 1
+            if i < 0 or (dia - self._fechas[i]).astype(int) > max_dias:
+                return None
+            return float(self._tasas[i])
+
+    def buscar_varias(self, fechas, max_dias=4):
+        """``buscar`` para muchas fechas de una vez; NaN donde no hay tasa cercana."""
+        self.refrescar()
+        dias = pd.to_datetime(pd.Series(fechas)).dt.normalize().to_numpy().astype("datetime64[D]")
+        with self._lock:
+            i = np.searchsorted(self._fechas, dias, side="right") - 1
+            tasas = self._tasas[np.clip(i, 0, None)] if len(self._tasas) else np.full(len(dias), np.nan)
+            distancia = (dias - self._fechas[np.clip(i, 0, None)]).astype(int) if len(self._fechas) else 0
+        encontrada = (i >= 0) & ~np.isnat(dias) & (distancia <= max_dias)
+        return np.where(encontrada, tasas, np.nan)
+
+    def serie(self):
+        """Tasas como ``pd.Series`` indexada por fecha."""
+        with self._lock:
+            return pd.Series(self._tasas.copy(), index=pd.DatetimeIndex(self._fechas), name="Tasa")
+
+    def registrar(self, fecha, tasa):
+        """Anexa la tasa de ``fecha`` solo si esa fecha todavía no está."""
+        if tasa <= 0 or fecha in self:
+            return False
+        with self._lock:
+            nuevo = pd.DataFrame([{"Fecha": pd.Timestamp(fecha), "Tasa": tasa}])
+            try:
+                self.libro.anexar(nuevo, version=self._version)
+            except ConflictoDeVersion:
+                # Otro proceso escribió: releer y volver a decidir.
+                self.refrescar(forzar=True)
+                if fecha in self:
+                    return False
+                self.libro.anexar(nuevo, version=self._version)
+            self._version = self.libro.version
+            dia = _a_dia(fecha)
+            i = np.searchsorted(self._fechas, dia)
+            self._fechas = np.insert(self._fechas, i, dia)
+            self._tasas = np.insert(self._tasas, i, float(tasa))
+            return True
+
+    def _faltantes(self, tasas):
+        dias = tasas.index.to_numpy().astype("datetime64[D]")
+        i = np.clip(np.searchsorted(self._fechas, dias), 0, max(len(self._fechas) - 1, 0))
+        ya_esta = (self._fechas[i] == dias) if len(self._fechas) else np.zeros(len(dias), dtype=bool)
+        return tasas[~ya_esta]
+
+    def registrar_varias(self, tasas):
+        """Anexa en una sola escritura las tasas (``pd.Series`` fecha → tasa) de las fechas que no están.
+
+        Devuelve cuántas se anexaron. Lo que ya está no se toca, así que
+        repetirla con las mismas tasas no escribe nada.
+        """
+        tasas = pd.Series(tasas, dtype=float)
+        tasas.index = pd.DatetimeIndex(tasas.index).normalize()
+        tasas = tasas[(tasas > 0) & tasas.index.notna()]
+        tasas = tasas[~tasas.index.duplicated(keep="first")].sort_index()
+        with self._lock:
+            self.refrescar(forzar=True)
+            nuevas = self._faltantes(tasas)
+            if nuevas.empty:
+                return 0
+            try:
+                self.libro.anexar(pd.DataFrame({"Fecha": nuevas.index, "Tasa": nuevas.to_numpy()}),
+                                  version=self._version)
+            except ConflictoDeVersion:
+                self.refrescar(forzar=True)
+                nuevas = self._faltantes(tasas)
+                if nuevas.empty:
+                    return 0
+                self.libro.anexar(pd.DataFrame({"Fecha": nuevas.index, "Tasa": nuevas.to_numpy()}),
+                                  version=self._version)
+            self._version = self.libro.version
+            fechas = np.concatenate([self._fechas, nuevas.index.to_numpy().astype("datetime64[D]")])
+            orden = np.argsort(fechas, kind="stable")
+            self._fechas = fechas[orden]
+            self._tasas = np.concatenate([self._tasas, nuevas.to_numpy(dtype=float)])[orden]
+            return len(nuevas)
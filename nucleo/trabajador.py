@@ -0,0 +1,110 @@
+"""Trabajador sin interfaz: baja tasa, precios y cotizaciones con su propio horario.
+
+Cada ``Tarea`` es una función sin argumentos que devuelve lo que hay que
+fotografiar; el ``Trabajador`` la corre cada ``intervalo`` segundos y guarda
+el resultado en ``Instantaneas``. Si una tarea falla se reintenta antes
+(``reintento``) sin frenar a las demás. Así la consulta al BCV, a la BVC y a
+yfinance, y la escritura de la tasa del día en la bitácora, salen del
+camino de cada página.
+"""
+
+import logging
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from nucleo.precios import tabla_precios_web
+
+Tarea = namedtuple("Tarea", ["fuente", "funcion", "intervalo"])
+
+log = logging.getLogger("inversiones.trabajador")
+
+
+def tarea_bcv(descargar, historial=None):
+    """Tasas de la portada del BCV; con ``historial`` anota además la del día en la bitácora.
+
+    Si la bitácora no se puede escribir (cuota, red) la tasa se devuelve igual
+    para que quede la foto; se vuelve a intentar anotarla en la próxima vuelta.
+    """
+    def correr():
+        tasas = descargar()
+        if not tasas.get("USD", 0) > 0:
+            raise ValueError(f"Tasa inválida: {tasas.get('USD')}")
+        if historial is not None:
+            try:
+                historial.registrar(datetime.now().date(), tasas["USD"])
+            except Exception as e:
+                log.warning("bcv: no se pudo anotar la tasa en Historial_Tasas (%s)", e)
+        return tasas
+    return correr
+
+
+def tarea_precios_bvc(cliente, leer_hoja=None):
+    """``{ticker: precio Bs.}`` del resumen de mercado de la BVC (``cliente`` es un ``ClienteBVC``).
+
+    Si la página falla y hay ``leer_hoja`` (que devuelve la hoja Precios_Web
+    como DataFrame), se usa la hoja.
+    """
+    def correr():
+        if cliente is not None:
+            try:
+                return cliente.consultar().precios
+            except Exception as e:
+                if leer_hoja is None:
+                    raise
+                log.warning("precios_bvc: la BVC no respondió (%s), se usa Precios_Web", e)
+        tabla = tabla_precios_web(leer_hoja())
+        if tabla.empty:
+            raise ValueError("Precios_Web sin precios válidos")
+        return dict(zip(tabla["Ticker"], tabla["Precio Bs."].astype(float)))
+    return correr
+
+
+def tarea_cotizaciones(proveedor, tickers):
+    """``{ticker: precio $}`` de los tickers que devuelva ``tickers()`` (los de los libros internacionales)."""
+    def correr():
+        lista = sorted(set(tickers()))
+        return proveedor(lista) if lista else {}
+    return correr
+
+
+class Trabajador:
+    def __init__(self, instantaneas, tareas, reintento=60, reloj=time.time, dormir=time.sleep):
+        self.instantaneas = instantaneas
+        self.tareas = list(tareas)
+        self.reintento = reintento
+        self.reloj = reloj
+        self.dormir = dormir
+        self.proxima = {t.fuente: 0.0 for t in self.tareas}
+        self.errores = {}
+
+    def correr_tarea(self, tarea):
+        """Corre ``tarea`` y guarda su foto. Devuelve ``True`` si salió bien."""
+        inicio = self.reloj()
+        try:
+            datos = tarea.funcion()
+        except Exception as e:
+            self.errores[tarea.fuente] = str(e)
+            self.proxima[tarea.fuente] = inicio + min(self.reintento, tarea.intervalo)
+            log.warning("%s falló: %s", tarea.fuente, e)
+            return False
+        self.instantaneas.guardar(tarea.fuente, datos)
+        self.errores.pop(tarea.fuente, None)
+        self.proxima[tarea.fuente] = inicio + tarea.intervalo
+        log.info("%s: %d datos en %.1f s", tarea.fuente, len(datos), self.reloj() - inicio)
+        return True
+
+    def correr_pendientes(self):
+        """Corre las tareas a las que ya les tocaba. Devuelve ``{fuente: salió bien}``."""
+        ahora = self.reloj()
+        return {t.fuente: self.correr_tarea(t) for t in self.tareas if self.proxima[t.fuente] <= ahora}
+
+    def correr(self, vueltas=None):
+        """Bucle principal: corre lo pendiente y duerme hasta la próxima tarea (``vueltas=None`` es para siempre)."""
+        hechas = 0
+        while vueltas is None or hechas < vueltas:
+            self.correr_pendientes()
+            hechas += 1
+            if vueltas is not None and hechas >= vueltas:
+                break
+            self.dormir(max(min(self.proxima.values()) - self.reloj(), 1))
@@ -0,0 +1,219 @@
+"""Curva diaria del valor del portafolio a partir del libro de operaciones.
+
+Todo vive en matrices días × tickers: lo operado cada día, la posición
+acumulada, los precios observados y los precios rellenados hacia adelante.
+Cuando llegan operaciones, precios o tasas nuevas solo se recalcula desde
+el primer día afectado, así que anexar la operación de hoy o el cierre de
+hoy cuesta una fila y no todo el historial.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _rellenar(semilla, obs):
+    """Rellena hacia adelante ``obs`` (2D) empezando desde la fila ``semilla``."""
+    if len(obs) == 0:
+        return obs.copy()
+    bloque = np.vstack([semilla[None, :], obs])
+    validos = ~np.isnan(bloque)
+    idx = np.where(validos, np.arange(len(bloque))[:, None], 0)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    return bloque[idx, np.arange(bloque.shape[1])][1:]
+
+
+class CurvaPatrimonio:
+    """Motor incremental de la curva de patrimonio.
+
+    ``moneda`` es la moneda de los precios del libro: "USD" para el
+    portafolio internacional, "Bs" para el de la BVC. Las tasas son Bs/$.
+    """
+
+    def __init__(self, moneda="USD"):
+        if moneda not in ("USD", "Bs"):
+            raise ValueError("moneda debe ser 'USD' o 'Bs'")
+        self.moneda = moneda
+        self.inicio = None
+        self.tickers = []
+        self._col = {}
+        self.n_operaciones = 0
+        D = 0
+        self._delta = np.zeros((D, 0))
+        self._pos = np.zeros((D, 0))
+        self._obs = np.zeros((D, 0))
+        self._px = np.zeros((D, 0))
+        self._flujo = np.zeros((D, 2))
+        self._invertido = np.zeros((D, 2))
+        self._tasa_obs = np.zeros(D)
+        self._tasa = np.zeros(D)
+        self._valor = np.zeros(D)
+        self._sucio = None
+
+    # --- forma de las matrices ---
+    def __len__(self):
+        return len(self._valor)
+
+    def _marcar(self, fila):
+        fila = max(int(fila), 0)
+        self._sucio = fila if self._sucio is None else min(self._sucio, fila)
+
+    def _asegurar_fechas(self, primera, ultima):
+        primera, ultima = pd.Timestamp(primera).normalize(), pd.Timestamp(ultima).normalize()
+        if self.inicio is None:
+            self.inicio = primera
+        antes = max((self.inicio - primera).days, 0)
+        despues = max((ultima - self.inicio).days + 1 - len(self), 0)
+        if not antes and not despues:
+            return
+
+        def crecer(m, relleno):
+            forma = (antes,) + m.shape[1:], (despues,) + m.shape[1:]
+            return np.concatenate([np.full(forma[0], relleno), m, np.full(forma[1], relleno)])
+
+        viejo = len(self)
+        self._delta, self._pos = crecer(self._delta, 0.0), crecer(self._pos, 0.0)
+        self._obs, self._px = crecer(self._obs, np.nan), crecer(self._px, np.nan)
+        self._flujo, self._invertido = crecer(self._flujo, 0.0), crecer(self._invertido, 0.0)
+        self._tasa_obs, self._tasa = crecer(self._tasa_obs, np.nan), crecer(self._tasa, np.nan)
+        self._valor = crecer(self._valor, 0.0)
+        if antes:
+            self.inicio = self.inicio - pd.Timedelta(days=antes)
+            self._marcar(0)
+        else:
+            self._marcar(viejo)
+
+    def _asegurar_tickers(self, tickers):
+        nuevos = [t for t in dict.fromkeys(tickers) if t not in self._col]
+        if not nuevos:
+            return
+        for t in nuevos:
+            self._col[t] = len(self.tickers)
+            self.tickers.append(t)
+        D, n = len(self), len(nuevos)
+        self._delta = np.hstack([self._delta, np.zeros((D, n))])
+        self._pos = np.hstack([self._pos, np.zeros((D, n))])
+        self._obs = np.hstack([self._obs, np.full((D, n), np.nan)])
+        self._px = np.hstack([self._px, np.full((D, n), np.nan)])
+
+    def _recortar(self, tabla):
+        """Lo anterior al inicio de la curva solo sirve de semilla: queda como fila del primer día."""
+        if self.inicio is None or tabla.index.min() >= self.inicio:
+            return tabla
+        antes, resto = tabla[tabla.index < self.inicio], tabla[tabla.index >= self.inicio]
+        semilla = antes.ffill().iloc[[-1]].set_axis([self.inicio])
+        if len(resto) and resto.index[0] == self.inicio:
+            semilla = resto.iloc[[0]].combine_first(semilla)
+            resto = resto.iloc[1:]
+        return pd.concat([semilla, resto])
+
+    def _filas(self, fechas):
+        return (pd.DatetimeIndex(fechas).normalize() - self.inicio).days.to_numpy()
+
+    # --- entradas ---
+    def agregar_operaciones(self, operaciones, hasta=None):
+        """Suma operaciones (``Fecha``, ``Ticker``, ``Cantidad`` con signo).
+
+        Si traen ``Monto $`` y ``Monto Bs`` (lo pagado, negativo si se cobró,
+        convertido con la tasa del día de la operación) la curva incluye
+        también el capital invertido.
+        """
+        if operaciones is None or operaciones.empty:
+            return
+        fechas = pd.to_datetime(operaciones["Fecha"])
+        self._asegurar_fechas(fechas.min(), max(fechas.max(), pd.Timestamp(hasta or fechas.max())))
+        tickers = operaciones["Ticker"].astype(str).to_numpy()
+        self._asegurar_tickers(tickers)
+        filas = self._filas(fechas)
+        cols = np.fromiter((self._col[t] for t in tickers), dtype=int, count=len(tickers))
+        np.add.at(self._delta, (filas, cols), operaciones["Cantidad"].to_numpy(dtype=float))
+        for i, col in enumerate(["Monto $", "Monto Bs"]):
+            if col in operaciones:
+                np.add.at(self._flujo[:, i], filas, operaciones[col].fillna(0).to_numpy(dtype=float))
+        self.n_operaciones += len(operaciones)
+        self._marcar(filas.min())
+
+    def fijar_precios(self, precios):
+        """Precios observados: DataFrame fechas × tickers (NaN = sin dato ese día)."""
+        if precios is None or precios.empty:
+            return
+        precios = self._recortar(precios.sort_index())
+        self._asegurar_fechas(precios.index.min(), precios.index.max())
+        self._asegurar_tickers([str(c) for c in precios.columns])
+        filas = self._filas(precios.index)
+        cols = np.array([self._col[str(c)] for c in precios.columns])
+        nuevos = precios.to_numpy(dtype=float)
+        actuales = self._obs[np.ix_(filas, cols)]
+        distintos = ~((nuevos == actuales) | (np.isnan(nuevos) & np.isnan(actuales)))
+        if not distintos.any():
+            return
+        self._obs[np.ix_(filas, cols)] = np.where(np.isnan(nuevos), actuales, nuevos)
+        self._marcar(filas[distintos.any(axis=1)].min())
+
+    def fijar_tasas(self, tasas):
+        """Serie de tasas Bs/$ indexada por fecha."""
+        if tasas is None or len(tasas) == 0:
+            return
+        tasas = self._recortar(tasas.sort_index())
+        self._asegurar_fechas(tasas.index.min(), tasas.index.max())
+        filas = self._filas(tasas.index)
+        nuevos = tasas.to_numpy(dtype=float)
+        actuales = self._tasa_obs[filas]
+        distintos = ~((nuevos == actuales) | (np.isnan(nuevos) & np.isnan(actuales)))
+        if not distintos.any():
+            return
+        self._tasa_obs[filas] = nuevos
+        self._marcar(filas[distintos].min())
+
+    def extender_hasta(self, fecha):
+        """Alarga la curva hasta ``fecha`` (p.ej. hoy) manteniendo posiciones y precios."""
+        if self.inicio is not None:
+            self._asegurar_fechas(self.inicio, fecha)
+
+    # --- cálculo ---
+    def _recalcular(self):
+        k = self._sucio
+        if k is None or k >= len(self):
+            self._sucio = None
+            return
+        T = len(self.tickers)
+        pos_previa = self._pos[k - 1] if k > 0 else np.zeros(T)
+        self._pos[k:] = pos_previa + np.cumsum(self._delta[k:], axis=0)
+        px_previo = self._px[k - 1] if k > 0 else np.full(T, np.nan)
+        self._px[k:] = _rellenar(px_previo, self._obs[k:])
+        inv_previo = self._invertido[k - 1] if k > 0 else np.zeros(2)
+        self._invertido[k:] = inv_previo + np.cumsum(self._flujo[k:], axis=0)
+        tasa_previa = np.array([self._tasa[k - 1] if k > 0 else np.nan])
+        self._tasa[k:] = _rellenar(tasa_previa, self._tasa_obs[k:, None])[:, 0]
+        self._valor[k:] = np.nansum(self._pos[k:] * self._px[k:], axis=1)
+        self._sucio = None
+
+    def curva(self):
+        """DataFrame diario con ``Valor $``, ``Valor Bs`` e ``Invertido`` (en ambas monedas)."""
+        self._recalcular()
+        fechas = pd.date_range(self.inicio, periods=len(self), freq="D") if len(self) else pd.DatetimeIndex([])
+        # Antes de la primera tasa conocida se usa la primera que haya.
+        tasa = pd.Series(self._tasa, index=fechas).bfill().to_numpy()
+        if self.moneda == "USD":
+            valor_usd, valor_bs = self._valor, self._valor * tasa
+        else:
+            valor_bs, valor_usd = self._valor, self._valor / tasa
+        return pd.DataFrame({"Valor $": valor_usd, "Valor Bs": valor_bs,
+                             "Invertido $": self._invertido[:, 0], "Invertido Bs": self._invertido[:, 1],
+                             "Tasa": tasa}, index=fechas)
+
+    def posiciones(self):
+        """Matriz diaria de posiciones (fechas × tickers)."""
+        self._recalcular()
+        fechas = pd.date_range(self.inicio, periods=len(self), freq="D") if len(self) else pd.DatetimeIndex([])
+        return pd.DataFrame(self._pos.copy(), index=fechas, columns=list(self.tickers))
+
+
+def curva_patrimonio(operaciones, precios, tasas, moneda="USD", hasta=None):
+    """Atajo: construye el motor completo y devuelve la curva."""
+    motor = CurvaPatrimonio(moneda)
+    motor.agregar_operaciones(operaciones, hasta=hasta)
+    motor.fijar_precios(precios)
+    motor.fijar_tasas(tasas)
+    if hasta is not None:
+        motor.extender_hasta(hasta)
+    return motor.curva()
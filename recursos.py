@@ -0,0 +1,574 @@
+"""Recursos de Streamlit compartidos por los dos dashboards.
+
+Aquí solo está el pegamento con Streamlit (conexión, cachés por proceso y
+mensajes); la lógica vive en ``nucleo``. Como ``st.cache_resource`` es por
+proceso, las dos páginas usan la misma caché del libro, el mismo robot del
+BCV y la misma bitácora de tasas.
+
+Cada sesión trabaja sobre una cartera (``elegir_cartera``). Lo del mercado
+(tasa del BCV, bitácora de tasas, precios y cotizaciones) se comparte entre
+todas; los libros y los precios fijados a mano son de cada cartera, y al
+guardar una operación solo se invalida lo de esa cartera.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from nucleo import (CacheLibro, ClienteBVC, ConexionLocal, ConflictoDeVersion, CurvaPatrimonio, HistorialTasas,
+                    Instantaneas, LibroOperaciones, Medicion, Memo, PreciosManuales, ServicioCotizaciones, TasaBCV, a_json_lines,
+                    analizar_riesgo, cargar_en_paralelo, carteras_configuradas, exportar_json_lines, filtrar_libro,
+                    hoja_de_cartera, leer_extracto, lectura_de_foto, normalizar_cartera, paginar, preparar_importacion,
+                    proveedor_tabla, registrar_operacion, resumir_atribucion, sugerir_mapeo, tabla_precios_web)
+from nucleo.importacion import CAMPOS, OBLIGATORIOS
+from nucleo.tasas import COLUMNAS_TASAS
+
+
+# --- MEDICIÓN POR RERUN ---
+# Con INVERSIONES_MEDICIONES=<archivo> cada rerun se anexa ahí como una línea JSON.
+RUTA_MEDICIONES = os.environ.get("INVERSIONES_MEDICIONES")
+MAX_MEDICIONES = 200
+
+def iniciar_medicion(pagina):
+    st.session_state.medicion = Medicion(pagina)
+
+def medicion_actual():
+    try:
+        return st.session_state.get("medicion")
+    except:
+        # Hilo sin contexto de Streamlit: no se mide.
+        return None
+
+@contextmanager
+def medir(nombre):
+    medicion = medicion_actual()
+    if medicion is None:
+        yield
+        return
+    with medicion.tramo(nombre):
+        yield
+
+def medido(nombre, cache=False):
+    """Decorador: mide cada llamada en la medición del rerun.
+
+    Con ``cache=True`` la llamada cuenta como acierto salvo que el cuerpo
+    cacheado avise con ``fallo_de_cache(nombre)``.
+    """
+    def decorador(funcion):
+        @wraps(funcion)
+        def medida(*args, **kwargs):
+            medicion = medicion_actual()
+            if medicion is None:
+                return funcion(*args, **kwargs)
+            with medicion.tramo(nombre, cache):
+                return funcion(*args, **kwargs)
+        if hasattr(funcion, "clear"):
+            # Las funciones de st.cache_data conservan su .clear().
+            medida.clear = funcion.clear
+        return medida
+    return decorador
+
+def fallo_de_cache(nombre):
+    medicion = medicion_actual()
+    if medicion is not None:
+        medicion.contar_cache(nombre, fallos=1)
+
+def mostrar_panel_medicion():
+    """Cierra la medición del rerun y, si se pide, la muestra en la barra lateral."""
+    medicion = medicion_actual()
+    if medicion is None: return
+    registro = medicion.registro()
+    registro["carga"] = st.session_state.get("tiempos_carga")
+    historial = st.session_state.setdefault("mediciones", [])
+    historial.append(registro)
+    del historial[:-MAX_MEDICIONES]
+    if RUTA_MEDICIONES:
+        try: exportar_json_lines([registro], RUTA_MEDICIONES)
+        except: pass
+    with st.sidebar:
+        if not st.toggle("🐞 Medición del rerun", key="panel_medicion"): return
+        st.caption(f"{registro['etiqueta']}: {registro['total']:.2f}s · {len(historial)} reruns guardados")
+        st.dataframe(medicion.tabla(), hide_index=True, use_container_width=True, column_config={
+            "Segundos": st.column_config.NumberColumn(format="%.3f"),
+            "Aciertos %": st.column_config.NumberColumn(format="%.0f%%"),
+        })
+        st.download_button("⬇️ Exportar (JSON lines)", a_json_lines(historial), file_name="mediciones.jsonl",
+                           mime="application/jsonl")
+
+# --- MEMO DE DERIVADOS ---
+def obtener_memo():
+    # Uno por sesión: los precios editados son de cada usuario.
+    if "memo" not in st.session_state:
+        st.session_state.memo = Memo()
+    return st.session_state.memo
+
+def derivar(nombre, funcion, *entradas):
+    """``Memo.derivar`` con el memo de la sesión; en la medición cuenta como tramo con aciertos y fallos."""
+    memo = obtener_memo()
+    medicion = medicion_actual()
+    if medicion is None:
+        return memo.derivar(nombre, funcion, *entradas)
+    with medicion.tramo(nombre, cache=True):
+        fallos = memo.fallos
+        resultado = memo.derivar(nombre, funcion, *entradas)
+        if memo.fallos != fallos:
+            medicion.contar_cache(nombre, fallos=1)
+    return resultado
+
+# --- CONEXIÓN A GOOGLE SHEETS ---
+@st.cache_resource
+def conexion_local(carpeta):
+    return ConexionLocal(carpeta)
+
+def obtener_conexion():
+    # Con INVERSIONES_HOJAS_LOCALES=<carpeta> se trabaja con CSVs locales (sin internet).
+    if os.environ.get("INVERSIONES_HOJAS_LOCALES"):
+        return conexion_local(os.environ["INVERSIONES_HOJAS_LOCALES"])
+    # streamlit_gsheets arrastra todo el cliente de Google: solo se importa si hace falta.
+    from streamlit_gsheets import GSheetsConnection
+    return st.connection("gsheets", type=GSheetsConnection)
+
+@st.cache_resource
+def obtener_cache_libro():
+    return CacheLibro()
+
+def obtener_libro(mercado, cartera=""):
+    return LibroOperaciones(obtener_conexion(), hoja_de_cartera(mercado.hoja, cartera), mercado.columnas,
+                            cache=obtener_cache_libro())
+
+# --- CARTERAS ---
+# Lo que la sesión guarda de una cartera y no sirve para otra.
+CLAVES_DE_CARTERA = ("precios_mercado",)
+
+def carteras_disponibles():
+    # INVERSIONES_CARTERAS="ana,luis" habilita esas carteras además de la principal ("").
+    return carteras_configuradas(os.environ.get("INVERSIONES_CARTERAS", ""))
+
+def elegir_cartera():
+    """Cartera de la sesión: la de ``?cartera=`` en la URL, o la elegida en la barra lateral."""
+    carteras = carteras_disponibles()
+    if "cartera" not in st.session_state:
+        pedida = normalizar_cartera(st.query_params.get("cartera", ""))
+        st.session_state.cartera = pedida if pedida in carteras else ""
+    if len(carteras) > 1:
+        st.sidebar.selectbox("👤 Cartera", carteras, key="cartera", format_func=lambda c: c or "Principal")
+    cartera = st.session_state.cartera
+    if st.session_state.get("cartera_anterior", cartera) != cartera:
+        for clave in CLAVES_DE_CARTERA:
+            st.session_state.pop(clave, None)
+    st.session_state.cartera_anterior = cartera
+    if cartera:
+        st.query_params["cartera"] = cartera
+    elif "cartera" in st.query_params:
+        del st.query_params["cartera"]
+    return cartera
+
+def invalidar_cartera(libro):
+    """Olvida solo lo guardado del libro de esta cartera; lo del mercado y las otras carteras sigue en caché."""
+    obtener_cache_libro().invalidar(libro.hoja)
+
+# --- FOTOS DEL TRABAJADOR (trabajador.py) ---
+# Una foto más vieja que esto es de un trabajador caído: la página vuelve a consultar por su cuenta.
+VIGENCIA_FOTOS = 6 * 3600
+
+@st.cache_resource
+def obtener_instantaneas():
+    return Instantaneas()
+
+def foto_vigente(fuente):
+    """Última foto de ``fuente`` si el trabajador está al día; ``None`` si no."""
+    try:
+        return obtener_instantaneas().ultima(fuente, VIGENCIA_FOTOS)
+    except:
+        return None
+
+# --- ROBOT BCV ---
+@st.cache_resource
+def obtener_robot_bcv():
+    # La tasa vive en disco y se refresca en segundo plano: nunca bloquea la página.
+    return TasaBCV()
+
+@medido("BCV")
+def obtener_tasa_bcv():
+    foto = foto_vigente("bcv")
+    if foto is not None:
+        return lectura_de_foto(foto)
+    try:
+        return obtener_robot_bcv().leer()
+    except:
+        return None
+
+# --- COTIZACIONES INTERNACIONALES ---
+@st.cache_resource
+def obtener_servicio_cotizaciones():
+    # Caché por ticker (5 min) compartida por todas las sesiones; los que faltan
+    # se piden juntos en un solo yf.download.
+    if os.environ.get("INVERSIONES_HOJAS_LOCALES"):
+        try:
+            return ServicioCotizaciones(proveedor_tabla(obtener_conexion().read(worksheet="Cotizaciones")))
+        except: pass
+    return ServicioCotizaciones()
+
+@medido("Cotizaciones")
+def obtener_precios_actuales(lista_tickers):
+    if not lista_tickers: return {}
+    # Lo que fotografió el trabajador no se pide; solo los tickers que todavía no conoce (p.ej. uno recién comprado).
+    foto = foto_vigente("cotizaciones")
+    de_foto = foto.datos if foto is not None else {}
+    pedidos = [str(t).upper() for t in lista_tickers if t]
+    precios = {t: de_foto[t] for t in pedidos if t in de_foto}
+    faltan = [t for t in pedidos if t not in de_foto]
+    if not faltan: return precios
+    try:
+        servicio = obtener_servicio_cotizaciones()
+        aciertos, fallos = servicio.aciertos, servicio.fallos
+        precios.update(servicio.precios(faltan))
+        medicion = medicion_actual()
+        if medicion is not None:
+            # El servicio es del proceso: si otra sesión pide a la vez, sus tickers también cuentan.
+            medicion.contar_cache("Cotizaciones", servicio.aciertos - aciertos, servicio.fallos - fallos)
+    except: pass
+    return precios
+
+# --- PRECIOS DE LA BVC ---
+@st.cache_resource
+def obtener_cliente_bvc():
+    # Una sesión (y un pool de conexiones) por proceso; la tabla y su ETag viven en disco.
+    return ClienteBVC()
+
+def leer_precios_bvc():
+    """``{ticker: precio Bs.}``: la foto del trabajador si está al día; si no, la página de la BVC o la hoja."""
+    foto = foto_vigente("precios_bvc")
+    if foto is not None:
+        return foto.datos
+    try:
+        return obtener_cliente_bvc().leer().precios
+    except: pass
+    tabla = tabla_precios_web(obtener_conexion().read(worksheet="Precios_Web", ttl=300))
+    return dict(zip(tabla["Ticker"], tabla["Precio Bs."]))
+
+# --- PRECIOS FIJADOS A MANO (BVC) ---
+@st.cache_resource
+def obtener_precios_manuales(cartera=""):
+    return PreciosManuales(cartera=cartera)
+
+# --- BITÁCORA DE TASAS ---
+@st.cache_resource
+def obtener_historial_tasas():
+    # Una sola bitácora en memoria por proceso, compartida por todas las sesiones.
+    libro_tasas = LibroOperaciones(obtener_conexion(), "Historial_Tasas", COLUMNAS_TASAS, cache=obtener_cache_libro())
+    return HistorialTasas(libro_tasas)
+
+def actualizar_bitacora_tasas(lectura):
+    """Guarda la tasa de HOY en la hoja 'Historial_Tasas'.
+
+    Solo la que ``lectura`` (un ``LecturaTasa``) trae fresca del BCV: la del
+    día se escribe una sola vez, así que una tasa vieja, el 60.0 de reserva o
+    la que se tipea a mano con el BCV caído quedarían fijas hasta mañana.
+    """
+    if lectura is None or not lectura.tasa > 0 or lectura.vieja: return
+    # Con el trabajador corriendo la anota él: la página no escribe.
+    if foto_vigente("bcv") is not None: return
+    try:
+        # Si hoy ya está en memoria no se lee ni se escribe nada.
+        obtener_historial_tasas().registrar(datetime.now().date(), lectura.tasa)
+    except: pass
+
+def buscar_tasa_en_bitacora(fecha_buscada):
+    """Busca si tenemos guardada la tasa de una fecha específica."""
+    try:
+        return obtener_historial_tasas().buscar(fecha_buscada)
+    except: pass
+    return None
+
+# --- LIBRO DE OPERACIONES ---
+def guardar_operacion(libro, mercado, ticker, cantidad, precio, fecha, tasa, tipo):
+    """Anexa la operación con el ``libro`` de la página (el que sabe cuántas filas se leyeron). Devuelve ``(exito, mensaje)``."""
+    try:
+        # Solo se anexa la fila nueva; si otra sesión escribió desde que
+        # leímos el portafolio, no se guarda nada.
+        registrar_operacion(libro, mercado, ticker, cantidad, precio, fecha, tasa, tipo)
+        invalidar_cartera(libro)
+        return True, "Éxito"
+    except ConflictoDeVersion:
+        invalidar_cartera(libro)
+        return False, "El portafolio cambió en otra sesión. Recarga la página e intenta de nuevo."
+    except Exception as e:
+        return False, str(e)
+
+def guardar_operaciones(libro, filas):
+    """Anexa todas las ``filas`` (ver ``nucleo.importacion``) en una sola escritura. Devuelve ``(exito, mensaje)``."""
+    try:
+        libro.anexar(filas)
+        invalidar_cartera(libro)
+        return True, "Éxito"
+    except ConflictoDeVersion:
+        invalidar_cartera(libro)
+        return False, "El portafolio cambió en otra sesión. Recarga la página e intenta de nuevo."
+    except Exception as e:
+        return False, str(e)
+
+# --- IMPORTACIÓN DE EXTRACTOS ---
+def importador_operaciones(libro, mercado, df_portafolio):
+    """Importa un extracto del broker (CSV/Excel) al libro de la página: se valida todo y se guarda de una vez."""
+    # Cambiar la clave vacía el selector de archivo después de importar.
+    intento = st.session_state.setdefault(f"importaciones_{mercado.nombre}", 0)
+    with st.expander("📥 Importar extracto (CSV / Excel)"):
+        if st.session_state.pop(f"importado_{mercado.nombre}", None):
+            st.success(st.session_state.pop(f"importado_{mercado.nombre}_texto", "Importado."))
+        archivo = st.file_uploader("Extracto del broker", type=["csv", "xlsx", "xls"],
+                                   key=f"extracto_{mercado.nombre}_{intento}")
+        if archivo is None: return
+        try:
+            # Mientras el archivo siga subido no se vuelve a leer en cada rerun.
+            extracto = derivar("Extracto", lambda _id, nombre: leer_extracto(archivo, nombre),
+                               archivo.file_id, archivo.name).valor
+        except ImportError:
+            st.error("Para leer Excel hace falta openpyxl (pip install openpyxl).")
+            return
+        except Exception as e:
+            st.error(f"No se pudo leer el archivo: {e}")
+            return
+
+        sugerido = sugerir_mapeo(list(extracto.columns))
+        opciones = [None] + list(extracto.columns)
+        mapeo = {}
+        for campo in CAMPOS:
+            etiqueta = campo if campo in OBLIGATORIOS else f"{campo} (opcional)"
+            mapeo[campo] = st.selectbox(etiqueta, opciones, index=opciones.index(sugerido[campo]),
+                                        format_func=lambda c: "—" if c is None else str(c),
+                                        key=f"mapeo_{mercado.nombre}_{campo}_{archivo.file_id}")
+        c1, c2 = st.columns(2)
+        decimal = c1.radio("Decimales", [",", "."], index=0 if mercado.moneda == "Bs" else 1, horizontal=True,
+                           key=f"decimal_{mercado.nombre}")
+        dayfirst = c2.toggle("Día primero (dd/mm)", value=True, key=f"dayfirst_{mercado.nombre}")
+        try:
+            with medir("Importación"):
+                tasas = obtener_historial_tasas()
+                importacion = derivar("Importación",
+                                      lambda ext, mapeo, mercado, df, _tasas, decimal, dayfirst:
+                                      preparar_importacion(ext, mapeo, mercado, df, tasas, decimal, dayfirst),
+                                      extracto, mapeo, mercado, df_portafolio, tasas.serie(), decimal, dayfirst).valor
+        except ValueError as e:
+            st.warning(str(e))
+            return
+
+        st.caption(f"{len(importacion.filas):,} operaciones válidas · {len(importacion.errores):,} con errores · "
+                   f"{importacion.tasas_completadas:,} tasas tomadas de la bitácora")
+        if len(importacion.errores):
+            st.error("Corrige el archivo: no se importa nada mientras haya filas con errores.")
+            st.dataframe(importacion.errores, hide_index=True, use_container_width=True,
+                         column_config={"Fecha": st.column_config.DateColumn(format="YYYY-MM-DD")})
+            return
+        if importacion.filas.empty: return
+        if st.button(f"💾 Importar {len(importacion.filas):,} operaciones", key=f"importar_{mercado.nombre}"):
+            with st.spinner("Guardando..."):
+                exito, mensaje = guardar_operaciones(libro, importacion.filas)
+            if exito:
+                st.session_state[f"importaciones_{mercado.nombre}"] = intento + 1
+                st.session_state[f"importado_{mercado.nombre}"] = True
+                st.session_state[f"importado_{mercado.nombre}_texto"] = f"Importadas {len(importacion.filas):,} operaciones."
+                st.rerun()
+            else:
+                st.error(f"Error al guardar en Sheets: {mensaje}")
+
+# --- CARGA EN PARALELO ---
+TIMEOUT_CARGA = 10
+
+def _con_contexto(ctx):
+    # Los hilos del pool reciben el contexto de la sesión para poder usar las cachés de Streamlit.
+    def envolver(funcion):
+        def envuelta(*args):
+            add_script_run_ctx(threading.current_thread(), ctx)
+            return funcion(*args)
+        return envuelta
+    return envolver
+
+def cargar_pagina(tareas, timeouts=None, defectos=None):
+    """Lanza a la vez las fuentes de la página y avisa de las que no llegaron.
+
+    Devuelve ``{nombre: valor}`` (el valor por defecto para las que fallaron)
+    y deja los tiempos de cada fuente en ``st.session_state.tiempos_carga``.
+    """
+    t0 = time.perf_counter()
+    resultados = cargar_en_paralelo(tareas, timeout=TIMEOUT_CARGA, timeouts=timeouts, defectos=defectos,
+                                    envolver=_con_contexto(get_script_run_ctx()))
+    for nombre, r in resultados.items():
+        if r.agotado:
+            st.warning(f"⏱️ {nombre} no respondió en {r.segundos:.0f}s: se muestra la página sin esos datos.")
+        elif r.error is not None:
+            st.warning(f"⚠️ No se pudo cargar {nombre}: {r.error}")
+    st.session_state.tiempos_carga = {
+        "total": time.perf_counter() - t0,
+        "fuentes": {n: {"segundos": r.segundos, "agotado": r.agotado, "error": r.error is not None}
+                    for n, r in resultados.items()},
+    }
+    return {nombre: r.valor for nombre, r in resultados.items()}
+
+def mostrar_tiempos_carga():
+    tiempos = st.session_state.get("tiempos_carga")
+    if not tiempos: return
+    with st.expander(f"⏱️ Carga de la página: {tiempos['total']:.2f}s"):
+        tabla = pd.DataFrame([
+            {"Fuente": n, "Segundos": f["segundos"], "Estado": "agotado" if f["agotado"] else "error" if f["error"] else "ok"}
+            for n, f in tiempos["fuentes"].items()
+        ]).sort_values("Segundos", ascending=False)
+        st.dataframe(tabla, hide_index=True, use_container_width=True,
+                     column_config={"Segundos": st.column_config.NumberColumn(format="%.3f")})
+
+# --- TABLAS GRANDES (PAGINADAS) ---
+TAMANOS_PAGINA = [25, 50, 100, 500]
+
+def tabla_paginada(df, clave, columna_fecha=None, column_config=None, orden=None, ascendente=False):
+    """Libro con filtro por ticker, tipo y fechas, orden y paginación hechos aquí: al navegador va una página."""
+    f1, f2, f3 = st.columns([2, 1, 2])
+    tickers = f1.multiselect("Ticker", sorted(df["Ticker"].dropna().astype(str).unique()), key=f"{clave}_tickers")
+    tipos = None
+    if "Tipo" in df:
+        tipos = f2.multiselect("Tipo", sorted(df["Tipo"].dropna().astype(str).unique()), key=f"{clave}_tipos")
+    desde = hasta = None
+    if columna_fecha and df[columna_fecha].notna().any():
+        rango = f3.date_input("Fechas", (df[columna_fecha].min().date(), df[columna_fecha].max().date()),
+                              key=f"{clave}_fechas")
+        if len(rango) == 2: desde, hasta = rango
+    filtrado = filtrar_libro(df, tickers, tipos, desde, hasta, columna_fecha)
+
+    columnas = list(df.columns)
+    o1, o2, o3, o4 = st.columns(4)
+    orden = o1.selectbox("Ordenar por", columnas, index=columnas.index(orden) if orden in columnas else 0,
+                         key=f"{clave}_orden")
+    ascendente = o2.toggle("Ascendente", value=ascendente, key=f"{clave}_ascendente")
+    tamano = o3.selectbox("Filas por página", TAMANOS_PAGINA, index=1, key=f"{clave}_tamano")
+    paginas = max(1, -(-len(filtrado) // tamano))
+    # Si el filtro dejó menos páginas, se vuelve a la última en vez de fallar.
+    if st.session_state.get(f"{clave}_pagina", 1) > paginas:
+        st.session_state[f"{clave}_pagina"] = paginas
+    numero = o4.number_input(f"Página (de {paginas})", min_value=1, max_value=paginas, step=1, key=f"{clave}_pagina")
+    pagina = paginar(filtrado, numero, tamano, orden, ascendente)
+    st.dataframe(pagina.filas, hide_index=True, use_container_width=True, column_config=column_config)
+    if pagina.total:
+        st.caption(f"Filas {pagina.inicio + 1:,}–{pagina.inicio + len(pagina.filas):,} de {pagina.total:,}"
+                   + (f" (filtradas de {len(df):,})" if pagina.total != len(df) else ""))
+    else:
+        st.caption("Sin filas con ese filtro.")
+
+# --- CURVA DE PATRIMONIO ---
+def motor_curva(libro, ops, moneda):
+    """El ``CurvaPatrimonio`` de la sesión para ``libro``, al día con ``ops`` (Fecha, Ticker, Cantidad, Monto $, Monto Bs).
+
+    El libro solo crece por el final: el motor recibe solo las operaciones
+    nuevas y se arranca de cero si cambió alguna que ya había procesado.
+    """
+    ops = ops.reset_index(drop=True)
+    huellas = pd.util.hash_pandas_object(ops, index=False)
+    # Un motor por libro: cambiar de página o de cartera no tira el de la otra.
+    clave = f"motor_curva_{libro.hoja}"
+    motor = st.session_state.get(clave)
+    if (motor is None or motor.moneda != moneda or motor.n_operaciones > len(ops)
+            or not huellas.iloc[:motor.n_operaciones].equals(st.session_state[f"huella_{clave}"])):
+        motor = CurvaPatrimonio(moneda)
+    motor.agregar_operaciones(ops.iloc[motor.n_operaciones:])
+    st.session_state[clave] = motor
+    st.session_state[f"huella_{clave}"] = huellas
+    return motor
+
+# --- GANANCIA POR PRECIO Y POR TASA ---
+AGRUPAR_ATRIBUCION = {"Ticker": ("Ticker", None), "Año": ("Periodo", "Y"), "Trimestre": ("Periodo", "Q"),
+                      "Mes": ("Periodo", "M")}
+
+def resumen_atribucion(detalle, estados, agrupar):
+    por, frecuencia = AGRUPAR_ATRIBUCION[agrupar]
+    return resumir_atribucion(detalle[detalle["Estado"].isin(estados)], por, frecuencia or "Y")
+
+def panel_atribucion(clave, d_atribucion):
+    """Ganancia separada en lo que movió el precio y lo que movió la tasa Bs/$ desde cada compra."""
+    detalle = d_atribucion.valor
+    if detalle.empty:
+        st.info("Sin lotes con precio de hoy ni ventas.")
+        return
+    st.caption("La ganancia en la otra moneda se separa en **precio** (cuánto cambió la cotización, a la tasa "
+               "final) y **tasa** (lo que se gana o pierde solo porque el Bs/$ de hoy, o el de la venta, no es el "
+               "de la compra).")
+    c1, c2 = st.columns(2)
+    estados = c1.multiselect("Posiciones", ["Abierta", "Realizada"], default=["Abierta", "Realizada"],
+                             key=f"{clave}_estados")
+    agrupar = c2.radio("Agrupar por", list(AGRUPAR_ATRIBUCION), horizontal=True, key=f"{clave}_agrupar")
+    tabla = derivar("Resumen atribución", resumen_atribucion, d_atribucion, tuple(estados), agrupar).valor
+    if tabla.empty:
+        st.info("Sin filas con ese filtro.")
+        return
+
+    k1, k2, k3, k4 = st.columns(4)
+    k1.metric("Por precio ($)", f"${tabla['Precio $'].sum():,.2f}")
+    k2.metric("Por tasa ($)", f"${tabla['Tasa $'].sum():,.2f}")
+    k3.metric("Por precio (Bs)", f"Bs. {tabla['Precio Bs'].sum():,.2f}")
+    k4.metric("Por tasa (Bs)", f"Bs. {tabla['Tasa Bs'].sum():,.2f}")
+    formato = {c: st.column_config.NumberColumn(format="%.2f%%") for c in tabla.columns if c.endswith("%")}
+    formato.update({c: st.column_config.NumberColumn(format="$%,.2f") for c in tabla.columns if c.endswith(" $")})
+    formato.update({c: st.column_config.NumberColumn(format="Bs.%,.2f") for c in tabla.columns if c.endswith(" Bs")})
+    st.dataframe(tabla, hide_index=True, use_container_width=True, column_config=formato)
+
+# --- RIESGO ---
+PERIODOS_RIESGO = {"1 año": 365, "3 años": 3 * 365, "5 años": 5 * 365, "10 años": 10 * 365}
+
+def figura_correlacion(riesgo):
+    # plotly se importa aquí, como en los gráficos de distribución.
+    import plotly.express as px
+    fig = px.imshow(riesgo.correlacion, zmin=-1, zmax=1, color_continuous_scale="RdBu_r", aspect="auto")
+    fig.update_layout(margin=dict(t=0, b=0, l=0, r=0))
+    return fig
+
+def panel_riesgo(clave, cantidades, obtener_precios, moneda, *entradas):
+    """Volatilidad, drawdown, VaR y correlación de las posiciones abiertas, en $ y en Bs.
+
+    ``obtener_precios(inicio)`` da los precios fechas × tickers en ``moneda``;
+    ``entradas`` es lo demás de lo que dependen (se suma a la clave del memo).
+    """
+    cantidades = {t: c for t, c in cantidades.items() if c > 0.00001}
+    if not cantidades:
+        st.info("Sin posiciones abiertas.")
+        return
+    c1, c2, c3 = st.columns(3)
+    periodo = c1.selectbox("Periodo", list(PERIODOS_RIESGO), index=1, key=f"{clave}_periodo")
+    ventana = c2.selectbox("Ventana de volatilidad (días)", [21, 63, 126, 252], index=1, key=f"{clave}_ventana")
+    confianza = c3.selectbox("Confianza del VaR", [0.90, 0.95, 0.99], index=1, format_func=lambda c: f"{c:.0%}",
+                             key=f"{clave}_confianza")
+    inicio = pd.Timestamp(datetime.now().date()) - pd.Timedelta(days=PERIODOS_RIESGO[periodo])
+
+    # Se recalcula solo si cambian las posiciones, el periodo, los parámetros, la bitácora o el día.
+    with medir("Riesgo"):
+        tasas = obtener_historial_tasas().serie()
+        d_riesgo = derivar(f"Riesgo {clave}",
+                           lambda cantidades, inicio, ventana, confianza, tasas, _hoy, *_:
+                           analizar_riesgo(obtener_precios(inicio), cantidades, tasas, moneda, ventana, confianza),
+                           cantidades, inicio, ventana, confianza, tasas, datetime.now().date(), *entradas)
+    riesgo = d_riesgo.valor
+    if riesgo.metricas.loc["Días"].max() < 2:
+        st.info("No hay precios suficientes en ese periodo.")
+        return
+
+    st.dataframe(riesgo.metricas.T, use_container_width=True, column_config={
+        "Valor": st.column_config.NumberColumn(format="%,.2f"),
+        "Retorno anual %": st.column_config.NumberColumn(format="%.2f%%"),
+        "Volatilidad anual %": st.column_config.NumberColumn(format="%.2f%%"),
+        "Sharpe": st.column_config.NumberColumn(format="%.2f"),
+        "Máx. drawdown %": st.column_config.NumberColumn(format="%.2f%%"),
+        **{c: st.column_config.NumberColumn(format="%.2f%%" if c.endswith("%") else "%,.2f")
+           for c in riesgo.metricas.index if c.startswith("VaR")},
+        "Días": st.column_config.NumberColumn(format="%d"),
+    })
+    g1, g2 = st.columns(2)
+    g1.markdown(f"**Volatilidad móvil {ventana} días (%)**")
+    g1.line_chart(riesgo.volatilidad_movil)
+    g2.markdown("**Drawdown (%)**")
+    g2.line_chart(riesgo.drawdown)
+    if len(riesgo.correlacion) > 1:
+        st.markdown("**Correlación de retornos diarios ($)**")
+        st.plotly_chart(derivar("Figura correlación", figura_correlacion, d_riesgo).valor, use_container_width=True)
@@ -0,0 +1,85 @@
+"""Completa 'Historial_Tasas' con tasas históricas del BCV, sin abrir ningún dashboard.
+
+Uso:
+    python rellenar_tasas.py 2_1_2d23_smc.xls 2_1_2c23_smc.xls ... [--hasta hoy]
+    python rellenar_tasas.py tasas.csv --decimal . --hojas /ruta/a/csvs
+
+Acepta los boletines .xls/.xlsx del BCV (una pestaña por día hábil) y CSVs
+de fecha y tasa. Los fines de semana y feriados toman la tasa del último
+día hábil. Todo se anexa en una sola escritura (``--lote`` la parte en
+varias). Lo que ya está en la bitácora no se toca: se puede correr de nuevo
+las veces que haga falta. ``--simular`` muestra lo que haría sin escribir.
+
+La hoja es la misma de los dashboards: con ``--hojas`` (o
+INVERSIONES_HOJAS_LOCALES) la carpeta de CSVs locales; si no, Google Sheets
+con las credenciales de .streamlit/secrets.toml.
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+
+import pandas as pd
+
+from nucleo import (CacheLibro, HistorialTasas, LibroOperaciones, abrir_conexion, leer_archivo_tasas, rellenar_bitacora,
+                    rellenar_huecos)
+from nucleo.tasas import COLUMNAS_TASAS
+
+
+def argumentos(args=None):
+    p = argparse.ArgumentParser(description="Carga tasas históricas del BCV en 'Historial_Tasas'.")
+    p.add_argument("archivos", nargs="+", help="boletines .xls/.xlsx del BCV o CSVs de fecha y tasa")
+    p.add_argument("--hojas", default=os.environ.get("INVERSIONES_HOJAS_LOCALES"),
+                   help="carpeta de hojas locales (por defecto, Google Sheets)")
+    p.add_argument("--hasta", help="rellenar hasta esta fecha (AAAA-MM-DD o 'hoy') con la última tasa")
+    p.add_argument("--max-hueco", type=int, default=7, help="días seguidos sin tasa que se rellenan (7)")
+    p.add_argument("--lote", type=int, help="fechas por escritura (por defecto, todas en una)")
+    p.add_argument("--moneda", default="USD", help="moneda de los boletines (USD)")
+    p.add_argument("--decimal", default=",", choices=[",", "."], help="separador decimal de los CSV (',')")
+    p.add_argument("--mes-primero", action="store_true", help="las fechas de los CSV son mm/dd")
+    p.add_argument("--simular", action="store_true", help="no escribir, solo contar")
+    return p.parse_args(args)
+
+
+def main(args=None):
+    a = argumentos(args)
+    hasta = datetime.now().date() if a.hasta == "hoy" else a.hasta
+
+    leidas = []
+    for ruta in a.archivos:
+        try:
+            serie = leer_archivo_tasas(ruta, a.moneda, a.decimal, not a.mes_primero)
+        except ImportError as e:
+            # pandas pide xlrd para .xls y openpyxl para .xlsx.
+            print(f"{ruta}: falta una dependencia para leer Excel ({e}).", file=sys.stderr)
+            return 1
+        print(f"{ruta}: {len(serie):,} tasas" + (f" ({serie.index[0]:%Y-%m-%d} a {serie.index[-1]:%Y-%m-%d})"
+                                                  if len(serie) else ""))
+        leidas.append(serie)
+    tasas = pd.concat(leidas) if leidas else pd.Series(dtype=float)
+    # Si dos archivos traen la misma fecha vale el primero.
+    tasas = tasas[~tasas.index.duplicated(keep="first")].sort_index()
+    if tasas.empty:
+        print("No se encontró ninguna tasa.")
+        return 1
+
+    libro = LibroOperaciones(abrir_conexion(a.hojas), "Historial_Tasas", COLUMNAS_TASAS, cache=CacheLibro())
+    historial = HistorialTasas(libro)
+    if a.simular:
+        completas = rellenar_huecos(pd.concat([historial.serie(), tasas]), hasta, a.max_hueco)
+        nuevas = (~completas.index.isin(historial.serie().index)).sum()
+        print(f"Se anexarían {nuevas:,} fechas; {len(historial):,} ya están en la bitácora.")
+        return 0
+
+    def avance(hechas, total):
+        print(f"  {hechas:,}/{total:,} fechas", flush=True)
+
+    r = rellenar_bitacora(historial, tasas, hasta, a.max_hueco, a.lote, avance)
+    print(f"Anexadas {r.anexadas:,} fechas ({r.rellenadas:,} rellenadas con el día hábil anterior); "
+          f"{r.ya_estaban:,} ya estaban.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+"""Entorno de las pruebas: hojas locales en una carpeta temporal y sin red.
+
+``nucleo`` lee INVERSIONES_CACHE y las URL del BCV y de la BVC al
+importarse, así que se fijan aquí, antes de que cualquier prueba lo importe.
+Las URL apuntan a un puerto cerrado: la tasa y los precios de la BVC fallan
+enseguida y los dashboards caen a lo que haya en las hojas.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+CARPETA = tempfile.mkdtemp(prefix="inversiones-pruebas-")
+HOJAS = os.path.join(CARPETA, "hojas")
+shutil.copytree(os.path.join(RAIZ, "tests", "hojas"), HOJAS)
+
+os.environ["INVERSIONES_HOJAS_LOCALES"] = HOJAS
+os.environ["INVERSIONES_CACHE"] = os.path.join(CARPETA, "cache")
+os.environ["INVERSIONES_URL_BCV"] = "http://127.0.0.1:9/"
+os.environ["INVERSIONES_URL_BVC"] = "http://127.0.0.1:9/"
+
+
+@pytest.fixture(autouse=True)
+def hojas_abiertas():
+    # LibroOperaciones guarda las hojas abiertas por id del cliente, y los
+    # clientes de una prueba pueden reusar el id de los de otra.
+    from nucleo import libro
+    libro._HOJAS_ABIERTAS.clear()
+    yield
+    libro._HOJAS_ABIERTAS.clear()
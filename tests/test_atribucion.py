@@ -0,0 +1,55 @@
+"""Atribución a precio y a tasa contra casos calculados a mano.
+
+Libro en Bs. A: compra 10 a Bs 360 (tasa 36), compra 10 a Bs 800 (tasa 40),
+vende 15 a Bs 1.500 (tasa 50). B: compra 4 a Bs 100 (tasa 50). Hoy A vale
+Bs 2.400, B Bs 90 y la tasa es 60.
+"""
+
+import numpy as np
+import pandas as pd
+
+from nucleo.atribucion import atribuir, resumir_atribucion
+from nucleo.lotes import casar_lotes, resumen_posiciones
+
+OPS = pd.DataFrame({
+    "Fecha": pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04"]),
+    "Ticker": ["A", "A", "A", "B"], "Cantidad": [10.0, 10.0, -15.0, 4.0],
+    "Precio": [360.0, 800.0, 1500.0, 100.0], "Tasa": [36.0, 40.0, 50.0, 50.0],
+})
+PRECIOS = {"A": 2400.0, "B": 90.0}
+
+
+def test_precio_mas_tasa_es_el_cambio_en_dolares():
+    casado = casar_lotes(OPS, "Bs", "FIFO")
+    efectos = resumir_atribucion(atribuir(casado, PRECIOS, 60.0)).set_index("Ticker")
+    # A vendida: costo Bs 7.600 ($200), ingreso $450. Tasa: 7.600/50 − 200 = −48.
+    # A abierta: 5 de Bs 800 ($100) valen Bs 12.000 ($200). Tasa: 4.000/60 − 100.
+    assert np.isclose(efectos.at["A", "Tasa $"], -48 + (4000 / 60 - 100))
+    assert np.isclose(efectos.at["A", "Precio $"], 14900 / 50 + 8000 / 60)
+    # B: costo Bs 400 ($8), vale Bs 360 ($6).
+    assert np.isclose(efectos.at["B", "Tasa $"], 400 / 60 - 8)
+    assert np.isclose(efectos.at["B", "Precio $"], -40 / 60)
+
+    total = efectos["Precio $"] + efectos["Tasa $"]
+    assert np.allclose(total, efectos["Valor $"] - efectos["Costo $"])
+    assert np.allclose(total[["A", "B"]], [(450 - 200) + (200 - 100), 6 - 8])
+    # Lo mismo que realizada más no realizada de los lotes.
+    posiciones = resumen_posiciones(casado, PRECIOS, 60.0).set_index("Ticker")
+    assert np.allclose(total[posiciones.index], posiciones["Realizada $"] + posiciones["No Realizada $"])
+    # En la moneda del libro todo es precio.
+    assert np.allclose(efectos["Tasa Bs"], 0)
+    assert np.allclose(efectos["Precio Bs"], posiciones["Realizada Bs"] + posiciones["No Realizada Bs"])
+
+
+def test_libro_en_dolares_precio_mas_tasa_es_el_cambio_en_bs():
+    # Los mismos montos con el libro en $ (precios de A en $ a la tasa de cada día).
+    ops = OPS.assign(Precio=OPS["Precio"] / OPS["Tasa"])
+    casado = casar_lotes(ops, "USD", "FIFO")
+    precios = {"A": 40.0, "B": 1.5}
+    efectos = resumir_atribucion(atribuir(casado, precios, 60.0)).set_index("Ticker")
+    posiciones = resumen_posiciones(casado, precios, 60.0).set_index("Ticker")
+    total = efectos["Precio Bs"] + efectos["Tasa Bs"]
+    assert np.allclose(total[posiciones.index], posiciones["Realizada Bs"] + posiciones["No Realizada Bs"])
+    # A: vendida Bs 22.500 − 7.600, abierta Bs 12.000 − 4.000.
+    assert np.isclose(total["A"], 14900 + 8000)
+    assert np.allclose(efectos["Tasa $"], 0)
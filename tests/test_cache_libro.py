@@ -0,0 +1,84 @@
+"""``CacheLibro.sincronizar``: solo las filas nuevas, o la hoja entera si se achicó o cambió el encabezado."""
+
+import pytest
+
+from nucleo.cache_libro import CacheLibro
+from nucleo.hojas_locales import ConexionLocal
+
+ENCABEZADO = ["Ticker", "Cantidad", "Precio", "Fecha"]
+
+
+class Hoja:
+    """Hoja local que anota qué se le pidió."""
+
+    def __init__(self, carpeta):
+        self.ws = ConexionLocal(carpeta).hoja("Libro")
+        self.pedidos = []
+
+    def escribir(self, filas):
+        self.ws._escribir(filas)
+
+    def get_all_values(self):
+        self.pedidos.append("completa")
+        return self.ws.get_all_values()
+
+    def batch_get(self, rangos):
+        self.pedidos.append(rangos)
+        return self.ws.batch_get(rangos)
+
+
+def filas(*tickers):
+    return [[t, "1", "10", "2024-01-02"] for t in tickers]
+
+
+@pytest.fixture
+def hoja(tmp_path):
+    h = Hoja(str(tmp_path / "hojas"))
+    h.escribir([ENCABEZADO] + filas("A", "B"))
+    return h
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CacheLibro(str(tmp_path / "libro.sqlite"), intervalo=15, ttl_completo=3600)
+
+
+def test_solo_baja_las_filas_nuevas(hoja, cache):
+    assert cache.sincronizar("Libro", hoja, ahora=0) == 2
+    assert hoja.pedidos == ["completa"]
+
+    hoja.escribir([ENCABEZADO] + filas("A", "B", "C", "D"))
+    # Dentro del intervalo no se consulta.
+    assert cache.sincronizar("Libro", hoja, ahora=10) == 2
+    assert cache.sincronizar("Libro", hoja, ahora=20) == 4
+    # Encabezado, columna A y desde la fila 4 (después del encabezado y las 2 que ya estaban).
+    assert hoja.pedidos[1:] == [["1:1", "A:A", "A4:D"]]
+    assert cache.leer("Libro")["Ticker"].tolist() == ["A", "B", "C", "D"]
+
+
+def test_hoja_achicada_se_baja_completa(hoja, cache):
+    cache.sincronizar("Libro", hoja, ahora=0)
+    hoja.escribir([ENCABEZADO] + filas("Z"))
+    assert cache.sincronizar("Libro", hoja, ahora=20) == 1
+    assert hoja.pedidos[-1] == "completa"
+    assert cache.leer("Libro")["Ticker"].tolist() == ["Z"]
+
+
+def test_encabezado_cambiado_se_baja_completa(hoja, cache):
+    cache.sincronizar("Libro", hoja, ahora=0)
+    hoja.escribir([ENCABEZADO + ["Tasa"]] + [f + ["36"] for f in filas("A", "B", "C")])
+    assert cache.sincronizar("Libro", hoja, ahora=20) == 3
+    assert hoja.pedidos[-1] == "completa"
+    df = cache.leer("Libro")
+    assert list(df.columns) == ENCABEZADO + ["Tasa"] and df["Tasa"].tolist() == [36, 36, 36]
+
+
+def test_cada_ttl_completo_se_baja_entera(hoja, cache):
+    cache.sincronizar("Libro", hoja, ahora=0)
+    # Una fila vieja editada en la hoja no cambia el número de filas.
+    hoja.escribir([ENCABEZADO] + filas("A", "X"))
+    cache.sincronizar("Libro", hoja, ahora=20)
+    assert cache.leer("Libro")["Ticker"].tolist() == ["A", "B"]
+    cache.sincronizar("Libro", hoja, ahora=3600)
+    assert hoja.pedidos[-1] == "completa"
+    assert cache.leer("Libro")["Ticker"].tolist() == ["A", "X"]
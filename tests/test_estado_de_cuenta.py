@@ -0,0 +1,44 @@
+"""KPIs de Dashboard.py: valor, costo y ganancia salen de los lotes abiertos."""
+
+import os
+
+from streamlit.testing.v1 import AppTest
+
+from conftest import HOJAS, RAIZ
+from nucleo.precios_manuales import PreciosManuales
+
+PAGINA = os.path.join(RAIZ, "Dashboard.py")
+
+# Compra 10 BNC a Bs 100 (tasa 40) y vende 5 a Bs 200 (tasa 50). Precio de hoy Bs 300 y,
+# con el BCV caído, tasa de reserva 60.
+LIBRO = """Ticker,Cantidad,Precio Operacion (Bs),Fecha Compra,Tasa Cambio (Bs/$),Total Invertido (Bs),Total Invertido ($),Tipo
+BNC,10,100,2024-01-02,40,1000,25,Compra
+BNC,-5,200,2024-02-01,50,-1000,-20,Venta
+"""
+
+
+def test_kpis_con_una_venta(monkeypatch):
+    monkeypatch.setenv("INVERSIONES_CARTERAS", "ventas")
+    with open(os.path.join(HOJAS, "Portafolio@ventas.csv"), "w", encoding="utf-8") as f:
+        f.write(LIBRO)
+    manuales = PreciosManuales(cartera="ventas")
+    manuales.fijar({"BNC": 300.0})
+    try:
+        at = AppTest.from_file(PAGINA, default_timeout=60)
+        at.query_params["cartera"] = "ventas"
+        at.run()
+        assert not at.exception
+        kpis = {m.label: m.value for m in at.metric}
+    finally:
+        manuales.borrar()
+
+    # Quedan 5 del lote de Bs 100: costo Bs 500 y $12,50 (5 × 100 / 40).
+    assert kpis["Total Invertido (Bs)"] == "Bs. 500.00"
+    assert kpis["Valor Cartera (Bs)"] == "Bs. 1,500.00"
+    assert kpis["Ganancia Neta (Bs)"] == "Bs. 1,000.00"
+    assert kpis["Total Invertido ($)"] == "$12.50"
+    assert kpis["Valor Cartera ($)"] == "$25.00"
+    assert kpis["Ganancia Neta ($)"] == "$12.50"
+    assert kpis["Rentabilidad"] == "100.00%"
+    # Realizada: 5 × 200 − 500 en Bs; 5 × 200 / 50 − 12,50 en $.
+    assert kpis["Ganancia Realizada (Bs)"] == "Bs. 500.00"
@@ -0,0 +1,75 @@
+"""``HistorialPrecios``: qué se descarga, cuándo y quién espera a quién."""
+
+import threading
+
+import pandas as pd
+
+from nucleo.historial_precios import HistorialPrecios
+
+
+class Proveedor:
+    """Velas de 100.0 en días hábiles; anota cada pedido y puede frenar un ticker hasta ``soltar``."""
+
+    def __init__(self, frenar=None):
+        self.pedidos = []
+        self.frenar = frenar
+        self.soltar = threading.Event()
+        self.frenado = threading.Event()
+
+    def __call__(self, ticker, inicio, fin):
+        self.pedidos.append((ticker, inicio, fin))
+        if ticker == self.frenar:
+            self.frenado.set()
+            self.soltar.wait(10)
+        dias = pd.bdate_range(inicio, fin)
+        return pd.DataFrame({c: 100.0 for c in ["Open", "High", "Low", "Close", "Volume"]}, index=dias)
+
+
+def test_un_fin_anterior_no_achica_la_cobertura(tmp_path):
+    proveedor = Proveedor()
+    h = HistorialPrecios(str(tmp_path / "h.sqlite"), proveedor, ttl=900)
+    assert h.asegurar("AAPL", "2024-01-01", "2024-06-28", ahora=10**6)
+    # Un pedido más corto con la última revisión vencida.
+    assert h.asegurar("AAPL", "2024-01-01", "2024-03-29", ahora=10**6 + 1000)
+    del proveedor.pedidos[:]
+    assert h.asegurar("AAPL", "2024-01-01", "2024-06-28", ahora=10**6 + 1100)
+    assert proveedor.pedidos == []
+
+
+def test_una_descarga_lenta_no_frena_a_otro_ticker(tmp_path):
+    proveedor = Proveedor(frenar="LENTO")
+    h = HistorialPrecios(str(tmp_path / "h.sqlite"), proveedor)
+    hilo = threading.Thread(target=h.asegurar, args=("LENTO", "2024-01-01", "2024-06-28"))
+    hilo.start()
+    try:
+        assert proveedor.frenado.wait(5)
+        listos = []
+        rapido = threading.Thread(target=lambda: listos.append(h.asegurar("RAPIDO", "2024-01-01", "2024-06-28")))
+        rapido.start()
+        rapido.join(2)
+        # Terminó mientras LENTO sigue descargando.
+        assert listos == [True]
+        assert not h.velas("RAPIDO", "2024-01-01", "2024-06-28").empty
+    finally:
+        proveedor.soltar.set()
+        hilo.join(10)
+    assert not h.velas("LENTO", "2024-01-01", "2024-06-28").empty
+
+
+def test_cierres_baja_lo_que_falta_en_una_sola_llamada(tmp_path):
+    proveedor = Proveedor()
+    pedidos = []
+
+    def varios(tickers, inicio, fin):
+        pedidos.append(list(tickers))
+        return {t: proveedor(t, inicio, fin) for t in tickers if t != "NOEXISTE"}
+
+    h = HistorialPrecios(str(tmp_path / "h.sqlite"), proveedor, proveedor_varios=varios)
+    tickers = [f"T{i}" for i in range(100)] + ["NOEXISTE"]
+    tabla = h.cierres(tickers, "2024-01-01", "2024-06-28")
+    assert pedidos == [tickers]
+    assert list(tabla.columns) == sorted(tickers[:-1])
+    # Lo que ya está en disco no se vuelve a pedir; lo anterior se pide junto.
+    del pedidos[:]
+    h.cierres(tickers[:-1], "2023-07-03", "2024-06-28")
+    assert len(pedidos) == 1 and len(pedidos[0]) == 100
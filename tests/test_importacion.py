@@ -0,0 +1,58 @@
+"""``preparar_importacion`` con un extracto de broker contra el libro y la bitácora de tests/hojas.
+
+En el libro hay 100 BNC (2/1/2024) y 10 MVZ.A (2/2/2024); la bitácora solo
+tiene la tasa del 2/1/2024 (36,1).
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from conftest import RAIZ
+from nucleo.hojas_locales import ConexionLocal
+from nucleo.importacion import leer_extracto, preparar_importacion, sugerir_mapeo
+from nucleo.libro import LibroOperaciones
+from nucleo.mercados import BVC, cargar_operaciones
+from nucleo.tasas import COLUMNAS_TASAS, HistorialTasas
+
+HOJAS = os.path.join(RAIZ, "tests", "hojas")
+
+
+@pytest.fixture
+def importacion():
+    conn = ConexionLocal(HOJAS)
+    extracto = leer_extracto(os.path.join(HOJAS, "Extracto_Broker.csv"))
+    mapeo = sugerir_mapeo(list(extracto.columns))
+    assert mapeo == {"Fecha": "Fecha Operación", "Ticker": "Símbolo", "Tipo": "Operación",
+                     "Cantidad": "Títulos", "Precio": "Precio", "Tasa": "Tasa BCV"}
+    libro = cargar_operaciones(LibroOperaciones(conn, "Portafolio", BVC.columnas), BVC)
+    tasas = HistorialTasas(LibroOperaciones(conn, "Historial_Tasas", COLUMNAS_TASAS))
+    return preparar_importacion(extracto, mapeo, BVC, libro, tasas)
+
+
+def test_filas_aceptadas(importacion):
+    filas = importacion.filas
+    assert filas["Ticker"].tolist() == ["BNC", "BNC"]
+    assert filas["Fecha Compra"].tolist() == [pd.Timestamp("2024-01-02"), pd.Timestamp("2024-01-05")]
+    assert filas["Tipo"].tolist() == ["Compra", "Venta"]
+    assert filas["Cantidad"].tolist() == [50, -120]
+    assert filas["Precio Operacion (Bs)"].tolist() == [10.8, 11.0]
+    # La compra no traía tasa: sale de la bitácora.
+    assert filas["Tasa Cambio (Bs/$)"].tolist() == [36.1, 36.2]
+    assert importacion.tasas_completadas == 1
+    assert filas["Total Invertido (Bs)"].tolist() == pytest.approx([540.0, -1320.0])
+    assert filas["Total Invertido ($)"].tolist() == pytest.approx([540 / 36.1, -1320 / 36.2])
+
+
+def test_filas_rechazadas(importacion):
+    errores = importacion.errores.set_index("Fila")["Motivo"].to_dict()
+    assert errores == {
+        # MVZ.A se compró recién el 2/2: el 4/1 no había nada que vender.
+        3: "vende más de lo que hay en cartera",
+        # 6 días después de la última tasa de la bitácora.
+        5: "sin tasa para esa fecha",
+        # 100 + 50 − 120 = 30 BNC y se venden 40.
+        6: "vende más de lo que hay en cartera",
+        7: "fecha inválida",
+    }
@@ -0,0 +1,127 @@
+"""``LibroOperaciones``: anexar con control de versión y hojas que no existen todavía."""
+
+import pandas as pd
+import pytest
+from gspread.exceptions import WorksheetNotFound
+
+from nucleo.cache_libro import CacheLibro
+from nucleo.hojas_locales import ConexionLocal
+from nucleo.libro import ConflictoDeVersion, LibroOperaciones
+from nucleo.mercados import INTL, cargar_operaciones, hoja_de_cartera, registrar_operacion
+
+HOJA = hoja_de_cartera(INTL.hoja, "ana")
+
+
+class Cliente:
+    """Como el cliente de gspread: ``worksheet()`` falla con las hojas que nadie creó."""
+
+    def __init__(self, carpeta):
+        self.local = ConexionLocal(carpeta)
+        self.creadas = []
+
+    def _select_worksheet(self, worksheet=None, **kwargs):
+        if worksheet not in self.creadas:
+            raise WorksheetNotFound(worksheet)
+        return self.local.hoja(worksheet)
+
+    def _open_spreadsheet(self, **kwargs):
+        return self
+
+    def add_worksheet(self, title, rows, cols, index=None):
+        self.creadas.append(title)
+        return self.local.hoja(title)
+
+
+class Conexion:
+    def __init__(self, carpeta):
+        self.client = Cliente(carpeta)
+
+    def read(self, worksheet=None, ttl=None, **options):
+        self.client._select_worksheet(worksheet=worksheet)
+        return self.client.local.read(worksheet=worksheet)
+
+
+def test_cartera_nueva_se_lee_vacia_y_se_crea_al_guardar(tmp_path):
+    conn = Conexion(str(tmp_path))
+    libro = LibroOperaciones(conn, HOJA, INTL.columnas)
+    ops = cargar_operaciones(libro, INTL)
+    assert ops.empty and libro.version == 0
+
+    registrar_operacion(libro, INTL, "AAPL", 2, 150.0, "2024-03-01", 36.5, "Compra")
+    assert conn.client.creadas == [HOJA]
+    valores = conn.client.local.hoja(HOJA).get_all_values()
+    assert valores[0] == list(INTL.columnas) and len(valores) == 2
+    assert cargar_operaciones(libro, INTL)["Ticker"].tolist() == ["AAPL"]
+
+
+def test_con_cache_la_hoja_se_crea_en_la_primera_lectura(tmp_path):
+    conn = Conexion(str(tmp_path / "hojas"))
+    libro = LibroOperaciones(conn, HOJA, INTL.columnas, cache=CacheLibro(str(tmp_path / "libro.sqlite")))
+    df = libro.leer()
+    assert df.empty and list(df.columns) == list(INTL.columnas)
+    assert conn.client.creadas == [HOJA] and libro.version == 0
+    nueva = pd.DataFrame([{"Ticker": "MSFT", "Cantidad": 1, "Precio": 400.0,
+                           "Fecha": "2024-03-01", "Tipo": "Compra", "Tasa": 36.5}])
+    assert libro.anexar(nueva) == 1
+
+
+def operacion(ticker, **extra):
+    return pd.DataFrame([{"Ticker": ticker, "Cantidad": 1, "Precio": 10.0, "Fecha": "2024-03-01", **extra}])
+
+
+def contar_anexos(conn, hoja):
+    """Envuelve ``append_rows`` de la hoja local para contar las llamadas."""
+    ws = conn.hoja(hoja)
+    llamadas = []
+    original = ws.append_rows
+
+    def append_rows(values, **kwargs):
+        llamadas.append(values)
+        return original(values, **kwargs)
+
+    ws.append_rows = append_rows
+    return llamadas
+
+
+def test_anexar_con_la_version_leida_es_una_sola_llamada(tmp_path):
+    conn = ConexionLocal(str(tmp_path))
+    conn.hoja("Libro")._escribir([["Ticker", "Cantidad", "Precio", "Fecha"], ["AAPL", "2", "150", "2024-01-02"]])
+    libro = LibroOperaciones(conn, "Libro", ["Ticker", "Cantidad", "Precio", "Fecha"])
+    libro.leer()
+    assert libro.version == 1
+
+    anexos = contar_anexos(conn, "Libro")
+    nuevas = pd.concat([operacion("MSFT"), operacion("NVDA")], ignore_index=True)
+    assert libro.anexar(nuevas) == 3
+    assert anexos == [[["MSFT", 1, 10.0, "2024-03-01"], ["NVDA", 1, 10.0, "2024-03-01"]]]
+    assert [f[0] for f in conn.hoja("Libro").get_all_values()] == ["Ticker", "AAPL", "MSFT", "NVDA"]
+
+
+def test_otra_sesion_escribio_conflicto_e_invalida_la_cache(tmp_path):
+    conn = ConexionLocal(str(tmp_path / "hojas"))
+    conn.hoja("Libro")._escribir([["Ticker", "Cantidad", "Precio", "Fecha"], ["AAPL", "2", "150", "2024-01-02"]])
+    libro = LibroOperaciones(conn, "Libro", ["Ticker", "Cantidad", "Precio", "Fecha"],
+                             cache=CacheLibro(str(tmp_path / "libro.sqlite")))
+    libro.leer()
+    otra = LibroOperaciones(conn, "Libro", libro.columnas)
+    otra.leer()
+    otra.anexar(operacion("TSLA"))
+
+    anexos = contar_anexos(conn, "Libro")
+    with pytest.raises(ConflictoDeVersion):
+        libro.anexar(operacion("MSFT"))
+    assert anexos == []
+    # Sin invalidar, la copia local no volvería a mirar la hoja hasta pasado el intervalo.
+    assert libro.leer()["Ticker"].tolist() == ["AAPL", "TSLA"] and libro.version == 2
+
+
+def test_columna_que_falta_amplia_el_encabezado(tmp_path):
+    conn = ConexionLocal(str(tmp_path))
+    conn.hoja("Libro")._escribir([["Ticker", "Cantidad", "Precio", "Fecha"], ["AAPL", "2", "150", "2024-01-02"]])
+    libro = LibroOperaciones(conn, "Libro", INTL.columnas)
+    libro.leer()
+    libro.anexar(operacion("MSFT", Tasa=36.5))
+    valores = conn.hoja("Libro").get_all_values()
+    assert valores[0] == ["Ticker", "Cantidad", "Precio", "Fecha", "Tasa"]
+    assert valores[1] == ["AAPL", "2", "150", "2024-01-02"]
+    assert valores[2] == ["MSFT", "1", "10.0", "2024-03-01", "36.5"]
@@ -0,0 +1,43 @@
+"""Casado de lotes contra casos calculados a mano.
+
+Compra 10 a $10 (tasa 36), compra 10 a $20 (tasa 40), vende 15 a $30 (tasa 50).
+"""
+
+import numpy as np
+import pandas as pd
+
+from nucleo.lotes import casar_lotes, resumen_posiciones
+
+OPS = pd.DataFrame({
+    "Fecha": pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03"]),
+    "Ticker": ["A", "A", "A"], "Cantidad": [10.0, 10.0, -15.0],
+    "Precio": [10.0, 20.0, 30.0], "Tasa": [36.0, 40.0, 50.0],
+})
+
+
+def test_fifo_vende_primero_lo_mas_viejo():
+    # Se venden los 10 de $10 y 5 de $20.
+    fifo = casar_lotes(OPS, "USD", "FIFO")
+    venta = fifo.ventas.iloc[0]
+    assert np.isclose(venta["Realizada $"], 450 - 200)
+    assert np.isclose(venta["Realizada Bs"], 450 * 50 - (10 * 10 * 36 + 5 * 20 * 40))
+    resumen = resumen_posiciones(fifo, {"A": 40.0}, 60.0).iloc[0]
+    assert np.isclose(resumen["Costo $"], 100) and np.isclose(resumen["Costo Bs"], 4000)
+    assert np.isclose(resumen["No Realizada $"], 100) and np.isclose(resumen["No Realizada Bs"], 12000 - 4000)
+
+
+def test_costo_promedio():
+    # $15 y Bs 580 por acción.
+    prom = casar_lotes(OPS, "USD", "Promedio")
+    venta = prom.ventas.iloc[0]
+    assert np.isclose(venta["Realizada $"], 450 - 15 * 15)
+    assert np.isclose(venta["Realizada Bs"], 450 * 50 - 15 * 580)
+    assert np.isclose(prom.lotes["Cantidad"].sum(), 5)
+
+
+def test_libro_en_bs_usa_la_tasa_de_cada_lote():
+    # El costo en $ de cada lote sale de su propia tasa.
+    bs = casar_lotes(OPS.assign(Precio=OPS["Precio"] * 36), "Bs", "FIFO")
+    venta = bs.ventas.iloc[0]
+    assert np.isclose(venta["Realizada Bs"], 15 * 30 * 36 - (10 * 10 * 36 + 5 * 20 * 36))
+    assert np.isclose(venta["Realizada $"], 15 * 30 * 36 / 50 - (10 * 10 + 5 * 20 * 36 / 40))
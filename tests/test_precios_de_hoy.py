@@ -0,0 +1,61 @@
+"""La tabla de precios de hoy de Dashboard.py: ediciones a mano y "Cargar de la BVC"."""
+
+import json
+import os
+
+from streamlit.testing.v1 import AppTest
+
+from conftest import RAIZ
+from nucleo.precios_manuales import PreciosManuales
+
+PAGINA = os.path.join(RAIZ, "Dashboard.py")
+
+
+def editor_de_precios(at):
+    return next(d for d in at.dataframe if (d.key or "").startswith("editor_precios_"))
+
+
+def enviar_edicion(at, editor, edicion):
+    """Hace que el próximo ``run`` mande ``edicion`` como estado del editor, como el navegador.
+
+    AppTest no sabe editar un ``st.data_editor``; el navegador sigue mandando
+    lo editado con el id del editor en cada rerun, así que se agrega a los
+    estados de los widgets.
+    """
+    arbol = at._tree
+    originales = arbol.get_widget_states
+
+    def estados():
+        ws = originales()
+        w = ws.widgets.add()
+        w.id = editor.proto.id
+        w.string_value = json.dumps({"edited_rows": edicion, "added_rows": [], "deleted_rows": []})
+        return ws
+
+    arbol.get_widget_states = estados
+
+
+def precio(at, ticker):
+    return float(at.session_state["precios_mercado"].at[ticker, "Precio Bs."])
+
+
+def test_cargar_de_la_bvc_reemplaza_lo_editado_en_la_sesion():
+    manuales = PreciosManuales()
+    manuales.borrar()
+    at = AppTest.from_file(PAGINA, default_timeout=60).run()
+    assert not at.exception
+
+    editor = editor_de_precios(at)
+    fila = list(editor.value.index).index("BNC")
+    enviar_edicion(at, editor, {str(fila): {"Precio Bs.": 99.0}})
+    at.run()
+    assert precio(at, "BNC") == 99.0
+    assert manuales.leer() == {"BNC": 99.0}
+
+    # El navegador sigue mandando la edición vieja al apretar el botón.
+    boton = next(b for b in at.button if "BVC" in b.label)
+    enviar_edicion(at, editor, {str(fila): {"Precio Bs.": 99.0}})
+    boton.click().run()
+    assert not at.exception
+    assert precio(at, "BNC") == 1234.56
+    assert manuales.leer() == {}
@@ -0,0 +1,47 @@
+"""``rellenar_bitacora``: una escritura por defecto, lotes solo si se piden."""
+
+import pandas as pd
+
+from nucleo.relleno_tasas import rellenar_bitacora
+
+
+class Historial:
+    """Lo que ``rellenar_bitacora`` usa de ``HistorialTasas``, anotando cada escritura."""
+
+    def __init__(self, tasas=None):
+        self.tasas = pd.Series(tasas or {}, dtype=float)
+        self.tasas.index = pd.DatetimeIndex(self.tasas.index)
+        self.escrituras = []
+
+    def serie(self):
+        return self.tasas
+
+    def registrar_varias(self, tasas):
+        nuevas = tasas[~tasas.index.isin(self.tasas.index)]
+        self.escrituras.append(len(nuevas))
+        self.tasas = pd.concat([self.tasas, nuevas]).sort_index()
+        return len(nuevas)
+
+
+def tasas_habiles(desde, hasta):
+    dias = pd.bdate_range(desde, hasta)
+    return pd.Series(range(1, len(dias) + 1), index=dias, dtype=float)
+
+
+def test_varios_anos_se_anexan_en_una_escritura():
+    historial = Historial({"2020-01-02": 1.0})
+    r = rellenar_bitacora(historial, tasas_habiles("2020-01-01", "2023-12-31"))
+    assert len(historial.escrituras) == 1
+    assert r.anexadas == historial.escrituras[0] == len(pd.date_range("2020-01-01", "2023-12-29")) - 1
+    assert r.ya_estaban == 1
+    # Los fines de semana toman la tasa del viernes.
+    assert historial.tasas[pd.Timestamp("2023-12-24")] == historial.tasas[pd.Timestamp("2023-12-22")]
+
+
+def test_lote_parte_la_escritura_y_repetir_no_escribe():
+    historial = Historial()
+    r = rellenar_bitacora(historial, tasas_habiles("2023-01-02", "2023-03-31"), lote=30)
+    assert historial.escrituras == [30, 30, 29]
+    assert r.anexadas == 89
+    del historial.escrituras[:]
+    assert rellenar_bitacora(historial, tasas_habiles("2023-01-02", "2023-03-31")).anexadas == 0
@@ -0,0 +1,138 @@
+"""Extractor del resumen de la BVC contra las páginas guardadas y consultas condicionales de ``ClienteBVC``."""
+
+import glob
+import json
+import os
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from conftest import RAIZ
+from nucleo.resumen_bvc import ClienteBVC, extraer_precios_bvc
+
+FIXTURES = os.path.join(RAIZ, "benchmarks", "fixtures")
+PAGINAS = sorted(glob.glob(os.path.join(FIXTURES, "bvc*.html")))
+
+
+def leer(ruta, modo="rb"):
+    with open(ruta, modo) as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("ruta", PAGINAS, ids=os.path.basename)
+def test_precios_de_las_paginas_guardadas(ruta):
+    esperado = json.loads(leer(os.path.splitext(ruta)[0] + ".json", "r"))
+    html = leer(ruta)
+    for pagina in (html, html.decode("utf-8")):
+        tabla = extraer_precios_bvc(pagina)
+        assert dict(zip(tabla["Ticker"], tabla["Precio Bs."])) == esperado
+
+
+@pytest.mark.parametrize("html", [b"", "<html><body><p>Mantenimiento</p></body></html>",
+                                  "<table><tr><th>Índice</th><th>Valor</th></tr><tr><td>IBC</td><td>1,0</td></tr></table>"])
+def test_sin_tabla_de_precios_sale_vacia(html):
+    tabla = extraer_precios_bvc(html)
+    assert tabla.empty and list(tabla.columns) == ["Ticker", "Precio Bs."]
+
+
+class Servidor:
+    """Sirve ``pagina`` con ETag (si ``con_etag``) y Last-Modified, y contesta 304 a lo que no cambió."""
+
+    def __init__(self, pagina, con_etag=True):
+        self.pedidos = []
+        self.puertos = []
+        self.cambiar(pagina)
+        servidor = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                servidor.pedidos.append(dict(self.headers))
+                servidor.puertos.append(self.client_address[1])
+                igual = (con_etag and self.headers.get("If-None-Match") == servidor.etag) or \
+                    self.headers.get("If-Modified-Since") == servidor.modificada
+                cuerpo = b"" if igual else servidor.pagina
+                self.send_response(304 if igual else 200)
+                if con_etag:
+                    self.send_header("ETag", servidor.etag)
+                self.send_header("Last-Modified", servidor.modificada)
+                self.send_header("Content-Type", "text/html")
+                self.send_header("Content-Length", str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+            def log_message(self, *args):
+                pass
+
+        self.http = ThreadingHTTPServer(("127.0.0.1", 0), Manejador)
+        self.url = f"http://127.0.0.1:{self.http.server_port}/"
+        threading.Thread(target=self.http.serve_forever, daemon=True).start()
+
+    def cambiar(self, pagina):
+        self.pagina = pagina
+        self.etag = f'"{len(self.pedidos)}-{hash(pagina) & 0xffffffff:x}"'
+        self.modificada = formatdate(time.time() + len(self.pedidos), usegmt=True)
+
+
+@pytest.fixture
+def servidor():
+    s = Servidor(leer(PAGINAS[0]))
+    yield s
+    s.http.shutdown()
+
+
+def test_la_segunda_consulta_es_condicional_y_reusa_la_tabla(servidor, tmp_path):
+    cliente = ClienteBVC(servidor.url, ruta=str(tmp_path / "precios_bvc.json"))
+    primera = cliente.consultar()
+    assert not primera.sin_cambios and len(primera.precios) == 25
+    assert "If-None-Match" not in servidor.pedidos[0]
+
+    segunda = cliente.consultar()
+    assert servidor.pedidos[1]["If-None-Match"] == servidor.etag
+    assert servidor.pedidos[1]["If-Modified-Since"] == servidor.modificada
+    assert segunda.sin_cambios and segunda.precios == primera.precios
+    assert segunda.obtenida >= primera.obtenida
+
+    # La página cambió: se baja entera y se guarda el ETag nuevo.
+    servidor.cambiar(leer(PAGINAS[1]))
+    tercera = cliente.consultar()
+    assert not tercera.sin_cambios and tercera.precios == {"BPV": 45.5, "MVZ.A": 1210.5, "TDV.D": 9.7}
+    assert json.loads(leer(tmp_path / "precios_bvc.json", "r"))["etag"] == servidor.etag
+
+
+def test_sin_etag_alcanza_con_last_modified(tmp_path):
+    s = Servidor(leer(PAGINAS[0]), con_etag=False)
+    try:
+        cliente = ClienteBVC(s.url, ruta=str(tmp_path / "precios_bvc.json"))
+        cliente.consultar()
+        assert cliente.consultar().sin_cambios
+        assert "If-None-Match" not in s.pedidos[1]
+    finally:
+        s.http.shutdown()
+
+
+def test_la_sesion_reusa_la_conexion(servidor, tmp_path):
+    cliente = ClienteBVC(servidor.url, ruta=str(tmp_path / "precios_bvc.json"))
+    cliente.consultar()
+    cliente.consultar()
+    # Misma conexión TCP (mismo puerto de origen) para las dos consultas.
+    assert len(servidor.puertos) == 2 and len(set(servidor.puertos)) == 1
+
+
+def test_leer_no_consulta_dentro_del_ttl_ni_despues_de_un_fallo(servidor, tmp_path):
+    ruta = str(tmp_path / "precios_bvc.json")
+    cliente = ClienteBVC(servidor.url, ruta=ruta)
+    assert len(cliente.leer(ttl=300).precios) == 25
+    assert cliente.leer(ttl=300).sin_cambios
+    assert len(servidor.pedidos) == 1
+
+    caido = ClienteBVC("http://127.0.0.1:9/", ruta=ruta, timeout=2, reintento=300)
+    with pytest.raises(Exception):
+        caido.leer(ttl=0)
+    # Tras el fallo no se vuelve a tocar la red hasta pasado ``reintento``.
+    with pytest.raises(ConnectionError, match="reintenta"):
+        caido.leer(ttl=0)
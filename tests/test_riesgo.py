@@ -0,0 +1,33 @@
+"""``analizar_riesgo``: retorno anual compuesto."""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from nucleo.riesgo import analizar_riesgo, retorno_anual
+
+FECHAS = pd.bdate_range("2024-01-01", periods=253)
+TASAS = pd.Series(36.0, index=FECHAS)
+
+
+def test_uno_por_ciento_diario_compuesto():
+    precios = pd.DataFrame({"A": 100 * 1.01 ** np.arange(253)}, index=FECHAS)
+    metricas = analizar_riesgo(precios, {"A": 1}, TASAS).metricas
+    assert np.isclose(metricas.loc["Retorno anual %", "$"], (1.01 ** 252 - 1) * 100)
+    assert np.isclose(metricas.loc["Retorno anual %", "Bs"], (1.01 ** 252 - 1) * 100)
+
+
+def test_precios_que_saltan_dan_un_retorno_finito():
+    # Operaciones sueltas de la BVC: 99 y 1.234,56 alternados. La media simple
+    # de los retornos (~5,7 diario) compuesta 252 veces desborda.
+    precios = pd.DataFrame({"A": np.where(np.arange(253) % 2, 1234.56, 99.0)}, index=FECHAS)
+    metricas = analizar_riesgo(precios, {"A": 1}, TASAS, moneda="Bs").metricas
+    assert np.isfinite(metricas.loc["Retorno anual %"].astype(float)).all()
+    # 126 subidas y 126 bajadas: se vuelve al punto de partida.
+    assert np.isclose(metricas.loc["Retorno anual %", "Bs"], 0, atol=1e-9)
+
+
+def test_perderlo_todo_no_tiene_retorno_anual():
+    assert math.isnan(retorno_anual(np.array([0.1, -1.0, np.nan])))
+    assert math.isnan(retorno_anual(np.array([np.nan])))
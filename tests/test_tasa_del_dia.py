@@ -0,0 +1,31 @@
+"""Con el BCV caído las páginas muestran una tasa de reserva, pero no la anotan en la bitácora."""
+
+import os
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from conftest import HOJAS, RAIZ
+from nucleo.bcv import LecturaTasa
+from recursos import actualizar_bitacora_tasas
+
+
+def fechas_en_bitacora():
+    return set(pd.read_csv(os.path.join(HOJAS, "Historial_Tasas.csv"))["Fecha"].astype(str))
+
+
+@pytest.mark.parametrize("pagina", ["Dashboard.py", "Dashboard_INTL.py", "Dashboard_Consolidado.py"])
+def test_sin_tasa_del_bcv_no_se_anota_la_de_reserva(pagina):
+    at = AppTest.from_file(os.path.join(RAIZ, pagina), default_timeout=60).run()
+    assert not at.exception
+    assert f"{datetime.now().date()}" not in fechas_en_bitacora()
+
+
+@pytest.mark.parametrize("lectura", [None,
+                                     LecturaTasa(0.0, None, None, True, True, {}),
+                                     LecturaTasa(36.5, 0.0, 90000.0, True, False, {"USD": 36.5})])
+def test_solo_se_anota_una_tasa_fresca(lectura):
+    actualizar_bitacora_tasas(lectura)
+    assert f"{datetime.now().date()}" not in fechas_en_bitacora()
@@ -0,0 +1,70 @@
+"""``HistorialTasas``: búsqueda hacia atrás con tolerancia y registro sin repetir fechas.
+
+Bitácora: viernes 5/1 36,0; lunes 8/1 36,2; miércoles 10/1 36,5; lunes 22/1 37,0.
+"""
+
+import numpy as np
+import pytest
+
+from nucleo.hojas_locales import ConexionLocal
+from nucleo.libro import LibroOperaciones
+from nucleo.tasas import COLUMNAS_TASAS, HistorialTasas
+
+BITACORA = [["Fecha", "Tasa"], ["2024-01-05", "36,0"], ["2024-01-08", "36,2"],
+            ["2024-01-10", "36,5"], ["2024-01-22", "37,0"]]
+
+
+@pytest.fixture
+def conn(tmp_path):
+    c = ConexionLocal(str(tmp_path))
+    c.hoja("Historial_Tasas")._escribir(BITACORA)
+    return c
+
+
+def historial(conn):
+    return HistorialTasas(LibroOperaciones(conn, "Historial_Tasas", COLUMNAS_TASAS))
+
+
+@pytest.mark.parametrize("fecha, tasa", [
+    ("2024-01-08", 36.2),   # está
+    ("2024-01-06", 36.0),   # sábado: la del viernes
+    ("2024-01-09", 36.2),   # martes sin tasa: la del lunes
+    ("2024-01-14", 36.5),   # 4 días después del miércoles: todavía vale
+    ("2024-01-15", None),   # 5 días: demasiado lejos
+    ("2024-01-04", None),   # antes de la primera
+    ("2024-01-30", None),
+])
+def test_buscar_la_anterior_dentro_de_la_tolerancia(conn, fecha, tasa):
+    h = historial(conn)
+    assert h.buscar(fecha) == tasa
+    encontrada = h.buscar_varias([fecha])[0]
+    assert np.isnan(encontrada) if tasa is None else encontrada == tasa
+
+
+def test_tolerancia_cero_solo_la_del_dia(conn):
+    h = historial(conn)
+    assert h.buscar("2024-01-09", max_dias=0) is None
+    assert h.buscar("2024-01-10", max_dias=0) == 36.5
+    assert np.isnan(h.buscar_varias(["2024-01-09", "2024-01-10"], max_dias=0)).tolist() == [True, False]
+
+
+def test_registrar_no_repite_una_fecha(conn):
+    h = historial(conn)
+    assert not h.registrar("2024-01-08", 99.0)
+    assert not h.registrar("2024-01-09", 0)
+    assert len(conn.hoja("Historial_Tasas").get_all_values()) == 5
+
+    assert h.registrar("2024-01-09", 36.3)
+    assert h.buscar("2024-01-09") == 36.3 and h.buscar("2024-01-08") == 36.2
+    assert not h.registrar("2024-01-09", 36.4)
+    assert conn.hoja("Historial_Tasas").get_all_values()[-1] == ["2024-01-09", "36.3"]
+    assert len(conn.hoja("Historial_Tasas").get_all_values()) == 6
+
+
+def test_registrar_despues_de_otro_proceso_no_duplica(conn):
+    h, otro = historial(conn), historial(conn)
+    assert otro.registrar("2024-01-11", 36.6)
+    # ``h`` leyó antes: el anexo choca con la versión, relee y ve que la fecha ya está.
+    assert not h.registrar("2024-01-11", 36.7)
+    assert h.buscar("2024-01-11") == 36.6
+    assert len(conn.hoja("Historial_Tasas").get_all_values()) == 6
@@ -0,0 +1,22 @@
+"""``Trabajador``: la foto de la tasa del BCV no depende de la bitácora."""
+
+from nucleo.instantaneas import Instantaneas
+from nucleo.trabajador import Tarea, Trabajador, tarea_bcv
+
+
+class HistorialCaido:
+    def __init__(self):
+        self.intentos = 0
+
+    def registrar(self, fecha, tasa):
+        self.intentos += 1
+        raise ConnectionError("Quota exceeded for quota metric 'Write requests'")
+
+
+def test_la_tasa_queda_en_la_foto_aunque_falle_la_bitacora(tmp_path):
+    historial = HistorialCaido()
+    fotos = Instantaneas(str(tmp_path))
+    trabajador = Trabajador(fotos, [Tarea("bcv", tarea_bcv(lambda: {"USD": 36.5, "EUR": 39.9}, historial), 3600)])
+    assert trabajador.correr_pendientes() == {"bcv": True}
+    assert historial.intentos == 1 and trabajador.errores == {}
+    assert fotos.ultima("bcv").datos == {"USD": 36.5, "EUR": 39.9}
@@ -0,0 +1,90 @@
+"""Trabajador que baja la tasa del BCV, los precios de la BVC y las cotizaciones con su propio horario.
+
+Uso:
+    python trabajador.py                 # corre para siempre
+    python trabajador.py --una-vez       # una pasada (p.ej. desde cron) y termina
+
+Cada fuente queda como foto del día en <INVERSIONES_CACHE>/instantaneas y la
+tasa del día se anota en 'Historial_Tasas'. Con el trabajador corriendo los
+dashboards solo leen esas fotos: no consultan al BCV, a la BVC ni a
+yfinance mientras alguien carga la página (si las fotos envejecen, vuelven
+a consultar por su cuenta). Los precios de la BVC salen de su resumen de
+mercado (INVERSIONES_URL_BVC); si la página no responde, de la hoja
+Precios_Web. Las cotizaciones son de los tickers de los libros
+internacionales de todas las carteras (INVERSIONES_CARTERAS).
+
+La hoja es la misma de los dashboards: con ``--hojas`` (o
+INVERSIONES_HOJAS_LOCALES) la carpeta de CSVs locales; si no, Google Sheets
+con las credenciales de .streamlit/secrets.toml.
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+from nucleo import (INTL, CacheLibro, ClienteBVC, HistorialTasas, Instantaneas, LibroOperaciones, Tarea, Trabajador,
+                    abrir_conexion, cargar_operaciones, carteras_configuradas, hoja_de_cartera, proveedor_tabla,
+                    proveedor_yfinance, tarea_bcv, tarea_cotizaciones, tarea_precios_bvc)
+from nucleo.bcv import URL_BCV, descargar_tasas_bcv
+from nucleo.tasas import COLUMNAS_TASAS
+
+
+def argumentos(args=None):
+    p = argparse.ArgumentParser(description="Fotos diarias de tasa, precios y cotizaciones para los dashboards.")
+    p.add_argument("--una-vez", action="store_true", help="correr cada tarea una vez y salir")
+    p.add_argument("--hojas", default=os.environ.get("INVERSIONES_HOJAS_LOCALES"),
+                   help="carpeta de hojas locales (por defecto, Google Sheets)")
+    p.add_argument("--cada-bcv", type=int, default=3600, help="segundos entre consultas al BCV (3600)")
+    p.add_argument("--cada-bvc", type=int, default=300, help="segundos entre lecturas de precios de la BVC (300)")
+    p.add_argument("--cada-cotizaciones", type=int, default=300, help="segundos entre cotizaciones (300)")
+    p.add_argument("--solo-hoja", action="store_true",
+                   help="tomar los precios de la BVC de la hoja Precios_Web, sin consultar su página")
+    return p.parse_args(args)
+
+
+def tareas(conn, cache, a):
+    historial = HistorialTasas(LibroOperaciones(conn, "Historial_Tasas", COLUMNAS_TASAS, cache=cache))
+    libros = [LibroOperaciones(conn, hoja_de_cartera(INTL.hoja, c), INTL.columnas, cache=cache)
+              for c in carteras_configuradas(os.environ.get("INVERSIONES_CARTERAS", ""))]
+
+    def tickers_intl():
+        tickers = []
+        for libro in libros:
+            try:
+                df = cargar_operaciones(libro, INTL)
+            except Exception:
+                # Una cartera que todavía no tiene hoja no tiene tickers.
+                continue
+            tickers += df["Ticker"].dropna().astype(str).str.upper().tolist()
+        return tickers
+
+    proveedor = proveedor_yfinance
+    if a.hojas:
+        # Sin red, igual que los dashboards con hojas locales: la hoja Cotizaciones hace de yfinance.
+        try:
+            proveedor = proveedor_tabla(conn.read(worksheet="Cotizaciones"))
+        except Exception:
+            pass
+    return [
+        Tarea("bcv", tarea_bcv(lambda: descargar_tasas_bcv(URL_BCV), historial), a.cada_bcv),
+        Tarea("precios_bvc", tarea_precios_bvc(None if a.solo_hoja else ClienteBVC(),
+                                               lambda: conn.read(worksheet="Precios_Web", ttl=0)), a.cada_bvc),
+        Tarea("cotizaciones", tarea_cotizaciones(proveedor, tickers_intl), a.cada_cotizaciones),
+    ]
+
+
+def main(args=None):
+    a = argumentos(args)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    conn = abrir_conexion(a.hojas)
+    trabajador = Trabajador(Instantaneas(), tareas(conn, CacheLibro(), a))
+    if a.una_vez:
+        resultados = trabajador.correr_pendientes()
+        return 0 if all(resultados.values()) else 1
+    trabajador.correr()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())